@@ -3,11 +3,13 @@ import pandas as pd
 import warnings
 warnings.filterwarnings('ignore')
 
+from panel_keys import KEY_DTYPES
+
 print("K-Beauty 데이터 컬럼명을 영어로 변환 시작...")
 
 # 1. 데이터 로드
 print("\n1. 데이터 로드 중...")
-df = pd.read_csv('/Users/owlers_dylan/Metrix/source/K-Beauty_Panel_Integrated_with_Match.csv')
+df = pd.read_csv('/Users/owlers_dylan/Metrix/source/K-Beauty_Panel_Integrated_with_Match.csv', dtype=KEY_DTYPES)
 print(f"   - 데이터: {len(df)} 행, {len(df.columns)} 컬럼")
 
 # 2. 현재 컬럼 확인
@@ -1,59 +1,101 @@
 #!/usr/bin/env python3
 import pandas as pd
 import numpy as np
-import re
-from difflib import SequenceMatcher
 import warnings
 warnings.filterwarnings('ignore')
 
-def normalize_phone(phone):
-    """전화번호 정규화"""
-    if pd.isna(phone):
-        return None
-    phone = str(phone).strip()
-    phone = re.sub(r'[^0-9]', '', phone)
-
-    # 010으로 시작하는 11자리 또는 10자리 번호 정규화
-    if len(phone) == 10 and phone.startswith('10'):
-        phone = '0' + phone
-    elif len(phone) == 11 and phone.startswith('010'):
-        pass
-    elif len(phone) == 11 and phone.startswith('821'):
-        # 국제번호 형식 처리 (82-10-xxxx-xxxx)
-        phone = '0' + phone[2:]
-    elif len(phone) == 12 and phone.startswith('8210'):
-        # 국제번호 형식 처리 (82-10-xxxx-xxxx)
-        phone = '0' + phone[2:]
-    else:
-        # 유효하지 않은 번호는 원본 유지
-        pass
-
-    return phone
-
-def normalize_email(email):
-    """이메일 정규화"""
-    if pd.isna(email):
-        return None
-    email = str(email).strip().lower()
-    if '@' not in email:
-        return None
-    return email
-
-def calculate_similarity(str1, str2):
-    """두 문자열의 유사도 계산"""
+from panel_keys import KEY_COLUMNS, KEY_DTYPES, KEY_VERSION, ensure_keys
+from match_cache import cached_match
+from parallel_match import resolve_workers
+from similarity import backend_for, get_scorer
+from pipeline_worker import reference_csv
+
+# 이메일 유사도 backend (matching_config.json)
+email_similarity = get_scorer('cross_check_data.email')
+
+def calculate_similarity(str1, str2, cutoff=0.0):
+    """두 문자열의 유사도 계산 (cutoff 미만이 확실하면 0)"""
     if pd.isna(str1) or pd.isna(str2):
         return 0
-    return SequenceMatcher(None, str(str1), str(str2)).ratio()
+    return email_similarity(str(str1), str(str2), cutoff)
+
+# 매칭 규칙 버전 (점수 규칙이나 기준값을 바꾸면 올려서 매칭 캐시 무효화)
+MATCHER_VERSION = 1
+
+def find_famigo_match(query, candidates, positions=None):
+    """
+    K-Beauty 레코드 하나에 대해 최고 점수의 Famigo 매칭 찾기
+    query: (key_email, key_phone), candidates: [(key_email, key_phone), ...]
+    positions: 비교할 후보 위치 (기본: 전체)
+    반환: (후보 위치, 점수, 매칭 타입) - 매칭 없으면 (None, 0, None)
+    """
+    kb_email, kb_phone = query
+
+    best_match = None
+    best_score = 0
+    match_type = None
+
+    if positions is None:
+        positions = range(len(candidates))
+
+    # Famigo 데이터와 비교
+    for pos in positions:
+        f_email, f_phone = candidates[pos]
+        email_match = False
+        phone_match = False
+        score = 0
+
+        # 이메일 매칭 확인
+        if kb_email and f_email:
+            if kb_email == f_email:
+                email_match = True
+                score += 50
+            else:
+                similarity = calculate_similarity(kb_email, f_email, cutoff=0.9)
+                if similarity > 0.9:
+                    email_match = True
+                    score += 40 * similarity
+
+        # 전화번호 매칭 확인
+        if kb_phone and f_phone:
+            if kb_phone == f_phone:
+                phone_match = True
+                score += 50
+            elif len(kb_phone) >= 10 and len(f_phone) >= 10:
+                # 마지막 8자리 비교 (앞자리가 다를 수 있음)
+                if kb_phone[-8:] == f_phone[-8:]:
+                    phone_match = True
+                    score += 40
+
+        # 매칭 타입 결정
+        if email_match and phone_match:
+            current_match_type = '완전매칭'
+            score = 100
+        elif email_match:
+            current_match_type = '이메일매칭'
+        elif phone_match:
+            current_match_type = '전화번호매칭'
+        else:
+            continue
+
+        # 최고 점수 매칭 업데이트
+        if score > best_score:
+            best_score = score
+            best_match = pos
+            match_type = current_match_type
+
+    return best_match, best_score, match_type
 
 print("데이터 크로스 체킹 시작...")
 
 # 1. 데이터 로드
 print("\n1. K-Beauty 통합 데이터 로드...")
-kbeauty_df = pd.read_csv('/Users/owlers_dylan/Metrix/source/K-Beauty_Panel_Integrated.csv')
+kbeauty_df = pd.read_csv('/Users/owlers_dylan/Metrix/source/K-Beauty_Panel_Integrated.csv', dtype=KEY_DTYPES)
 print(f"   - K-Beauty 데이터: {len(kbeauty_df)} 행")
 
 print("\n2. Famigo 데이터 로드...")
-famigo_df = pd.read_csv('/Users/owlers_dylan/Metrix/source/famigo_member_Sep_23_2025_1_final_cleaned.csv')
+# 상주 워커(pipeline_worker.py)에서 실행되면 미리 읽어 둔 데이터를 사용
+famigo_df = reference_csv('/Users/owlers_dylan/Metrix/source/famigo_member_Sep_23_2025_1_final_cleaned.csv')
 print(f"   - Famigo 데이터: {len(famigo_df)} 행")
 
 # 2. 각 데이터의 컬럼 확인
@@ -67,11 +109,15 @@ kbeauty_email_col = None
 kbeauty_phone_cols = []
 
 for col in kbeauty_df.columns:
+    if col in KEY_COLUMNS:
+        continue
     if '이메일' in col or 'email' in col.lower():
         kbeauty_email_col = col
         break
 
 for col in kbeauty_df.columns:
+    if col in KEY_COLUMNS:
+        continue
     if '전화번호' in col or 'phone' in col.lower() or '연락처' in col:
         kbeauty_phone_cols.append(col)
 
@@ -83,11 +129,15 @@ famigo_email_col = None
 famigo_phone_col = None
 
 for col in famigo_df.columns:
+    if col in KEY_COLUMNS:
+        continue
     if '이메일' in col or 'email' in col.lower() or 'Email' in col:
         famigo_email_col = col
         break
 
 for col in famigo_df.columns:
+    if col in KEY_COLUMNS:
+        continue
     if '전화번호' in col or 'phone' in col.lower() or '연락처' in col or 'Phone' in col or 'Mobile' in col:
         famigo_phone_col = col
         break
@@ -98,29 +148,12 @@ print(f"   Famigo 전화번호 컬럼: {famigo_phone_col}")
 # 4. 정규화된 키 생성
 print("\n4. 매칭을 위한 정규화 키 생성...")
 
-# K-Beauty 데이터 정규화
-if kbeauty_email_col:
-    kbeauty_df['normalized_email'] = kbeauty_df[kbeauty_email_col].apply(normalize_email)
-else:
-    kbeauty_df['normalized_email'] = None
-
-# 전화번호가 여러 컬럼에 있을 수 있으므로 첫 번째 유효한 값 사용
-kbeauty_df['normalized_phone'] = None
-for phone_col in kbeauty_phone_cols:
-    if phone_col in kbeauty_df.columns:
-        temp_phones = kbeauty_df[phone_col].apply(normalize_phone)
-        kbeauty_df['normalized_phone'] = kbeauty_df['normalized_phone'].combine_first(temp_phones)
-
-# Famigo 데이터 정규화
-if famigo_email_col:
-    famigo_df['normalized_email'] = famigo_df[famigo_email_col].apply(normalize_email)
-else:
-    famigo_df['normalized_email'] = None
-
-if famigo_phone_col:
-    famigo_df['normalized_phone'] = famigo_df[famigo_phone_col].apply(normalize_phone)
-else:
-    famigo_df['normalized_phone'] = None
+# K-Beauty 데이터는 통합 단계(merge_csv_files.py)에서 저장한 키를 재사용
+print("   K-Beauty:")
+kbeauty_df = ensure_keys(kbeauty_df, email_cols=[kbeauty_email_col], phone_cols=kbeauty_phone_cols)
+
+print("   Famigo:")
+famigo_df = ensure_keys(famigo_df, email_cols=[famigo_email_col], phone_cols=[famigo_phone_col])
 
 # 5. 매칭 수행
 print("\n5. 데이터 매칭 수행...")
@@ -139,63 +172,21 @@ both_matched = 0
 # Famigo 데이터에 인덱스 기반 ID 생성
 famigo_df['famigo_id'] = 'FAM_' + famigo_df.index.astype(str).str.zfill(5)
 
-# 각 K-Beauty 레코드에 대해 Famigo 매칭 찾기
-for idx in range(len(kbeauty_df)):
-    kb_email = kbeauty_df.loc[idx, 'normalized_email']
-    kb_phone = kbeauty_df.loc[idx, 'normalized_phone']
+# Famigo 후보는 한 번만 튜플 목록으로 변환 (프로세스 풀에서 읽기 전용으로 공유)
+famigo_candidates = list(zip(famigo_df['key_email'], famigo_df['key_phone']))
+famigo_ids = list(famigo_df['famigo_id'])
+kbeauty_queries = list(zip(kbeauty_df['key_email'], kbeauty_df['key_phone']))
 
-    best_match = None
-    best_score = 0
-    match_type = None
+# 각 K-Beauty 레코드에 대해 Famigo 매칭 찾기 (METRIX_MATCH_WORKERS > 1 이면 병렬)
+# 이전 실행 결과를 재사용하고 새로 추가/변경된 레코드만 계산
+print(f"   - 매칭 프로세스 수: {resolve_workers()}")
+match_results = cached_match(
+    'cross_check_data', f"{MATCHER_VERSION}:{KEY_VERSION}:{backend_for('cross_check_data.email')}",
+    find_famigo_match, kbeauty_queries, kbeauty_queries, famigo_candidates, famigo_candidates
+)
 
-    # Famigo 데이터와 비교
-    for f_idx in range(len(famigo_df)):
-        f_email = famigo_df.loc[f_idx, 'normalized_email']
-        f_phone = famigo_df.loc[f_idx, 'normalized_phone']
-        f_id = famigo_df.loc[f_idx, 'famigo_id']
-
-        email_match = False
-        phone_match = False
-        score = 0
-
-        # 이메일 매칭 확인
-        if kb_email and f_email:
-            if kb_email == f_email:
-                email_match = True
-                score += 50
-            else:
-                similarity = calculate_similarity(kb_email, f_email)
-                if similarity > 0.9:
-                    email_match = True
-                    score += 40 * similarity
-
-        # 전화번호 매칭 확인
-        if kb_phone and f_phone:
-            if kb_phone == f_phone:
-                phone_match = True
-                score += 50
-            elif len(kb_phone) >= 10 and len(f_phone) >= 10:
-                # 마지막 8자리 비교 (앞자리가 다를 수 있음)
-                if kb_phone[-8:] == f_phone[-8:]:
-                    phone_match = True
-                    score += 40
-
-        # 매칭 타입 결정
-        if email_match and phone_match:
-            current_match_type = '완전매칭'
-            score = 100
-        elif email_match:
-            current_match_type = '이메일매칭'
-        elif phone_match:
-            current_match_type = '전화번호매칭'
-        else:
-            continue
-
-        # 최고 점수 매칭 업데이트
-        if score > best_score:
-            best_score = score
-            best_match = f_id
-            match_type = current_match_type
+for idx, (best_pos, best_score, match_type) in enumerate(match_results):
+    best_match = famigo_ids[best_pos] if best_pos is not None else None
 
     # 매칭 결과 저장
     if best_match:
@@ -212,9 +203,7 @@ for idx in range(len(kbeauty_df)):
         elif match_type == '전화번호매칭':
             phone_matched += 1
 
-# 6. 정규화 컬럼 제거 (최종 파일에는 불필요)
-kbeauty_df = kbeauty_df.drop(columns=['normalized_email', 'normalized_phone'], errors='ignore')
-
+# 6. 정규화 키 컬럼은 다음 단계에서 재사용하도록 유지
 # 7. 결과 저장
 output_path = '/Users/owlers_dylan/Metrix/source/K-Beauty_Panel_Integrated_with_Match.csv'
 kbeauty_df.to_csv(output_path, index=False, encoding='utf-8-sig')
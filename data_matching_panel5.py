@@ -4,6 +4,12 @@ import pandas as pd
 import numpy as np
 from datetime import datetime
 
+from panel_export import export_panel
+from panel_schema import apply_panel_dtypes
+from panel_keys import name_key
+from panel_store import STORE_FILE, open_store
+from similarity import get_scorer
+
 # 파일 경로
 base_file = '/Users/owlers_dylan/Metrix/source/Metrix_merged_final.csv'
 update_file = '/Users/owlers_dylan/Downloads/참가자 모집상황표(공유용) - 서울 관리 (3).csv'
@@ -12,9 +18,9 @@ output_file = '/Users/owlers_dylan/Metrix/source/Metrix_updated_panel5.xlsx'
 try:
     print("데이터 파일을 읽는 중...")
 
-    # 기본 데이터 읽기
-    df_base = pd.read_csv(base_file, encoding='utf-8-sig')
-    print(f"기본 데이터: {df_base.shape[0]}개 행")
+    # 패널 저장소 열기 (비어 있으면 기존 CSV에서 초기 구축)
+    store = open_store(STORE_FILE, bootstrap_csv=base_file)
+    print(f"기본 데이터: {store.count()}개 행")
 
     # 업데이트 데이터 읽기
     df_update = pd.read_csv(update_file, encoding='utf-8', skiprows=1)  # 첫 줄은 설명이므로 스킵
@@ -29,90 +35,95 @@ try:
 
     print(f"Panel5 관련 데이터: {df_panel5.shape[0]}개 행")
 
-    # 이름 정규화 함수
-    def normalize_name(name):
-        if pd.isna(name):
-            return ''
-        # 공백 제거, 소문자 변환
-        name = str(name).strip().lower()
-        # 특수문자 제거
-        name = ''.join(e for e in name if e.isalnum() or e.isspace())
-        return ' '.join(name.split())  # 다중 공백 제거
-
-    # 이름 컬럼 정규화
-    df_base['이름_정규화'] = df_base['작성자'].apply(normalize_name)
-    df_panel5['이름_정규화'] = df_panel5['이름'].apply(normalize_name)
-
-    # NAME 컬럼도 확인 (영문 이름)
-    df_panel5['NAME_정규화'] = df_panel5['NAME'].apply(normalize_name)
+    # 상태 결정 (참여 상태에 따라)
+    def derive_status(record):
+        if record.get('확정 여부') == 'x' or record.get('참여여부결과') in ['취소', '불가', '거부']:
+            return 'cancelled'
+        if record.get('참여여부결과') == '참여':
+            return 'completed'
+        if record.get('참여여부결과') in ['불참', '중복', '변경', '보류']:
+            return 'applied'
+        if pd.notna(record.get('예약 날짜')) and pd.notna(record.get('예약시간')):
+            return 'confirmed'
+        return 'waiting'
+
+    # 매칭된 레코드를 Panel5 정보로 업데이트 (해당 레코드만 UPSERT)
+    def apply_panel5_update(match_uid, row, participation_status):
+        fields = {}
+
+        # 참여 여부 업데이트
+        updated = pd.notna(participation_status) and participation_status != ''
+        if updated:
+            fields['참여여부결과'] = participation_status
+
+        # 예약 정보 업데이트
+        if pd.notna(row['예약 날짜']):
+            fields['예약 날짜'] = row['예약 날짜']
+        if pd.notna(row['확정 예약시간']):
+            fields['예약시간'] = row['확정 예약시간']
+
+        # 그룹 정보 추가
+        fields['그룹구분'] = 'PANEL5'
+
+        store.update_fields(match_uid, fields)
+        return updated
 
     print("\nPanel5 매칭 작업 시작...")
 
+    # 로마자 이름 후보 확인용 유사도 (matching_config.json)
+    roman_scorer = get_scorer('data_matching_panel5.roman_name')
+
     # 매칭된 레코드 추적
     matched_indices = []
     unmatched_update = []
     matched_count = 0
     updated_count = 0
 
-    # Panel5 데이터 순회
+    # Panel5 데이터 순회 (이름 인덱스로 조회)
     for idx, row in df_panel5.iterrows():
         matched = False
         participation_status = row['참여 여부 결과']
 
-        # 이름으로 매칭 시도
-        name_to_match = row['이름_정규화']
-        name_eng_to_match = row['NAME_정규화']
-
         # 한글 이름으로 매칭
-        if name_to_match:
-            matches = df_base[df_base['이름_정규화'] == name_to_match].index
-            if len(matches) > 0:
-                for match_idx in matches:
-                    # 참여 여부 업데이트
-                    if pd.notna(participation_status) and participation_status != '':
-                        df_base.at[match_idx, '참여여부결과'] = participation_status
-                        updated_count += 1
-
-                    # 예약 정보 업데이트
-                    if pd.notna(row['예약 날짜']):
-                        df_base.at[match_idx, '예약 날짜'] = row['예약 날짜']
-                    if pd.notna(row['확정 예약시간']):
-                        df_base.at[match_idx, '예약시간'] = row['확정 예약시간']
-
-                    # 그룹 정보 추가
-                    df_base.at[match_idx, '그룹구분'] = 'PANEL5'
-
-                    matched_indices.append(match_idx)
-                matched = True
-                matched_count += 1
-                print(f"  Panel5 매칭 성공 (한글): {row['이름']} -> {participation_status}")
+        matches = store.find_by_name(row['이름'])
+        if matches:
+            for match_uid in matches:
+                if apply_panel5_update(match_uid, row, participation_status):
+                    updated_count += 1
+                matched_indices.append(match_uid)
+            matched = True
+            matched_count += 1
+            print(f"  Panel5 매칭 성공 (한글): {row['이름']} -> {participation_status}")
 
         # 영문 이름으로 매칭 시도
-        if not matched and name_eng_to_match:
-            matches = df_base[df_base['이름_정규화'] == name_eng_to_match].index
-            if len(matches) > 0:
-                for match_idx in matches:
-                    # 참여 여부 업데이트
-                    if pd.notna(participation_status) and participation_status != '':
-                        df_base.at[match_idx, '참여여부결과'] = participation_status
+        if not matched:
+            matches = store.find_by_name(row['NAME'])
+            if matches:
+                for match_uid in matches:
+                    if apply_panel5_update(match_uid, row, participation_status):
                         updated_count += 1
-
-                    # 예약 정보 업데이트
-                    if pd.notna(row['예약 날짜']):
-                        df_base.at[match_idx, '예약 날짜'] = row['예약 날짜']
-                    if pd.notna(row['확정 예약시간']):
-                        df_base.at[match_idx, '예약시간'] = row['확정 예약시간']
-
-                    # 그룹 정보 추가
-                    df_base.at[match_idx, '그룹구분'] = 'PANEL5'
-
-                    matched_indices.append(match_idx)
+                    matched_indices.append(match_uid)
                 matched = True
                 matched_count += 1
                 print(f"  Panel5 매칭 성공 (영문): {row['NAME']} -> {participation_status}")
 
+        # 로마자 이름 블로킹 키로 후보 조회 후 같은 사람으로 확인된 작성자만 매칭
+        # (한글 이름 ↔ 영문 작성자, 성/이름 순서 무관)
+        if not matched:
+            for name in (row['이름'], row['NAME']):
+                matches = store.find_same_person(name, roman_scorer)
+                if matches:
+                    for match_uid in matches:
+                        if apply_panel5_update(match_uid, row, participation_status):
+                            updated_count += 1
+                        matched_indices.append(match_uid)
+                    matched = True
+                    matched_count += 1
+                    print(f"  Panel5 매칭 성공 (로마자): {name} -> {participation_status}")
+                    break
+
         # 미매칭 레코드 저장
-        if not matched and (name_to_match or name_eng_to_match):
+        if not matched and (name_key(row['이름']) or name_key(row['NAME'])):
             unmatched_update.append({
                 'UID': row['UID'],
                 '이름': row['이름'],
@@ -124,16 +135,16 @@ try:
             })
             print(f"  Panel5 미매칭: {row['이름']} / {row['NAME']}")
 
-    # 정규화 컬럼 제거
-    df_base = df_base.drop(columns=['이름_정규화'])
+    # 상태 업데이트 (참여 상태에 따라, 전체 레코드 - 값이 바뀌는 레코드만 UPSERT)
+    for uid, record in store.records():
+        status = derive_status(record)
+        if record.get('상태') != status:
+            store.update_fields(uid, {'상태': status})
+
+    store.commit()
 
-    # 상태 업데이트 (참여 상태에 따라)
-    df_base['상태'] = df_base.apply(lambda row:
-        'cancelled' if row.get('확정 여부') == 'x' or row.get('참여여부결과') in ['취소', '불가', '거부'] else
-        'completed' if row.get('참여여부결과') == '참여' else
-        'applied' if row.get('참여여부결과') in ['불참', '중복', '변경', '보류'] else
-        'confirmed' if pd.notna(row.get('예약 날짜')) and pd.notna(row.get('예약시간')) else
-        'waiting', axis=1)
+    # 저장소 내용을 export용 DataFrame으로 조회
+    df_base = apply_panel_dtypes(store.to_frame())
 
     print(f"\n매칭 결과:")
     print(f"  - Panel5 매칭된 레코드: {matched_count}개")
@@ -162,41 +173,37 @@ try:
     # 미매칭 데이터프레임 생성
     df_unmatched = pd.DataFrame(unmatched_update)
 
-    # Excel 파일로 저장 (두 개의 시트)
-    print(f"\n결과를 Excel 파일로 저장 중: {output_file}")
-    with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
-        # 매칭된 데이터 시트
-        df_base.to_excel(writer, sheet_name='매칭데이터', index=False)
-
-        # Panel5 미매칭 데이터 시트
-        if len(df_unmatched) > 0:
-            df_unmatched.to_excel(writer, sheet_name='Panel5_미매칭', index=False)
-        else:
-            # 빈 데이터프레임이라도 시트 생성
-            pd.DataFrame({'메시지': ['Panel5 미매칭 데이터 없음']}).to_excel(
-                writer, sheet_name='Panel5_미매칭', index=False
-            )
-
-        # 통계 시트
-        stats_data = {
-            '항목': ['전체 레코드', 'Panel5 매칭', 'Panel5 미매칭', '참여 완료', '예약 대기', '예약 확정', '신청 완료', '취소'],
-            '개수': [
-                len(df_base),
-                matched_count,
-                len(unmatched_update),
-                len(df_base[df_base['상태'] == 'completed']),
-                len(df_base[df_base['상태'] == 'waiting']),
-                len(df_base[df_base['상태'] == 'confirmed']),
-                len(df_base[df_base['상태'] == 'applied']),
-                len(df_base[df_base['상태'] == 'cancelled'])
-            ]
-        }
-        df_stats = pd.DataFrame(stats_data)
-        df_stats.to_excel(writer, sheet_name='통계', index=False)
-
-    # CSV로도 저장 (웹에서 사용)
+    # 미매칭 데이터 시트 (빈 데이터프레임이라도 시트 생성)
+    if len(df_unmatched) == 0:
+        df_unmatched = pd.DataFrame({'메시지': ['Panel5 미매칭 데이터 없음']})
+
+    # 통계 시트
+    stats_data = {
+        '항목': ['전체 레코드', 'Panel5 매칭', 'Panel5 미매칭', '참여 완료', '예약 대기', '예약 확정', '신청 완료', '취소'],
+        '개수': [
+            len(df_base),
+            matched_count,
+            len(unmatched_update),
+            len(df_base[df_base['상태'] == 'completed']),
+            len(df_base[df_base['상태'] == 'waiting']),
+            len(df_base[df_base['상태'] == 'confirmed']),
+            len(df_base[df_base['상태'] == 'applied']),
+            len(df_base[df_base['상태'] == 'cancelled'])
+        ]
+    }
+    df_stats = pd.DataFrame(stats_data)
+
+    # Excel(세 개의 시트)과 CSV(웹에서 사용하는 저장소 export view)를 한 번에 저장
     csv_output = '/Users/owlers_dylan/Metrix/source/Metrix_merged_final.csv'
-    df_base.to_csv(csv_output, index=False, encoding='utf-8-sig')
+    print(f"\n결과를 Excel 파일로 저장 중: {output_file}")
+    export_panel(
+        output_file,
+        [('매칭데이터', df_base), ('Panel5_미매칭', df_unmatched), ('통계', df_stats)],
+        csv_path=csv_output,
+        csv_sheet='매칭데이터'
+    )
+    store.mark_csv_synced(csv_output)
+    store.close()
     print(f"CSV 파일 업데이트: {csv_output}")
 
     print("\n✅ Panel5 매칭 작업이 성공적으로 완료되었습니다!")
@@ -4,6 +4,8 @@
 import pandas as pd
 import numpy as np
 
+from panel_schema import read_panel_csv
+
 def filter_panel_data():
     """
     통합된 K-Beauty 패널 데이터에서 특정 조건의 레코드를 제거
@@ -17,7 +19,7 @@ def filter_panel_data():
     input_file = '/Users/owlers_dylan/Metrix/source/K-Beauty_Panel_Merged.csv'
 
     print("CSV 파일 읽기...")
-    df = pd.read_csv(input_file, encoding='utf-8-sig')
+    df = read_panel_csv(input_file, encoding='utf-8-sig')
     initial_count = len(df)
     print(f"초기 레코드 수: {initial_count}")
 
@@ -37,7 +39,7 @@ def filter_panel_data():
         print(f"\n'{confirmed_col}' 필드 값 분포:")
         value_counts = df[confirmed_col].value_counts()
         for value, count in value_counts.items():
-            if pd.notna(value):
+            if pd.notna(value) and count > 0:
                 print(f"  - {value}: {count}개")
 
     # '참여여부결과' 필드 분석
@@ -45,7 +47,7 @@ def filter_panel_data():
         print(f"\n'참여여부결과' 필드 값 분포:")
         value_counts = df['참여여부결과'].value_counts()
         for value, count in value_counts.items():
-            if pd.notna(value):
+            if pd.notna(value) and count > 0:
                 print(f"  - {value}: {count}개")
 
     print("\n필터링 시작...")
@@ -68,6 +70,7 @@ def filter_panel_data():
         if removed_confirmed > 0:
             print(f"  - '확정 여부' 조건으로 제거할 레코드: {removed_confirmed}개")
             removed_values = df[mask_confirmed][confirmed_col].value_counts()
+            removed_values = removed_values[removed_values > 0]
             for value, count in removed_values.items():
                 print(f"    • {value}: {count}개")
 
@@ -88,6 +91,7 @@ def filter_panel_data():
         if removed_participation > 0:
             print(f"  - '참여여부결과' 조건으로 제거할 레코드: {removed_participation}개")
             removed_values = df[mask_participation]['참여여부결과'].value_counts()
+            removed_values = removed_values[removed_values > 0]
             for value, count in removed_values.items():
                 print(f"    • {value}: {count}개")
 
@@ -111,14 +115,14 @@ def filter_panel_data():
         remaining_values = df[confirmed_col].value_counts()
         print(f"\n'{confirmed_col}' 필드 남은 값들:")
         for value, count in remaining_values.head(10).items():
-            if pd.notna(value):
+            if pd.notna(value) and count > 0:
                 print(f"  - {value}: {count}개")
 
     if '참여여부결과' in df.columns:
         remaining_values = df['참여여부결과'].value_counts()
         print(f"\n'참여여부결과' 필드 남은 값들:")
         for value, count in remaining_values.head(10).items():
-            if pd.notna(value):
+            if pd.notna(value) and count > 0:
                 print(f"  - {value}: {count}개")
 
     # 결과 저장
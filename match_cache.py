@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+매칭 결과 캐시 (SQLite)
+
+매일 다시 실행할 때 대부분의 K-Beauty / Famigo / Metrix 레코드는 바뀌지 않았는데도
+모든 후보 쌍의 유사도를 처음부터 다시 계산합니다.
+- 질의/후보 레코드는 정규화 키의 해시로 식별 (키가 바뀐 레코드는 새 레코드로 취급)
+- 후보 목록에 새 후보가 추가될 때마다 세대(generation)를 올리고 후보별 최초 세대를 기록
+- 질의별 최고 매칭 결과를 계산 당시 세대와 함께 저장
+- 다음 실행에서는 그 세대 이후 추가된 후보만 계산하여 기존 결과와 비교
+  (저장된 최고 매칭 후보가 사라졌거나 질의 키가 바뀐 경우에만 전체 후보와 다시 계산)
+- 같은 점수면 앞 위치가 우선이므로 최고 매칭 앞쪽 후보 목록의 해시도 함께 저장하고,
+  앞쪽 목록이 달라졌으면 (같은 키의 행이 앞에 새로 들어온 경우 등) 그 앞쪽 후보도 다시 계산
+- 매칭 규칙(matcher version)이 바뀌면 해당 매칭의 캐시 전체를 무효화
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+
+from parallel_match import parallel_match
+
+# 기본 캐시 경로
+CACHE_FILE = '/Users/owlers_dylan/Metrix/source/match_cache.db'
+
+
+def cache_enabled():
+    """METRIX_MATCH_CACHE=0 이면 캐시 없이 항상 전체 계산 (호출 시점의 환경 변수 기준)"""
+    return os.getenv('METRIX_MATCH_CACHE', '1') == '1'
+
+
+def key_hash(key):
+    """정규화 키(문자열 또는 튜플)의 해시"""
+    text = json.dumps(key, ensure_ascii=False, default=str)
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def prefix_digests(hashes):
+    """위치별 앞쪽 후보 목록의 해시 (prefix_digests(h)[k] = h[:k]의 해시)"""
+    digest = hashlib.sha1()
+    result = [digest.hexdigest()]
+    for h in hashes:
+        digest.update(h.encode('ascii'))
+        result.append(digest.hexdigest())
+    return result
+
+
+class MatchCache:
+    """질의별 최고 매칭 결과 캐시"""
+
+    def __init__(self, path=CACHE_FILE):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS matchers (
+                matcher TEXT PRIMARY KEY,
+                version TEXT NOT NULL,
+                generation INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS candidates (
+                matcher TEXT NOT NULL,
+                hash TEXT NOT NULL,
+                generation INTEGER NOT NULL,
+                PRIMARY KEY (matcher, hash)
+            );
+            CREATE TABLE IF NOT EXISTS decisions (
+                matcher TEXT NOT NULL,
+                query_hash TEXT NOT NULL,
+                best_hash TEXT,
+                score REAL,
+                detail TEXT,
+                generation INTEGER NOT NULL,
+                prefix_digest TEXT,
+                PRIMARY KEY (matcher, query_hash)
+            );
+        """)
+
+        # 이전 버전 캐시에 최고 매칭 앞쪽 후보 목록 해시 컬럼 추가
+        existing = {row[1] for row in self.conn.execute('PRAGMA table_info(decisions)')}
+        if 'prefix_digest' not in existing:
+            self.conn.execute('ALTER TABLE decisions ADD COLUMN prefix_digest TEXT')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.conn.commit()
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    # ------------------------------------------------------------------
+    # 후보 세대 관리
+    # ------------------------------------------------------------------
+    def _advance(self, matcher, version, candidate_hashes):
+        """
+        현재 후보 목록을 반영하고 (현재 세대, 후보 해시별 최초 세대) 반환
+        사라진 후보는 삭제하여 다시 추가되면 새 후보로 취급
+        """
+        row = self.conn.execute(
+            'SELECT version, generation FROM matchers WHERE matcher = ?', (matcher,)
+        ).fetchone()
+        if row is None or row[0] != version:
+            # 매칭 규칙이 바뀌면 캐시 전체 무효화
+            self.conn.execute('DELETE FROM candidates WHERE matcher = ?', (matcher,))
+            self.conn.execute('DELETE FROM decisions WHERE matcher = ?', (matcher,))
+            generation = 0
+        else:
+            generation = row[1]
+
+        known = dict(self.conn.execute(
+            'SELECT hash, generation FROM candidates WHERE matcher = ?', (matcher,)
+        ))
+        current = set(candidate_hashes)
+
+        removed = [h for h in known if h not in current]
+        added = [h for h in current if h not in known]
+        if added:
+            generation += 1
+
+        self.conn.executemany(
+            'DELETE FROM candidates WHERE matcher = ? AND hash = ?',
+            [(matcher, h) for h in removed]
+        )
+        self.conn.executemany(
+            'INSERT INTO candidates (matcher, hash, generation) VALUES (?, ?, ?)',
+            [(matcher, h, generation) for h in added]
+        )
+        self.conn.execute(
+            'INSERT OR REPLACE INTO matchers (matcher, version, generation) VALUES (?, ?, ?)',
+            (matcher, version, generation)
+        )
+
+        first_seen = {h: g for h, g in known.items() if h in current}
+        first_seen.update({h: generation for h in added})
+        return generation, first_seen
+
+    # ------------------------------------------------------------------
+    # 매칭
+    # ------------------------------------------------------------------
+    def match(self, matcher, version, func, queries, query_keys, candidates, candidate_keys,
+              workers=None):
+        """
+        캐시를 사용하여 각 질의의 최고 매칭 계산
+
+        func(query, candidates, positions): positions(None이면 전체) 후보 중 최고 매칭
+            반환: (후보 위치 또는 None, 점수, 부가 정보...) - 같은 점수면 앞 위치 우선
+        query_keys / candidate_keys: 질의/후보별 정규화 키 (레코드 변경 여부 판단용)
+        반환: 질의 순서대로 func과 같은 형태의 결과 목록
+        """
+        query_hashes = [key_hash(key) for key in query_keys]
+        candidate_hashes = [key_hash(key) for key in candidate_keys]
+
+        generation, first_seen = self._advance(matcher, version, candidate_hashes)
+        prefixes = prefix_digests(candidate_hashes)
+
+        position_of = {}
+        for pos, h in enumerate(candidate_hashes):
+            position_of.setdefault(h, pos)
+
+        cached = {}
+        for query_hash, best_hash, score, detail, decided, prefix in self.conn.execute(
+            'SELECT query_hash, best_hash, score, detail, generation, prefix_digest FROM decisions '
+            'WHERE matcher = ?',
+            (matcher,)
+        ):
+            cached[query_hash] = (best_hash, score, json.loads(detail) if detail else [], decided, prefix)
+
+        # 세대별 새 후보 위치 (같은 세대에 결정된 질의끼리 공유)
+        new_positions = {}
+
+        def added_since(decided):
+            if decided not in new_positions:
+                new_positions[decided] = [
+                    pos for pos, h in enumerate(candidate_hashes) if first_seen[h] > decided
+                ]
+            return new_positions[decided]
+
+        results = [None] * len(queries)
+        tasks = []
+        task_index = []
+        reused = 0
+        partial = 0
+        for i, (query, query_hash) in enumerate(zip(queries, query_hashes)):
+            decision = cached.get(query_hash)
+            if decision is not None:
+                best_hash, score, detail, decided, prefix = decision
+                if best_hash is None or best_hash in position_of:
+                    positions = added_since(decided)
+                    best_pos = position_of.get(best_hash) if best_hash else None
+                    results[i] = (best_pos, score if best_hash else 0, *detail)
+                    if best_pos is not None and prefix != prefixes[best_pos]:
+                        # 최고 매칭 앞쪽 후보가 달라짐: 같은 점수의 기존 키가 앞에 올 수 있으므로 함께 계산
+                        positions = sorted(set(range(best_pos)).union(positions))
+                    if not positions:
+                        reused += 1
+                        continue
+                    # 추가된 후보만 계산하여 기존 결과와 비교
+                    partial += 1
+                    tasks.append((query, positions))
+                    task_index.append(i)
+                    continue
+            # 처음 보는 질의 또는 최고 매칭 후보가 사라진 경우 전체 계산
+            tasks.append((query, None))
+            task_index.append(i)
+
+        def run_task(task, shared_candidates):
+            query, positions = task
+            return func(query, shared_candidates, positions)
+
+        computed = parallel_match(run_task, tasks, candidates, workers=workers)
+
+        for i, result in zip(task_index, computed):
+            previous = results[i]
+            if previous is not None and previous[0] is not None:
+                # 기존 최고 매칭과 비교 (점수가 더 높거나, 같으면 앞 위치 우선)
+                if result[0] is None or (previous[1], -previous[0]) > (result[1], -result[0]):
+                    result = previous
+            results[i] = tuple(result)
+
+        rows = []
+        for i, query_hash in enumerate(query_hashes):
+            best_pos, score, *detail = results[i]
+            best_hash = candidate_hashes[best_pos] if best_pos is not None else None
+            rows.append((
+                matcher, query_hash, best_hash, score,
+                json.dumps(detail, ensure_ascii=False, default=str), generation,
+                prefixes[best_pos] if best_pos is not None else None
+            ))
+        self.conn.executemany("""
+            INSERT OR REPLACE INTO decisions
+                (matcher, query_hash, best_hash, score, detail, generation, prefix_digest)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, rows)
+        self.conn.commit()
+
+        print(f"   - 매칭 캐시: {reused}건 재사용, {partial}건 새 후보만 계산, "
+              f"{len(tasks) - partial}건 전체 계산 (후보 세대 {generation})")
+        return results
+
+
+def cached_match(matcher, version, func, queries, query_keys, candidates, candidate_keys,
+                 workers=None, path=CACHE_FILE):
+    """
+    MatchCache.match() 실행 (METRIX_MATCH_CACHE=0 이면 캐시 없이 전체 계산)
+    """
+    if not cache_enabled():
+        return parallel_match(
+            lambda query, shared_candidates: func(query, shared_candidates, None),
+            queries, candidates, workers=workers
+        )
+    with MatchCache(path) as cache:
+        return cache.match(matcher, version, func, queries, query_keys, candidates,
+                           candidate_keys, workers=workers)
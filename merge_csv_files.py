@@ -1,49 +1,30 @@
 #!/usr/bin/env python3
 import pandas as pd
 import numpy as np
-import re
-from difflib import SequenceMatcher
 import warnings
 warnings.filterwarnings('ignore')
 
-def normalize_phone(phone):
-    if pd.isna(phone):
-        return None
-    phone = str(phone).strip()
-    phone = re.sub(r'[^0-9]', '', phone)
-    if len(phone) == 10 and phone.startswith('10'):
-        phone = '0' + phone
-    elif len(phone) == 11 and phone.startswith('010'):
-        pass
-    else:
-        return None
-    return phone
-
-def normalize_email(email):
-    if pd.isna(email):
-        return None
-    email = str(email).strip().lower()
-    if '@' not in email:
-        return None
-    return email
-
-def calculate_similarity(str1, str2):
+from panel_keys import KEY_COLUMNS, materialize_keys, mobile_phone_key
+from similarity import get_scorer
+
+# 이메일 유사도 backend (matching_config.json)
+email_similarity = get_scorer('merge_csv_files.email')
+
+def calculate_similarity(str1, str2, cutoff=0.0):
     if pd.isna(str1) or pd.isna(str2):
         return 0
-    return SequenceMatcher(None, str(str1), str(str2)).ratio()
-
-def find_duplicates(df, phone_col='전화번호', email_col='이메일'):
-    df = df.copy()
+    return email_similarity(str(str1), str(str2), cutoff)
 
+def find_duplicates(df, phone_col='전화번호'):
+    """
+    전화번호(phone_col의 유효한 010 번호)와 정규화 이메일 키(key_email) 기준 중복 행 찾기
+    유효하지 않은 번호는 비교하지 않음 ('0', 일부 번호 등이 같다고 중복 처리되지 않도록)
+    """
     if phone_col in df.columns:
-        df['normalized_phone'] = df[phone_col].apply(normalize_phone)
+        phones = [mobile_phone_key(phone) for phone in df[phone_col].tolist()]
     else:
-        df['normalized_phone'] = None
-
-    if email_col in df.columns:
-        df['normalized_email'] = df[email_col].apply(normalize_email)
-    else:
-        df['normalized_email'] = None
+        phones = [None] * len(df)
+    emails = df['key_email'].tolist()
 
     duplicate_indices = set()
 
@@ -51,15 +32,15 @@ def find_duplicates(df, phone_col='전화번호', email_col='이메일'):
         if i in duplicate_indices:
             continue
 
-        current_phone = df.iloc[i]['normalized_phone']
-        current_email = df.iloc[i]['normalized_email']
+        current_phone = phones[i]
+        current_email = emails[i]
 
         for j in range(i + 1, len(df)):
             if j in duplicate_indices:
                 continue
 
-            other_phone = df.iloc[j]['normalized_phone']
-            other_email = df.iloc[j]['normalized_email']
+            other_phone = phones[j]
+            other_email = emails[j]
 
             phone_match = False
             if current_phone and other_phone:
@@ -67,8 +48,8 @@ def find_duplicates(df, phone_col='전화번호', email_col='이메일'):
 
             email_match = False
             if current_email and other_email:
-                similarity = calculate_similarity(current_email, other_email)
-                email_match = (current_email == other_email) or (similarity > 0.85)
+                email_match = (current_email == other_email) or \
+                    (calculate_similarity(current_email, other_email, cutoff=0.85) > 0.85)
 
             if phone_match or email_match:
                 duplicate_indices.add(j)
@@ -111,21 +92,37 @@ print("이메일과 전화번호 기반으로 중복 확인 중...")
 phone_col = None
 email_col = None
 
-for col in combined_df.columns:
-    if '전화번호' in col or 'phone' in col.lower() or '연락처' in col:
-        phone_col = col
-        break
+# 전화번호가 여러 컬럼에 있을 수 있으므로 모두 찾음 (중복 판정은 첫 번째 컬럼 기준)
+phone_cols = [col for col in combined_df.columns
+              if '전화번호' in col or 'phone' in col.lower() or '연락처' in col]
+if phone_cols:
+    phone_col = phone_cols[0]
 
 for col in combined_df.columns:
     if '이메일' in col or 'email' in col.lower():
         email_col = col
         break
 
-print(f"  - 전화번호 컬럼: {phone_col}")
+name_col = None
+for col in combined_df.columns:
+    if '이름' in col or 'name' in col.lower():
+        name_col = col
+        break
+
+print(f"  - 전화번호 컬럼: {phone_col} (키 생성: {phone_cols})")
 print(f"  - 이메일 컬럼: {email_col}")
+print(f"  - 이름 컬럼: {name_col}")
+
+# 정규화 키를 한 번만 계산하여 통합 파일에 함께 저장 (이후 매칭 스크립트에서 재사용)
+combined_df = materialize_keys(
+    combined_df,
+    name_cols=[name_col],
+    email_cols=[email_col if email_col else '이메일'],
+    phone_cols=phone_cols or ['전화번호']
+)
 
 if phone_col or email_col:
-    duplicate_indices = find_duplicates(combined_df, phone_col=phone_col if phone_col else '전화번호', email_col=email_col if email_col else '이메일')
+    duplicate_indices = find_duplicates(combined_df, phone_col=phone_col if phone_col else '전화번호')
     print(f"발견된 중복 행 수: {len(duplicate_indices)}")
     clean_df = combined_df.drop(index=duplicate_indices).reset_index(drop=True)
 else:
@@ -157,6 +154,8 @@ airtable_columns_mapping = {
 renamed_columns = {}
 for target_col, possible_names in airtable_columns_mapping.items():
     for col in clean_df.columns:
+        if col in KEY_COLUMNS:
+            continue
         if any(name in col for name in possible_names):
             renamed_columns[col] = target_col
             break
@@ -175,15 +174,11 @@ for col in important_columns:
         final_columns.append(col)
 
 for col in clean_df.columns:
-    if col not in final_columns and col not in ['normalized_phone', 'normalized_email', 'source_file']:
+    if col not in final_columns and col not in KEY_COLUMNS and col != 'source_file':
         final_columns.append(col)
 
-clean_df = clean_df[final_columns]
-
-if 'normalized_phone' in clean_df.columns:
-    clean_df = clean_df.drop(columns=['normalized_phone'])
-if 'normalized_email' in clean_df.columns:
-    clean_df = clean_df.drop(columns=['normalized_email'])
+# 정규화 키 컬럼은 맨 뒤에 유지
+clean_df = clean_df[final_columns + KEY_COLUMNS]
 
 output_path = '/Users/owlers_dylan/Metrix/source/K-Beauty_Panel_Integrated.csv'
 clean_df.to_csv(output_path, index=False, encoding='utf-8-sig')
@@ -3,6 +3,8 @@
 import pandas as pd
 import numpy as np
 
+from panel_store import STORE_FILE, PanelStore
+
 # 파일 경로
 metrix_file = '/Users/owlers_dylan/Metrix/source/Metrix_최종_20250917_sorted_by_AO_fixed.csv'
 kbeauty_file = '/Users/owlers_dylan/Metrix/source/K-Beauty_Skin_Care_Panel_Data - Details.csv'
@@ -120,9 +122,15 @@ try:
     # 컬럼 순서 재정렬
     df_merged = df_merged[priority_columns + other_columns]
 
-    # CSV로 저장
-    print(f"\n병합된 데이터를 저장 중: {output_file}")
-    df_merged.to_csv(output_file, index=False, encoding='utf-8-sig')
+    # 패널 저장소에 반영 (이후 업데이트 스크립트는 저장소에 UPSERT)
+    print(f"\n패널 저장소에 반영 중: {STORE_FILE}")
+    with PanelStore(STORE_FILE) as store:
+        store.import_frame(df_merged)
+
+        # CSV로 저장 (저장소의 export view)
+        print(f"\n병합된 데이터를 저장 중: {output_file}")
+        df_merged.to_csv(output_file, index=False, encoding='utf-8-sig')
+        store.mark_csv_synced(output_file)
 
     print("✅ 성공적으로 완료되었습니다!")
     print(f"최종 데이터: {df_merged.shape[0]}개 행, {df_merged.shape[1]}개 컬럼")
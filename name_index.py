@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+이름 인덱스 (이름 매칭 후보 생성)
+
+이름 하나를 매칭할 때마다 전체 후보와 유사도를 계산하지 않도록
+유사도가 기준값 이상이 될 수 있는 후보만 골라냅니다.
+- 이름 문자 역색인(inverted index)으로 질의와 공통 문자 수를 한 번에 계산
+- 공통 문자 수로 구한 backend별 유사도 상한(similarity.upper_bound)이 기준값 미만인 후보는 제외
+- 완전 일치 / 부분 일치(한 이름이 다른 이름에 포함, 0.9점) 후보는 상한과 관계없이 포함
+- 기준값 이상인 후보는 모두 남으므로 전체 후보와 비교한 결과와 항상 같음 (후보 위치는 원래 순서)
+"""
+
+from collections import Counter, defaultdict
+
+import numpy as np
+
+from similarity import DEFAULT_BACKEND, load_matching_config, upper_bound
+
+# 상한과 기준값 비교 시 부동소수점 오차 허용치 (후보를 빠뜨리지 않는 쪽으로)
+BOUND_EPSILON = 1e-9
+
+
+def index_enabled(matcher):
+    """
+    매칭 스크립트에서 이름 인덱스를 사용할지 여부 (matching_config.json의 name_index)
+    설정이 없으면 인덱스를 사용하지 않고 전체 후보와 비교
+    """
+    return bool(load_matching_config().get('name_index', {}).get(matcher, False))
+
+
+class NameIndex:
+    """이름 문자 역색인"""
+
+    def __init__(self, names, backend=DEFAULT_BACKEND):
+        self.names = list(names)
+        self.backend = backend
+        self.lengths = np.array([len(name) if name else 0 for name in self.names], dtype=np.int64)
+
+        postings = defaultdict(lambda: ([], []))
+        exact = defaultdict(list)
+        for pos, name in enumerate(self.names):
+            if not name:
+                continue
+            exact[name].append(pos)
+            for char, count in Counter(name).items():
+                postings[char][0].append(pos)
+                postings[char][1].append(count)
+        self.postings = {
+            char: (np.array(positions, dtype=np.int64), np.array(counts, dtype=np.int64))
+            for char, (positions, counts) in postings.items()
+        }
+        self.exact = dict(exact)
+
+    def __len__(self):
+        return len(self.names)
+
+    def common_chars(self, query):
+        """질의와 각 이름의 공통 문자 수 (순서 무관)"""
+        common = np.zeros(len(self.names), dtype=np.int64)
+        for char, count in Counter(query).items():
+            if char in self.postings:
+                positions, counts = self.postings[char]
+                common[positions] += np.minimum(counts, count)
+        return common
+
+    def candidates(self, query, threshold):
+        """유사도가 threshold 이상일 수 있는 후보 위치 전체 (원래 순서, 동점 처리도 전체 비교와 동일)"""
+        if not query:
+            return []
+
+        common = self.common_chars(query)
+        hits = np.flatnonzero(common)
+        bounds = upper_bound(self.backend, common[hits], len(query), self.lengths[hits])
+        keep = set(hits[bounds >= threshold - BOUND_EPSILON].tolist())
+
+        # 질의를 포함하는 이름 (질의 문자가 모두 공통 문자인 이름 중에서 확인)
+        for pos in hits[common[hits] == len(query)].tolist():
+            if query in self.names[pos]:
+                keep.add(pos)
+
+        # 질의에 포함되는 이름 (완전 일치 포함)
+        for start in range(len(query)):
+            for end in range(start + 1, len(query) + 1):
+                keep.update(self.exact.get(query[start:end], ()))
+
+        return sorted(keep)
@@ -6,11 +6,13 @@ from datetime import datetime
 import warnings
 warnings.filterwarnings('ignore')
 
+from panel_schema import read_panel_csv
+
 print("K-Beauty 데이터 정규화 시작...")
 
 # 1. 데이터 로드
 print("\n1. 데이터 로드 중...")
-df = pd.read_csv('/Users/owlers_dylan/Metrix/source/K-Beauty_Panel_Airtable_Ready.csv')
+df = read_panel_csv('/Users/owlers_dylan/Metrix/source/K-Beauty_Panel_Airtable_Ready.csv')
 print(f"   - 원본 데이터: {len(df)} 행")
 
 # 변경 사항 추적
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+패널 데이터 CSV/Excel 일괄 export
+
+pd.ExcelWriter(engine='openpyxl')는 전체 워크북을 메모리에 올린 뒤 저장하므로
+수만 행 × 80개 이상 컬럼에서 느리고 메모리를 많이 사용합니다.
+- DataFrame을 한 번만 Python 행 목록으로 변환하고 CSV/XLSX 모두 이 결과를 사용
+- XLSX는 스트리밍 모드로 작성 (xlsxwriter constant_memory, 없으면 openpyxl write_only)
+- 필요 시 CSV와 XLSX를 병렬로 작성
+"""
+
+import csv
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# 병렬 export 기본값 (METRIX_PARALLEL_EXPORT=1 이면 CSV/XLSX 동시 작성)
+PARALLEL_EXPORT = os.getenv('METRIX_PARALLEL_EXPORT', '0') == '1'
+
+
+def _cell_value(value):
+    """셀 값을 Excel/CSV writer가 처리할 수 있는 Python 기본 타입으로 변환"""
+    if value is None or value is pd.NA or value is pd.NaT:
+        return None
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+    if isinstance(value, np.generic):
+        return _cell_value(value.item())
+    return value
+
+
+def frame_rows(df):
+    """DataFrame을 (헤더, 행 목록)으로 한 번만 변환"""
+    header = [str(col) for col in df.columns]
+    rows = [
+        [_cell_value(value) for value in values]
+        for values in df.itertuples(index=False, name=None)
+    ]
+    return header, rows
+
+
+def write_csv(path, header, rows):
+    """변환된 행을 CSV로 작성 (utf-8-sig, 웹에서 사용)"""
+    with open(path, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+def _write_xlsx_xlsxwriter(path, sheets):
+    import xlsxwriter
+
+    workbook = xlsxwriter.Workbook(path, {
+        'constant_memory': True,
+        'default_date_format': 'yyyy-mm-dd hh:mm:ss',
+        'strings_to_numbers': False,
+        'strings_to_formulas': False,
+        'strings_to_urls': False
+    })
+    try:
+        for sheet_name, (header, rows) in sheets:
+            worksheet = workbook.add_worksheet(sheet_name)
+            worksheet.write_row(0, 0, header)
+            for row_idx, row in enumerate(rows, start=1):
+                worksheet.write_row(row_idx, 0, row)
+    finally:
+        workbook.close()
+
+
+def _write_xlsx_openpyxl(path, sheets):
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    for sheet_name, (header, rows) in sheets:
+        worksheet = workbook.create_sheet(sheet_name)
+        worksheet.append(header)
+        for row in rows:
+            worksheet.append(row)
+    workbook.save(path)
+
+
+def write_xlsx(path, sheets):
+    """
+    변환된 시트들을 스트리밍 모드로 XLSX 작성
+    sheets: [(시트명, (헤더, 행 목록)), ...]
+    """
+    try:
+        _write_xlsx_xlsxwriter(path, sheets)
+    except ImportError:
+        _write_xlsx_openpyxl(path, sheets)
+
+
+def export_panel(xlsx_path, sheets, csv_path=None, csv_sheet=None, parallel=None):
+    """
+    여러 시트를 XLSX로, 그 중 하나의 시트를 CSV로 함께 export
+
+    sheets: [(시트명, DataFrame), ...]
+    csv_sheet: CSV로도 저장할 시트명 (기본: 첫 번째 시트)
+    parallel: True면 CSV/XLSX를 동시에 작성 (기본: METRIX_PARALLEL_EXPORT)
+    """
+    if parallel is None:
+        parallel = PARALLEL_EXPORT
+
+    start = datetime.now()
+
+    # DataFrame → 행 목록 변환은 시트마다 한 번만 수행
+    converted = [(name, frame_rows(df)) for name, df in sheets]
+
+    jobs = [(write_xlsx, (xlsx_path, converted))]
+    if csv_path:
+        csv_name = csv_sheet or converted[0][0]
+        header, rows = dict(converted)[csv_name]
+        jobs.append((write_csv, (csv_path, header, rows)))
+
+    if parallel and len(jobs) > 1:
+        with ThreadPoolExecutor(max_workers=len(jobs)) as executor:
+            futures = [executor.submit(func, *args) for func, args in jobs]
+            for future in futures:
+                future.result()
+    else:
+        for func, args in jobs:
+            func(*args)
+
+    elapsed = (datetime.now() - start).total_seconds()
+    print(f"  export 완료 ({elapsed:.2f}초)")
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+매칭용 정규화 키 생성 (key materialization)
+
+전화번호/이메일/이름 정규화를 스크립트마다 다시 구현하고 매번 다시 계산하지 않도록
+레코드별 정규화 키를 한 번만 계산하여 중간 데이터에 컬럼으로 함께 저장합니다.
+- key_phone: 숫자만, 10xxxxxxxx → 010xxxxxxxx, 국제번호(82) → 0으로 시작하는 국내 형식
+  (전화번호 컬럼이 여러 개면 앞 컬럼부터 첫 번째 유효한 값)
+- key_email: 소문자, '@' 없으면 없음
+- key_name: 소문자, 공백/특수문자 제거 (한글 이름 포함)
+- key_name_roman: 한글/로마자 표기 무관 이름 블로킹 키 (romanize.name_block_key)
+- key_version: 키 생성 규칙 버전 (규칙이 바뀌면 하위 스크립트가 다시 계산)
+"""
+
+import re
+
+import pandas as pd
+
+from romanize import name_block_key, name_block_keys
+
+# 키 생성 규칙이 바뀌면 버전을 올려서 저장된 키를 다시 계산하게 함
+KEY_VERSION = 4
+
+KEY_COLUMNS = ['key_phone', 'key_email', 'key_name', 'key_name_roman', 'key_version']
+
+# CSV에서 키를 다시 읽을 때 전화번호 키가 숫자로 변환되지 않도록 read_csv(dtype=...)에 사용
+KEY_DTYPES = {col: str for col in KEY_COLUMNS[:-1]}
+
+
+def phone_key(phone):
+    """전화번호 키 (82 국제번호 처리 포함)"""
+    if pd.isna(phone):
+        return None
+    phone = re.sub(r'[^0-9]', '', str(phone).strip())
+    if not phone:
+        return None
+
+    # 010으로 시작하는 11자리 또는 10자리 번호 정규화
+    if len(phone) == 10 and phone.startswith('10'):
+        phone = '0' + phone
+    elif len(phone) == 11 and phone.startswith('821'):
+        # 국제번호 형식 처리 (82-10-xxxx-xxxx 에서 앞자리 0이 빠진 경우)
+        phone = '0' + phone[2:]
+    elif len(phone) == 12 and phone.startswith('8210'):
+        # 국제번호 형식 처리 (82-10-xxxx-xxxx)
+        phone = '0' + phone[2:]
+
+    return phone
+
+
+def mobile_phone_key(phone):
+    """
+    010으로 시작하는 11자리 휴대폰 번호 키, 그 외('0', 일부 번호, 해외 번호 등)는 None
+    중복 제거처럼 잘못된 값끼리 같은 사람으로 묶이면 안 되는 비교에 사용
+    """
+    phone = phone_key(phone)
+    if phone and len(phone) == 11 and phone.startswith('010'):
+        return phone
+    return None
+
+
+def email_key(email):
+    """이메일 키"""
+    if pd.isna(email):
+        return None
+    email = str(email).strip().lower()
+    if '@' not in email:
+        return None
+    return email
+
+
+def name_key(name):
+    """이름 키 - 소문자 변환, 공백 및 특수문자 제거"""
+    if pd.isna(name):
+        return None
+    name = ''.join(e for e in str(name).strip().lower() if e.isalnum())
+    return name or None
+
+
+def roman_name_key(name):
+    """로마자 이름 키 - 한글/로마자 표기, 성/이름 순서 무관 (김민지 == Kim Minji == Minji Kim)"""
+    return name_block_key(name)
+
+
+def roman_name_keys(name):
+    """로마자 이름 키로 조회할 후보 키 목록 (한글 이름은 eo/eu 관용 표기 후보 포함)"""
+    return name_block_keys(name)
+
+
+def _map_unique(series, func):
+    """고유값에 대해서만 정규화 함수를 실행하고 결과를 매핑"""
+    values = series.dropna().unique()
+    mapping = {value: func(value) for value in values}
+    return series.map(mapping).astype(object).where(series.notna(), None)
+
+
+def _first_valid(df, columns, func):
+    """여러 컬럼 중 첫 번째로 유효한 키 사용"""
+    result = pd.Series([None] * len(df), index=df.index, dtype=object)
+    for col in columns:
+        if col and col in df.columns:
+            result = result.combine_first(_map_unique(df[col], func))
+    return result.astype(object).where(result.notna(), None)
+
+
+def materialize_keys(df, name_cols=(), email_cols=(), phone_cols=()):
+    """정규화 키 컬럼을 계산하여 DataFrame에 추가"""
+    df['key_phone'] = _first_valid(df, phone_cols, phone_key)
+    df['key_email'] = _first_valid(df, email_cols, email_key)
+    df['key_name'] = _first_valid(df, name_cols, name_key)
+    df['key_name_roman'] = _first_valid(df, name_cols, roman_name_key)
+    df['key_version'] = KEY_VERSION
+    return df
+
+
+def has_current_keys(df):
+    """저장된 키가 현재 버전으로 만들어졌는지 확인"""
+    if not all(col in df.columns for col in KEY_COLUMNS):
+        return False
+    phones = df['key_phone']
+    if pd.api.types.is_numeric_dtype(phones) and phones.notna().any():
+        # dtype 지정 없이 읽어 앞자리 0이 사라진 경우
+        return False
+    versions = pd.to_numeric(df['key_version'], errors='coerce')
+    return bool(len(df) == 0 or (versions == KEY_VERSION).all())
+
+
+def ensure_keys(df, name_cols=(), email_cols=(), phone_cols=()):
+    """저장된 키가 현재 버전이면 그대로 사용하고, 아니면 다시 계산"""
+    if has_current_keys(df):
+        # CSV에서 읽은 빈 값(NaN)을 None으로 통일
+        for col in KEY_COLUMNS[:-1]:
+            df[col] = df[col].astype(object).where(df[col].notna(), None)
+        print(f"   - 저장된 정규화 키 사용 (v{KEY_VERSION})")
+        return df
+    print(f"   - 정규화 키 생성 (v{KEY_VERSION})")
+    return materialize_keys(df, name_cols, email_cols, phone_cols)
+
+
+def drop_keys(df):
+    """정규화 키 컬럼 제거"""
+    return df.drop(columns=KEY_COLUMNS, errors='ignore')
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+패널 DataFrame 공통 dtype 스키마
+
+성별, 국적, 예약 지점, 참여 여부, 확정 여부, 상태, 그룹구분처럼 값 종류가 적은 컬럼은
+object 대신 category로 읽어 메모리를 줄이고 value_counts()/isin 통계를 빠르게 합니다.
+- 열거형 컬럼: category
+- 식별자/이름/연락처 컬럼: nullable string
+- 정수 컬럼: nullable Int64
+- 정규화된 날짜 컬럼: datetime64 (parse_dates=True 일 때만)
+"""
+
+import pandas as pd
+
+# 값 종류가 적은 열거형 컬럼 (한글 원본 컬럼명 + 영문 변환 컬럼명)
+CATEGORICAL_COLUMNS = [
+    'gender', 'nationality', 'reservation_location', 'participation_result',
+    'confirmation_status', 'data_source', 'match_type',
+    '확정 여부', '참여여부결과', '상태', '그룹구분', '예약 지점', '회원정보국가'
+]
+
+# 문자열 컬럼 (숫자처럼 보이는 전화번호가 float으로 읽히지 않도록)
+STRING_COLUMNS = [
+    'UID', 'uid', 'name', 'email', 'phone', 'famigo_id', 'famigo_match_key',
+    '아이디', '작성자', '이름', 'NAME', '연락처', '21-1, Please write your phone number.',
+    'key_phone', 'key_email', 'key_name', 'key_name_roman'
+]
+
+# 정수 컬럼 (결측값 허용)
+INTEGER_COLUMNS = ['no', 'seq']
+
+# normalize_data.py 이후 YYYY-MM-DD 형식이 보장되는 날짜 컬럼
+DATE_COLUMNS = ['reservation_date']
+
+
+def panel_dtypes():
+    """read_csv(dtype=...)에 전달할 컬럼별 dtype (없는 컬럼은 pandas가 무시)"""
+    dtypes = {}
+    dtypes.update({col: 'category' for col in CATEGORICAL_COLUMNS})
+    dtypes.update({col: 'string' for col in STRING_COLUMNS})
+    dtypes.update({col: 'Int64' for col in INTEGER_COLUMNS})
+    return dtypes
+
+
+def parse_panel_dates(df):
+    """정규화된 날짜 컬럼을 datetime64로 변환 (형식이 다른 값은 NaT)"""
+    for col in DATE_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], format='%Y-%m-%d', errors='coerce')
+    return df
+
+
+def read_panel_csv(path, parse_dates=False, **kwargs):
+    """패널 스키마를 적용하여 CSV 읽기"""
+    dtype = panel_dtypes()
+    dtype.update(kwargs.pop('dtype', None) or {})
+    df = pd.read_csv(path, dtype=dtype, **kwargs)
+    if parse_dates:
+        parse_panel_dates(df)
+    return df
+
+
+def apply_panel_dtypes(df):
+    """
+    이미 메모리에 있는 DataFrame에 스키마 적용 (저장소 조회 결과 등)
+    스키마와 맞지 않는 값이 섞인 컬럼이 있으면 컬럼명과 함께 ValueError
+    (이후 코드가 category 등 스키마 dtype을 전제하므로 조용히 넘어가지 않음)
+    """
+    for col, dtype in panel_dtypes().items():
+        if col in df.columns:
+            try:
+                df[col] = df[col].astype(dtype)
+            except (TypeError, ValueError) as e:
+                raise ValueError(f"'{col}' 컬럼을 {dtype}(으)로 변환할 수 없습니다: {e}") from e
+    return df
+
+
+def add_categories(df, column, values):
+    """category 컬럼에 새 값을 대입하기 전에 카테고리 추가"""
+    series = df[column]
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        new_values = [v for v in values if v not in series.cat.categories]
+        if new_values:
+            df[column] = series.cat.add_categories(new_values)
+    return df
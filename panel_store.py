@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Metrix 패널 로컬 저장소 (SQLite)
+
+Metrix_merged_final.csv 대신 패널 데이터의 원본(system of record) 역할을 합니다.
+- 레코드 키: 아이디(이메일), 없으면 행 순번 기반 키
+- 정규화 키(panel_keys) 이름/전화번호/이메일 컬럼에 인덱스를 두어 매칭 시 전체 스캔을 피함
+- 로마자 이름 블로킹 키 인덱스로 한글 이름 ↔ 영문 작성자 후보를 한 번의 조회로 찾고 작성자 이름으로 확인
+- 업데이트 스크립트는 변경된 레코드만 UPSERT 하고, CSV/Excel은 export 결과물로 생성
+- 마지막으로 가져오거나 export한 CSV의 해시를 기록해 두고, 그 뒤 CSV가 직접 수정되었으면
+  덮어쓰기 전에 저장소로 다시 가져옴
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from panel_keys import KEY_VERSION, email_key, name_key, phone_key, roman_name_key, roman_name_keys
+from romanize import same_person
+
+# 기본 저장소 경로
+STORE_FILE = '/Users/owlers_dylan/Metrix/source/metrix_panel.db'
+
+# 패널 데이터 주요 컬럼
+KEY_COLUMN = '아이디'
+NAME_COLUMN = '작성자'
+PHONE_COLUMN = '21-1, Please write your phone number.'
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """파일 내용의 SHA-1 (CSV가 저장소와 같은 내용인지 확인)"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _to_json_value(value):
+    """DataFrame 값을 JSON 저장 가능한 값으로 변환"""
+    if value is None:
+        return None
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    if isinstance(value, pd.Timestamp):
+        return None if pd.isna(value) else value.isoformat()
+    if value is pd.NaT or value is pd.NA:
+        return None
+    if isinstance(value, np.generic):
+        return _to_json_value(value.item())
+    return value
+
+
+class PanelStore:
+    """인덱스가 있는 SQLite 패널 저장소"""
+
+    def __init__(self, path=STORE_FILE):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self._create_schema()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        self.close()
+
+    def _create_schema(self):
+        """테이블 및 인덱스 생성"""
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS panel (
+                uid TEXT PRIMARY KEY,
+                row_order INTEGER NOT NULL,
+                norm_name TEXT,
+                norm_phone TEXT,
+                norm_email TEXT,
+                norm_roman TEXT,
+                data TEXT NOT NULL,
+                updated_at TEXT
+            );
+            CREATE TABLE IF NOT EXISTS panel_columns (
+                position INTEGER PRIMARY KEY,
+                name TEXT NOT NULL UNIQUE
+            );
+            CREATE INDEX IF NOT EXISTS idx_panel_norm_name ON panel(norm_name);
+            CREATE INDEX IF NOT EXISTS idx_panel_norm_phone ON panel(norm_phone);
+            CREATE INDEX IF NOT EXISTS idx_panel_norm_email ON panel(norm_email);
+            CREATE INDEX IF NOT EXISTS idx_panel_row_order ON panel(row_order);
+            CREATE TABLE IF NOT EXISTS panel_meta (
+                name TEXT PRIMARY KEY,
+                value TEXT
+            );
+        """)
+
+        # 이전 버전 저장소에 로마자 이름 키 컬럼 추가
+        existing = {row[1] for row in self.conn.execute('PRAGMA table_info(panel)')}
+        if 'norm_roman' not in existing:
+            self.conn.execute('ALTER TABLE panel ADD COLUMN norm_roman TEXT')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_panel_norm_roman ON panel(norm_roman)')
+
+        self._refresh_keys()
+
+    def _refresh_keys(self):
+        """키 생성 규칙 버전이 바뀌었으면 저장된 정규화 키를 다시 계산"""
+        row = self.conn.execute(
+            "SELECT value FROM panel_meta WHERE name = 'key_version'"
+        ).fetchone()
+        if row and row[0] == str(KEY_VERSION):
+            return
+
+        updates = []
+        for uid, data in self.conn.execute('SELECT uid, data FROM panel'):
+            keys = self._keys(json.loads(data))
+            updates.append(keys + (uid,))
+        self.conn.executemany(
+            'UPDATE panel SET norm_name = ?, norm_phone = ?, norm_email = ?, norm_roman = ? WHERE uid = ?',
+            updates
+        )
+        self.conn.execute(
+            "INSERT OR REPLACE INTO panel_meta (name, value) VALUES ('key_version', ?)",
+            (str(KEY_VERSION),)
+        )
+        self.commit()
+
+    @staticmethod
+    def _keys(record):
+        """레코드의 정규화 키 (이름, 전화번호, 이메일, 로마자 이름 블로킹 키)"""
+        return (
+            name_key(record.get(NAME_COLUMN)) or '',
+            phone_key(record.get(PHONE_COLUMN)) or '',
+            email_key(record.get(KEY_COLUMN)) or '',
+            roman_name_key(record.get(NAME_COLUMN)) or ''
+        )
+
+    # ------------------------------------------------------------------
+    # 쓰기
+    # ------------------------------------------------------------------
+    def _record_key(self, record, row_order):
+        """레코드 키 결정 (아이디가 없으면 행 순번 기반)"""
+        key = record.get(KEY_COLUMN)
+        if key is not None and not pd.isna(key) and str(key).strip():
+            return str(key).strip()
+        return f'row:{row_order}'
+
+    def _row_values(self, uid, row_order, record):
+        return (uid, row_order) + self._keys(record) + (
+            json.dumps(record, ensure_ascii=False),
+            datetime.now().isoformat()
+        )
+
+    def _register_columns(self, columns):
+        """새 컬럼을 컬럼 순서 테이블 끝에 추가"""
+        existing = {name for (name,) in self.conn.execute('SELECT name FROM panel_columns')}
+        next_position = self.conn.execute(
+            'SELECT COALESCE(MAX(position), -1) + 1 FROM panel_columns'
+        ).fetchone()[0]
+        for col in columns:
+            if col not in existing:
+                self.conn.execute(
+                    'INSERT INTO panel_columns (position, name) VALUES (?, ?)',
+                    (next_position, col)
+                )
+                existing.add(col)
+                next_position += 1
+
+    def import_frame(self, df, replace=True):
+        """DataFrame 전체를 저장소로 가져오기 (초기 구축 또는 전체 병합 결과 반영)"""
+        if replace:
+            self.conn.execute('DELETE FROM panel')
+            self.conn.execute('DELETE FROM panel_columns')
+            start = 0
+        else:
+            start = self.conn.execute(
+                'SELECT COALESCE(MAX(row_order), -1) + 1 FROM panel'
+            ).fetchone()[0]
+
+        columns = [str(col) for col in df.columns]
+        self._register_columns(columns)
+
+        rows = []
+        for offset, values in enumerate(df.itertuples(index=False, name=None)):
+            record = {col: _to_json_value(value) for col, value in zip(columns, values)}
+            row_order = start + offset
+            rows.append(self._row_values(self._record_key(record, row_order), row_order, record))
+
+        # 같은 아이디가 여러 번 나오면 먼저 나온 레코드 유지 (아이디 기준 drop_duplicates keep='first'와 동일)
+        # 아이디가 없는 행은 행마다 row:N 키를 받아 모두 유지됨 (drop_duplicates는 빈 아이디끼리도
+        # 중복으로 보아 하나만 남김) - 그렇게 줄여야 하면 merge_datasets.py처럼 가져오기 전에 처리
+        self.conn.executemany("""
+            INSERT INTO panel (uid, row_order, norm_name, norm_phone, norm_email, norm_roman, data, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(uid) DO NOTHING
+        """, rows)
+        self.commit()
+        return len(rows)
+
+    def upsert(self, record):
+        """레코드 한 건 UPSERT (키가 있으면 데이터 병합, 없으면 끝에 추가)"""
+        record = {str(k): _to_json_value(v) for k, v in record.items()}
+        self._register_columns(record.keys())
+
+        row_order = self.conn.execute(
+            'SELECT COALESCE(MAX(row_order), -1) + 1 FROM panel'
+        ).fetchone()[0]
+        uid = self._record_key(record, row_order)
+
+        existing = self.get(uid)
+        if existing is not None:
+            existing.update(record)
+            return self.update_fields(uid, existing)
+
+        self.conn.execute("""
+            INSERT INTO panel (uid, row_order, norm_name, norm_phone, norm_email, norm_roman, data, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, self._row_values(uid, row_order, record))
+        return record
+
+    def update_fields(self, uid, fields):
+        """특정 레코드의 일부 필드만 업데이트하고 병합된 레코드 반환"""
+        record = self.get(uid)
+        if record is None:
+            raise KeyError(uid)
+
+        fields = {str(k): _to_json_value(v) for k, v in fields.items()}
+        self._register_columns(fields.keys())
+        record.update(fields)
+
+        row_order = self.conn.execute(
+            'SELECT row_order FROM panel WHERE uid = ?', (uid,)
+        ).fetchone()[0]
+        values = self._row_values(uid, row_order, record)
+        self.conn.execute("""
+            UPDATE panel
+            SET norm_name = ?, norm_phone = ?, norm_email = ?, norm_roman = ?, data = ?, updated_at = ?
+            WHERE uid = ?
+        """, values[2:] + (uid,))
+        return record
+
+    def _csv_meta_name(self, path):
+        return f'csv_digest:{os.path.abspath(path)}'
+
+    def mark_csv_synced(self, path):
+        """CSV가 저장소 내용과 같아진 시점(가져오기/export 직후)의 해시 기록"""
+        self.conn.execute(
+            'INSERT OR REPLACE INTO panel_meta (name, value) VALUES (?, ?)',
+            (self._csv_meta_name(path), file_digest(path))
+        )
+        self.commit()
+
+    def csv_changed(self, path):
+        """마지막 가져오기/export 이후 CSV가 수정되었는지 여부 (기록이 없으면 수정된 것으로 봄)"""
+        row = self.conn.execute(
+            'SELECT value FROM panel_meta WHERE name = ?', (self._csv_meta_name(path),)
+        ).fetchone()
+        return row is None or row[0] != file_digest(path)
+
+    def commit(self):
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    # ------------------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------------------
+    def count(self):
+        return self.conn.execute('SELECT COUNT(*) FROM panel').fetchone()[0]
+
+    def get(self, uid):
+        row = self.conn.execute('SELECT data FROM panel WHERE uid = ?', (uid,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _find(self, column, value):
+        value = value or ''
+        if not value:
+            return []
+        cursor = self.conn.execute(
+            f'SELECT uid FROM panel WHERE {column} = ? ORDER BY row_order', (value,)
+        )
+        return [uid for (uid,) in cursor]
+
+    def find_by_name(self, name):
+        """정규화된 이름으로 레코드 키 조회"""
+        return self._find('norm_name', name_key(name))
+
+    def find_by_phone(self, phone):
+        """정규화된 전화번호로 레코드 키 조회"""
+        return self._find('norm_phone', phone_key(phone))
+
+    def find_by_email(self, email):
+        """정규화된 이메일로 레코드 키 조회"""
+        return self._find('norm_email', email_key(email))
+
+    def find_by_roman_name(self, name):
+        """
+        한글/로마자 이름 블로킹 키로 후보 레코드 키 조회 (김민지 → Kim Minji 작성자)
+        후보일 뿐이므로 romanize.same_person()으로 확인한 뒤 사용
+        """
+        keys = roman_name_keys(name)
+        if not keys:
+            return []
+        placeholders = ', '.join('?' * len(keys))
+        cursor = self.conn.execute(
+            f'SELECT uid FROM panel WHERE norm_roman IN ({placeholders}) ORDER BY row_order', keys
+        )
+        return [uid for (uid,) in cursor]
+
+    def find_same_person(self, name, scorer):
+        """로마자 이름 블로킹 키 후보 중 작성자가 같은 사람으로 확인된 레코드 키"""
+        return [
+            uid for uid in self.find_by_roman_name(name)
+            if same_person(name, self.get(uid).get(NAME_COLUMN), scorer)
+        ]
+
+    def records(self):
+        """저장소 전체 (레코드 키, 레코드) 목록 (행 순서)"""
+        return [(uid, json.loads(data)) for uid, data in self.conn.execute(
+            'SELECT uid, data FROM panel ORDER BY row_order'
+        )]
+
+    def columns(self):
+        return [name for (name,) in self.conn.execute(
+            'SELECT name FROM panel_columns ORDER BY position'
+        )]
+
+    def to_frame(self):
+        """저장소 전체를 원래 행/컬럼 순서의 DataFrame으로 반환"""
+        records = [record for _, record in self.records()]
+        return pd.DataFrame.from_records(records, columns=self.columns())
+
+    # ------------------------------------------------------------------
+    # Export (CSV/Excel은 저장소의 view)
+    # ------------------------------------------------------------------
+    def export_csv(self, path):
+        """저장소 내용을 CSV로 export"""
+        df = self.to_frame()
+        df.to_csv(path, index=False, encoding='utf-8-sig')
+        self.mark_csv_synced(path)
+        return df
+
+
+def open_store(path=STORE_FILE, bootstrap_csv=None):
+    """
+    저장소 열기
+    bootstrap_csv가 주어지면 저장소가 비어 있거나, 마지막 가져오기/export 이후 CSV가
+    직접 수정된 경우 CSV 내용으로 저장소를 다시 구축 (이후 export가 수정 내용을 덮어쓰지 않도록)
+    """
+    store = PanelStore(path)
+    if bootstrap_csv and os.path.exists(bootstrap_csv):
+        if store.count() == 0:
+            print(f"패널 저장소 초기 구축: {bootstrap_csv}")
+        elif store.csv_changed(bootstrap_csv):
+            print(f"마지막 export 이후 CSV가 수정되어 패널 저장소 다시 구축: {bootstrap_csv}")
+        else:
+            return store
+        df = pd.read_csv(bootstrap_csv, encoding='utf-8-sig')
+        imported = store.import_frame(df)
+        store.mark_csv_synced(bootstrap_csv)
+        print(f"  - {imported}개 행 가져옴 → {path}")
+    return store
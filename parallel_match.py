@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+퍼지 매칭 병렬 실행 (프로세스 풀)
+
+SequenceMatcher 기반 유사도 계산은 순수 Python이라 한 코어만 사용합니다.
+- 질의 측(K-Beauty 행)을 청크로 나누어 프로세스 풀에서 병렬로 매칭
+- 후보 목록은 fork 시점에 자식 프로세스로 그대로 공유 (복사/피클링 없음, 읽기 전용)
+- 청크 시작 위치 기준으로 결과를 합쳐 순차 실행과 항상 같은 순서/결과 보장
+- METRIX_MATCH_WORKERS 로 프로세스 수 지정 (기본 1 = 순차 실행, 0 = CPU 코어 수)
+"""
+
+import multiprocessing as mp
+import os
+
+# 프로세스 1개당 처리할 청크 수 (작업량이 고르지 않을 때 부하 분산용)
+CHUNKS_PER_WORKER = 4
+
+# fork 전에 설정하여 자식 프로세스가 읽기 전용으로 공유하는 데이터
+_shared = {}
+
+
+def default_workers():
+    """기본 프로세스 수 (1이면 기존과 동일하게 순차 실행), 호출 시점의 METRIX_MATCH_WORKERS"""
+    return int(os.getenv('METRIX_MATCH_WORKERS', '1'))
+
+
+def resolve_workers(workers=None):
+    """프로세스 수 결정 (0 이하이면 CPU 코어 수)"""
+    if workers is None:
+        workers = default_workers()
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    return workers
+
+
+def _match_chunk(task):
+    """자식 프로세스에서 질의 청크 하나를 매칭"""
+    start, queries = task
+    func = _shared['func']
+    candidates = _shared['candidates']
+    return start, [func(query, candidates) for query in queries]
+
+
+def parallel_match(func, queries, candidates, workers=None):
+    """
+    각 질의에 대해 func(query, candidates)를 실행하고 질의 순서대로 결과 반환
+
+    func: 모듈 최상위 함수 (질의 하나와 전체 후보 목록을 받아 결과 반환)
+    queries: 질의 목록 (K-Beauty 행에서 추출한 키 등)
+    candidates: 모든 질의가 공유하는 후보 목록 (읽기 전용)
+    workers: 프로세스 수 (기본: METRIX_MATCH_WORKERS)
+    """
+    queries = list(queries)
+    workers = min(resolve_workers(workers), len(queries))
+
+    # fork를 지원하지 않는 환경(Windows 등)이나 작업이 작으면 순차 실행
+    if workers <= 1 or 'fork' not in mp.get_all_start_methods():
+        return [func(query, candidates) for query in queries]
+
+    chunk_size = max(1, -(-len(queries) // (workers * CHUNKS_PER_WORKER)))
+    tasks = [
+        (start, queries[start:start + chunk_size])
+        for start in range(0, len(queries), chunk_size)
+    ]
+
+    _shared['func'] = func
+    _shared['candidates'] = candidates
+    results = [None] * len(queries)
+    try:
+        with mp.get_context('fork').Pool(workers) as pool:
+            for start, chunk_results in pool.imap_unordered(_match_chunk, tasks):
+                results[start:start + len(chunk_results)] = chunk_results
+    finally:
+        _shared.clear()
+
+    return results
@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+상주 파이프라인 워커 (선택 사항)
+
+처리 스크립트를 실행할 때마다 Python + pandas/numpy import와 참조 데이터(Famigo 회원 CSV 등)
+로딩을 반복하므로 cron / 셸 스크립트에서 실행할 때 시작 시간이 깁니다.
+- `serve`: 라이브러리와 참조 데이터를 미리 올려 둔 워커가 Unix 소켓에서 작업 대기
+- `run 스크립트 [인자...]`: 워커에 작업 제출 (워커는 작업마다 fork 하므로 import/로딩 비용 없음)
+  클라이언트의 stdin/stdout/stderr를 그대로 넘겨 출력/종료 코드가 직접 실행과 동일
+- 워커가 실행 중이 아니면 같은 명령을 현재 프로세스에서 바로 실행 (동작 동일, 속도만 차이)
+
+이 모듈은 클라이언트 시작 시간을 늘리지 않도록 최상위에서 표준 라이브러리만 import 합니다.
+"""
+
+import json
+import os
+import signal
+import socket
+import struct
+import sys
+import time
+import traceback
+
+# 워커 소켓 경로
+SOCKET_PATH = os.getenv('METRIX_WORKER_SOCKET', '/tmp/metrix_pipeline_worker.sock')
+
+# 워커가 미리 import 하는 모듈 (설치되지 않은 모듈은 건너뜀)
+WARM_MODULES = [
+    'numpy', 'pandas',
+    'panel_schema', 'panel_keys', 'panel_store', 'similarity', 'romanize',
+    'name_index', 'parallel_match', 'match_cache',
+]
+
+# 워커가 미리 읽어 두는 참조 데이터 (reference_csv()로 읽는 파일)
+WARM_REFERENCE_FILES = [
+    '/Users/owlers_dylan/Metrix/source/famigo_member_Sep_23_2025_1_final_cleaned.csv',
+]
+
+# 요청 헤더: 본문 길이 (unsigned 64-bit)
+HEADER = struct.Struct('!Q')
+
+# 이 접두어의 환경 변수가 워커와 다르면 프로젝트 모듈을 작업에서 다시 import
+# (모듈 최상위에서 환경 변수를 읽는 설정이 직접 실행과 같게 적용되도록)
+ENV_PREFIX = 'METRIX_'
+
+# 클라이언트가 받으면 작업 프로세스로 전달하는 시그널
+FORWARDED_SIGNALS = (signal.SIGINT, signal.SIGTERM, signal.SIGHUP)
+
+# 참조 데이터 캐시: (절대 경로, 수정 시각, 옵션) → DataFrame
+_reference_frames = {}
+
+
+def reference_csv(path, **kwargs):
+    """
+    참조 CSV 읽기 (같은 파일/옵션은 프로세스 안에서 한 번만 읽음)
+    워커에서 fork된 작업은 워커가 미리 읽어 둔 DataFrame을 복사해서 사용
+    """
+    import pandas as pd
+
+    path = os.path.abspath(path)
+    key = (path, os.path.getmtime(path), json.dumps(kwargs, sort_keys=True, default=str))
+    if key not in _reference_frames:
+        _reference_frames[key] = pd.read_csv(path, **kwargs)
+    return _reference_frames[key].copy()
+
+
+# ----------------------------------------------------------------------
+# 클라이언트
+# ----------------------------------------------------------------------
+def _run_locally(argv):
+    """워커 없이 현재 프로세스를 스크립트로 교체하여 실행"""
+    os.execv(sys.executable, [sys.executable] + argv)
+
+
+def _forward_signals(pid):
+    """Ctrl-C 등 클라이언트가 받은 시그널을 워커의 작업 프로세스로 전달"""
+    def forward(signum, frame):
+        try:
+            os.kill(pid, signum)
+        except ProcessLookupError:
+            pass
+
+    for signum in FORWARDED_SIGNALS:
+        signal.signal(signum, forward)
+
+
+def submit(argv):
+    """
+    워커에 스크립트 실행 요청, 종료 코드 반환
+    워커에 연결할 수 없으면 None
+    응답은 JSON 줄 단위: 작업 프로세스 pid, 이어서 종료 코드
+    """
+    try:
+        client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        client.connect(SOCKET_PATH)
+    except OSError:
+        return None
+
+    with client:
+        body = json.dumps({
+            'argv': argv,
+            'cwd': os.getcwd(),
+            'env': dict(os.environ),
+        }, ensure_ascii=False).encode('utf-8')
+        sys.stdout.flush()
+        sys.stderr.flush()
+        # 표준 입출력 파일 디스크립터를 함께 전달 (출력이 워커를 거치지 않음)
+        socket.send_fds(client, [HEADER.pack(len(body)) + body], [0, 1, 2])
+
+        with client.makefile('r', encoding='utf-8') as reply:
+            for line in reply:
+                message = json.loads(line)
+                if 'pid' in message:
+                    _forward_signals(message['pid'])
+                elif 'exit_code' in message:
+                    return message['exit_code']
+
+    print("❌ 워커가 작업 결과 없이 연결을 종료했습니다", file=sys.stderr)
+    return 1
+
+
+def run(argv):
+    """워커가 있으면 워커에서, 없으면 직접 실행 (반환하지 않음)"""
+    exit_code = submit(argv)
+    if exit_code is None:
+        _run_locally(argv)
+    sys.exit(exit_code)
+
+
+def send_command(command):
+    """워커 관리 명령 (status / stop)"""
+    try:
+        client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        client.connect(SOCKET_PATH)
+    except OSError:
+        print(f"워커가 실행 중이 아닙니다 ({SOCKET_PATH})")
+        return False
+
+    with client:
+        body = json.dumps({'command': command}).encode('utf-8')
+        client.sendall(HEADER.pack(len(body)) + body)
+        print(client.recv(4096).decode('utf-8'))
+    return True
+
+
+# ----------------------------------------------------------------------
+# 워커
+# ----------------------------------------------------------------------
+def _project_env(environ):
+    """설정용 환경 변수 (ENV_PREFIX로 시작하는 것)"""
+    return {name: value for name, value in environ.items() if name.startswith(ENV_PREFIX)}
+
+
+def _warm_up():
+    """라이브러리와 참조 데이터를 미리 로딩, 로딩한 프로젝트 모듈의 (경로, 수정 시각) 반환"""
+    import importlib
+
+    loaded = {}
+    for name in WARM_MODULES:
+        try:
+            module = importlib.import_module(name)
+        except ImportError as e:
+            print(f"   - {name} 건너뜀: {e}")
+            continue
+        path = getattr(module, '__file__', None)
+        if path and os.path.dirname(os.path.abspath(path)) == os.path.dirname(os.path.abspath(__file__)):
+            loaded[name] = (path, os.path.getmtime(path))
+
+    # `python pipeline_worker.py serve`로 실행하면 이 파일은 __main__ 이므로
+    # 작업 스크립트가 import 하는 pipeline_worker 모듈의 캐시에 로딩
+    worker_module = importlib.import_module('pipeline_worker')
+    for path in WARM_REFERENCE_FILES:
+        if os.path.exists(path):
+            worker_module.reference_csv(path)
+            print(f"   - 참조 데이터 로딩: {os.path.basename(path)}")
+
+    return loaded
+
+
+def _drop_stale_modules(loaded, drop_all=False):
+    """
+    워커 시작 후 수정된 프로젝트 모듈은 작업에서 다시 import 되도록 제거
+    drop_all: 설정 환경 변수가 워커와 다를 때 모든 프로젝트 모듈 제거
+    """
+    for name, (path, mtime) in loaded.items():
+        try:
+            if drop_all or os.path.getmtime(path) != mtime:
+                sys.modules.pop(name, None)
+        except OSError:
+            sys.modules.pop(name, None)
+
+
+def _read_request(conn):
+    """요청 본문과 함께 전달된 파일 디스크립터 수신"""
+    data, fds, _, _ = socket.recv_fds(conn, 65536, 3)
+    if len(data) < HEADER.size:
+        raise ValueError("잘못된 요청")
+    length = HEADER.unpack(data[:HEADER.size])[0]
+    body = data[HEADER.size:]
+    while len(body) < length:
+        chunk = conn.recv(length - len(body))
+        if not chunk:
+            raise ValueError("요청이 중간에 끊어졌습니다")
+        body += chunk
+    return json.loads(body.decode('utf-8')), fds
+
+
+def _run_job(request, fds, loaded, warm_env):
+    """fork된 자식 프로세스에서 스크립트 실행 (반환하지 않음)"""
+    import runpy
+
+    exit_code = 0
+    try:
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        for target, fd in enumerate(fds):
+            os.dup2(fd, target)
+            os.close(fd)
+
+        os.chdir(request['cwd'])
+        os.environ.clear()
+        os.environ.update(request['env'])
+        _drop_stale_modules(loaded, drop_all=_project_env(os.environ) != warm_env)
+
+        argv = request['argv']
+        script = os.path.abspath(argv[0])
+        sys.argv = argv
+        sys.path[0] = os.path.dirname(script)
+        runpy.run_path(script, run_name='__main__')
+    except SystemExit as e:
+        if e.code is None:
+            exit_code = 0
+        elif isinstance(e.code, int):
+            exit_code = e.code
+        else:
+            print(e.code, file=sys.stderr)
+            exit_code = 1
+    except KeyboardInterrupt:
+        traceback.print_exc()
+        exit_code = 128 + signal.SIGINT
+    except BaseException:
+        traceback.print_exc()
+        exit_code = 1
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        finally:
+            os._exit(exit_code)
+
+
+def _handle(conn, server, loaded, warm_env, started):
+    """
+    연결 하나 처리 (워커에서 fork된 감독 프로세스에서 실행)
+    작업 프로세스를 다시 fork 하여 종료를 기다린 뒤 종료 코드를 클라이언트에 전달
+    """
+    request, fds = _read_request(conn)
+
+    command = request.get('command')
+    if command == 'status':
+        conn.sendall(f"워커 실행 중 (pid {os.getppid()}, 시작 {time.ctime(started)})".encode('utf-8'))
+        return
+    if command == 'stop':
+        conn.sendall("워커를 종료합니다".encode('utf-8'))
+        os.kill(os.getppid(), signal.SIGTERM)
+        return
+
+    pid = os.fork()
+    if pid == 0:
+        conn.close()
+        server.close()
+        _run_job(request, fds, loaded, warm_env)
+
+    for fd in fds:
+        os.close(fd)
+    # 클라이언트가 Ctrl-C 등을 작업 프로세스로 전달할 수 있도록 pid 먼저 전송
+    try:
+        conn.sendall((json.dumps({'pid': pid}) + '\n').encode('utf-8'))
+    except OSError:
+        pass
+    _, status = os.waitpid(pid, 0)
+    exit_code = os.waitstatus_to_exitcode(status)
+    if exit_code < 0:
+        # 시그널로 종료된 경우 셸과 같은 128 + 시그널 번호
+        exit_code = 128 - exit_code
+    conn.sendall((json.dumps({'exit_code': exit_code}) + '\n').encode('utf-8'))
+
+
+def serve():
+    """워커 실행 (SIGTERM / stop 명령으로 종료)"""
+    print("🔥 파이프라인 워커 준비 중...")
+    started = time.time()
+    loaded = _warm_up()
+    warm_env = _project_env(os.environ)
+    print(f"✅ 워커 대기 중: {SOCKET_PATH} (준비 {time.time() - started:.2f}초)")
+
+    if os.path.exists(SOCKET_PATH):
+        os.unlink(SOCKET_PATH)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(SOCKET_PATH)
+    os.chmod(SOCKET_PATH, 0o600)
+    server.listen(16)
+    server.settimeout(1.0)
+
+    running = True
+
+    def stop(signum, frame):
+        nonlocal running
+        running = False
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    try:
+        while running:
+            # 끝난 감독 프로세스 정리
+            try:
+                while os.waitpid(-1, os.WNOHANG)[0]:
+                    pass
+            except ChildProcessError:
+                pass
+
+            try:
+                conn, _ = server.accept()
+            except socket.timeout:
+                continue
+            except InterruptedError:
+                continue
+
+            sys.stdout.flush()
+            sys.stderr.flush()
+            pid = os.fork()
+            if pid == 0:
+                try:
+                    conn.settimeout(None)
+                    _handle(conn, server, loaded, warm_env, started)
+                except Exception:
+                    traceback.print_exc()
+                finally:
+                    conn.close()
+                    os._exit(0)
+            conn.close()
+    finally:
+        server.close()
+        if os.path.exists(SOCKET_PATH):
+            os.unlink(SOCKET_PATH)
+        print("👋 워커 종료")
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] in ('-h', '--help'):
+        print("""
+사용법:
+  python pipeline_worker.py serve                  # 워커 실행 (라이브러리/참조 데이터 미리 로딩)
+  python pipeline_worker.py run 스크립트 [인자...]  # 워커에서 실행 (워커가 없으면 직접 실행)
+  python pipeline_worker.py status                 # 워커 상태
+  python pipeline_worker.py stop                   # 워커 종료
+
+환경 변수:
+  METRIX_WORKER_SOCKET  소켓 경로 (기본: /tmp/metrix_pipeline_worker.sock)
+        """)
+        return
+
+    command = sys.argv[1]
+    if command == 'serve':
+        serve()
+    elif command == 'run' and len(sys.argv) > 2:
+        run(sys.argv[2:])
+    elif command in ('status', 'stop'):
+        send_command(command)
+    else:
+        print(f"알 수 없는 명령: {' '.join(sys.argv[1:])}")
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
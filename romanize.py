@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+한글 이름 로마자 표기 및 표기 방식 무관 이름 블로킹 키
+
+K-Beauty 패널의 작성자 컬럼은 로마자 이름이고, Metrix 데이터는 한글 이름(이름)과
+영문 이름(NAME)을 함께 가지고 있어 같은 사람이라도 표기가 달라 매칭되지 않습니다.
+- 한글 이름은 국어의 로마자 표기법(Revised Romanization)으로 변환 (연음/ㄹㄹ 처리 포함)
+- 성씨는 관용 표기를 대표 표기로 통일 (Kim/Gim, Lee/Yi/Rhee/I, Park/Bak 등)
+- 로마자 이름은 성씨 위치(앞/뒤)와 관계없이 성 + 이름 순서로 정규화
+- 로마자 이름의 관용 표기(oo/ee/sh/ou)만 국어의 로마자 표기법 쪽으로 접음 (한글 이름에는 적용하지 않음)
+- 한글 이름은 eo/eu의 관용 표기(u/o)로 쓴 후보 키도 함께 생성 (박정호 → bak:jeongho, bak:jungho, ...)
+- 키는 후보를 모으는 블로킹 키일 뿐이므로 최종 매칭은 same_person()으로 다시 확인
+"""
+
+import re
+from itertools import product
+
+import pandas as pd
+
+# 한글 음절 범위 (가 ~ 힣)
+HANGUL_BASE = 0xAC00
+HANGUL_LAST = 0xD7A3
+
+# 초성 / 중성 / 종성 로마자 표기
+INITIALS = ['g', 'kk', 'n', 'd', 'tt', 'r', 'm', 'b', 'pp', 's', 'ss', '', 'j', 'jj', 'ch', 'k', 't', 'p', 'h']
+MEDIALS = ['a', 'ae', 'ya', 'yae', 'eo', 'e', 'yeo', 'ye', 'o', 'wa', 'wae', 'oe', 'yo', 'u', 'wo', 'we', 'wi', 'yu', 'eu', 'ui', 'i']
+FINALS = ['', 'k', 'k', 'k', 'n', 'n', 'n', 't', 'l', 'k', 'm', 'l', 'l', 'l', 'p', 'l', 'm', 'p', 'p', 't', 't', 'ng', 't', 't', 'k', 't', 'p', 't']
+
+# 받침 뒤에 ㅇ으로 시작하는 음절이 오면 받침을 다음 음절 초성으로 옮겨 읽음 (연음)
+# 종성 번호 → 다음 음절 초성 표기 (겹받침은 뒤 자음만 이동)
+LIAISON = {
+    1: 'g', 2: 'kk', 3: 's', 4: 'n', 5: 'j', 6: 'h', 7: 'd', 8: 'r', 9: 'g', 10: 'm',
+    11: 'b', 12: 's', 13: 't', 14: 'p', 15: 'h', 16: 'm', 17: 'b', 18: 's', 19: 's',
+    20: 'ss', 22: 'j', 23: 'ch', 24: 'k', 25: 't', 26: 'p', 27: 'h'
+}
+
+# 종성 ㄹ
+FINAL_RIEUL = 8
+# 초성 ㄹ / ㅇ
+INITIAL_RIEUL = 5
+INITIAL_IEUNG = 11
+
+# 두 글자 성씨
+COMPOUND_SURNAMES = {'남궁', '제갈', '선우', '황보', '독고', '사공', '서문', '동방'}
+
+# 성씨 관용 표기 → 대표 표기 (국어의 로마자 표기법 결과와 같은 값)
+SURNAME_ALIASES = {
+    'kim': 'gim', 'gim': 'gim',
+    'lee': 'i', 'yi': 'i', 'rhee': 'i', 'rhie': 'i', 'ri': 'i', 'i': 'i',
+    'park': 'bak', 'pak': 'bak', 'bak': 'bak', 'bahk': 'bak',
+    'choi': 'choe', 'choe': 'choe', 'choy': 'choe',
+    'jung': 'jeong', 'chung': 'jeong', 'jeong': 'jeong', 'cheong': 'jeong',
+    'kang': 'gang', 'gang': 'gang',
+    'cho': 'jo', 'jo': 'jo', 'joe': 'jo',
+    'yoon': 'yun', 'yun': 'yun', 'youn': 'yun',
+    'jang': 'jang', 'chang': 'jang',
+    'lim': 'im', 'im': 'im', 'rim': 'im',
+    'han': 'han',
+    'oh': 'o', 'o': 'o',
+    'shin': 'sin', 'sin': 'sin', 'shinn': 'sin',
+    'seo': 'seo', 'suh': 'seo', 'seoh': 'seo',
+    'kwon': 'gwon', 'gwon': 'gwon',
+    'hwang': 'hwang',
+    'ahn': 'an', 'an': 'an',
+    'song': 'song',
+    'yoo': 'yu', 'yu': 'yu', 'you': 'yu',
+    'ryu': 'ryu', 'ryoo': 'ryu', 'rhyu': 'ryu',
+    'hong': 'hong',
+    'jeon': 'jeon', 'jun': 'jeon', 'chun': 'jeon', 'chon': 'jeon',
+    'ko': 'go', 'go': 'go', 'koh': 'go',
+    'moon': 'mun', 'mun': 'mun',
+    'yang': 'yang',
+    'son': 'son', 'sohn': 'son',
+    'bae': 'bae', 'pae': 'bae',
+    'baek': 'baek', 'paik': 'baek', 'baik': 'baek', 'paek': 'baek',
+    'heo': 'heo', 'huh': 'heo', 'hur': 'heo',
+    'noh': 'no', 'roh': 'no', 'no': 'no', 'ro': 'no',
+    'nam': 'nam',
+    'ha': 'ha',
+    'kwak': 'gwak', 'gwak': 'gwak',
+    'sung': 'seong', 'seong': 'seong', 'sang': 'sang',
+    'cha': 'cha',
+    'woo': 'u', 'u': 'u', 'wu': 'u',
+    'koo': 'gu', 'ku': 'gu', 'gu': 'gu',
+    'min': 'min',
+    'na': 'na', 'ra': 'na',
+    'jin': 'jin', 'chin': 'jin',
+    'ji': 'ji', 'chi': 'ji',
+    'uhm': 'eom', 'eom': 'eom', 'um': 'eom',
+    'won': 'won',
+    'chae': 'chae',
+    'byun': 'byeon', 'byeon': 'byeon', 'pyun': 'byeon',
+    'yeo': 'yeo', 'yeu': 'yeo',
+    'kil': 'gil', 'gil': 'gil',
+    'namkoong': 'namgung', 'namgung': 'namgung', 'namkung': 'namgung',
+    'jegal': 'jegal', 'chegal': 'jegal',
+    'sunwoo': 'seonu', 'seonu': 'seonu', 'sunoo': 'seonu',
+    'hwangbo': 'hwangbo',
+    'dokgo': 'dokgo', 'tokko': 'dokgo',
+}
+
+# 대표 성씨별 빈도 순위 (SURNAME_ALIASES는 흔한 성씨부터 나열)
+SURNAME_RANK = {surname: rank for rank, surname in enumerate(dict.fromkeys(SURNAME_ALIASES.values()))}
+
+# 로마자 이름(성 제외)의 관용 표기 → 국어의 로마자 표기법 표기 (로마자 입력에만 적용)
+# 국어의 로마자 표기법 결과에는 나오지 않는 철자만 접으므로 한글 이름의 키와 그대로 비교 가능
+GIVEN_NAME_FOLDS = [
+    ('oo', 'u'),
+    ('ee', 'i'),
+    ('sh', 's'),
+    ('ou', 'u'),
+]
+
+# 한글 이름의 모음을 관용 표기로 쓴 경우 (정호 → Jungho/Jongho, 은지 → Unji)
+# 어느 음절이 어떤 표기인지 알 수 없으므로 후보 키만 만들고 같은 사람인지는 따로 확인
+HANGUL_VOWEL_VARIANTS = {
+    'eo': ('eo', 'u', 'o'),
+    'eu': ('eu', 'u'),
+}
+
+# same_person()에서 한글/로마자 또는 로마자끼리 비교할 때의 최소 유사도
+SAME_PERSON_THRESHOLD = 0.8
+
+
+def is_hangul(text):
+    """한글 음절이 포함되어 있는지 여부"""
+    return any(HANGUL_BASE <= ord(char) <= HANGUL_LAST for char in text)
+
+
+def romanize_hangul(text):
+    """한글을 국어의 로마자 표기법으로 변환 (한글이 아닌 문자는 그대로)"""
+    syllables = []
+    for char in text:
+        code = ord(char)
+        if HANGUL_BASE <= code <= HANGUL_LAST:
+            offset = code - HANGUL_BASE
+            syllables.append((offset // 588, (offset % 588) // 28, offset % 28))
+        else:
+            syllables.append(char)
+
+    result = []
+    for i, syllable in enumerate(syllables):
+        if isinstance(syllable, str):
+            result.append(syllable)
+            continue
+
+        initial, medial, final = syllable
+        following = syllables[i + 1] if i + 1 < len(syllables) else None
+        previous = syllables[i - 1] if i > 0 else None
+
+        # 초성 (앞 음절 받침이 연음되었거나 ㄹㄹ이면 앞 음절에서 처리)
+        if isinstance(previous, tuple) and initial == INITIAL_IEUNG and previous[2] in LIAISON:
+            initial_text = ''
+        elif isinstance(previous, tuple) and initial == INITIAL_RIEUL and previous[2] == FINAL_RIEUL:
+            initial_text = 'l'
+        else:
+            initial_text = INITIALS[initial]
+
+        # 종성
+        if isinstance(following, tuple) and following[0] == INITIAL_IEUNG and final in LIAISON:
+            final_text = LIAISON[final]
+        else:
+            final_text = FINALS[final]
+
+        result.append(initial_text + MEDIALS[medial] + final_text)
+
+    return ''.join(result)
+
+
+def fold_given_name(given):
+    """로마자 이름(성 제외)의 관용 표기 차이 줄이기"""
+    for source, target in GIVEN_NAME_FOLDS:
+        given = given.replace(source, target)
+    return given
+
+
+def split_hangul_name(name):
+    """한글 이름을 (성, 이름)으로 분리"""
+    name = ''.join(char for char in name if HANGUL_BASE <= ord(char) <= HANGUL_LAST)
+    if len(name) >= 3 and name[:2] in COMPOUND_SURNAMES:
+        return name[:2], name[2:]
+    return name[:1], name[1:]
+
+
+def split_roman_name(name):
+    """
+    로마자 이름을 (대표 성씨, 이름)으로 분리
+    알려진 성씨가 맨 앞 또는 맨 뒤 토큰에 있으면 성씨로 사용 (Kim Min-ji / Minji Kim)
+    성씨를 알 수 없으면 (None, 토큰 결합)
+    """
+    tokens = re.findall(r'[a-z]+', name.lower())
+    if not tokens:
+        return None, ''
+    if len(tokens) == 1:
+        return None, tokens[0]
+
+    # 하이픈/공백으로 나뉜 이름 음절 처리 (Kim Min Ji → 성 Kim, 이름 Min+Ji)
+    first = SURNAME_RANK.get(SURNAME_ALIASES.get(tokens[0]))
+    last = SURNAME_RANK.get(SURNAME_ALIASES.get(tokens[-1]))
+    if first is not None and (last is None or first <= last):
+        return SURNAME_ALIASES[tokens[0]], ''.join(tokens[1:])
+    if last is not None:
+        # 앞뒤 모두 성씨일 수 있으면 (Min Ji Kim) 더 흔한 성씨를 사용
+        return SURNAME_ALIASES[tokens[-1]], ''.join(tokens[:-1])
+    return None, ''.join(tokens)
+
+
+def _split_name(name):
+    """
+    이름을 (대표 성씨, 이름 로마자 표기, 한글 여부)로 분리
+    한글 이름은 국어의 로마자 표기법 그대로, 로마자 이름은 관용 표기를 접은 값
+    """
+    if name is None or pd.isna(name):
+        return None
+    name = str(name).strip()
+    if not name:
+        return None
+
+    if is_hangul(name):
+        surname, given = split_hangul_name(name)
+        if not given:
+            return None
+        surname = romanize_hangul(surname)
+        return SURNAME_ALIASES.get(surname, surname), romanize_hangul(given), True
+
+    surname, given = split_roman_name(name)
+    if not given:
+        return None
+    return surname, fold_given_name(given), False
+
+
+def _vowel_variants(given):
+    """한글 이름 로마자 표기의 eo/eu를 관용 표기로 바꾼 후보 (원래 표기 포함, 원래 표기가 먼저)"""
+    parts = re.split(r'(eo|eu)', given)
+    options = [HANGUL_VOWEL_VARIANTS.get(part, (part,)) for part in parts]
+    variants = [fold_given_name(''.join(choice)) for choice in product(*options)]
+    return list(dict.fromkeys([given] + variants))
+
+
+def name_block_key(name):
+    """
+    한글/로마자 표기와 관계없이 같은 사람이면 같은 값이 되는 이름 블로킹 키
+    '대표 성씨:이름' 형식 (성씨를 알 수 없으면 '?:이름')
+    """
+    parts = _split_name(name)
+    if parts is None:
+        return None
+    surname, given, _ = parts
+    return f"{surname or '?'}:{given}"
+
+
+def name_block_keys(name):
+    """
+    이름으로 조회할 블로킹 키 목록 (첫 번째가 name_block_key 값)
+    한글 이름은 eo/eu를 관용 표기로 쓴 로마자 이름의 키도 포함 (박정호 → Park Jung-ho)
+    """
+    parts = _split_name(name)
+    if parts is None:
+        return []
+    surname, given, hangul = parts
+    givens = _vowel_variants(given) if hangul else [given]
+    return [f"{surname or '?'}:{variant}" for variant in givens]
+
+
+def same_person(name, other, scorer, threshold=SAME_PERSON_THRESHOLD):
+    """
+    블로킹 키로 찾은 후보가 같은 사람인지 확인
+    - 둘 다 한글: 한글 이름이 정확히 같아야 함 (김서연 ≠ 김소연)
+    - 그 외: 성씨가 같고 '성 이름' 로마자 표기의 유사도(scorer)가 threshold 이상
+    """
+    parts, other_parts = _split_name(name), _split_name(other)
+    if parts is None or other_parts is None:
+        return False
+    if parts[2] and other_parts[2]:
+        return split_hangul_name(str(name)) == split_hangul_name(str(other))
+    if parts[0] != other_parts[0]:
+        return False
+    text = f"{parts[0] or '?'} {parts[1]}"
+    other_text = f"{other_parts[0] or '?'} {other_parts[1]}"
+    return scorer(text, other_text, cutoff=threshold) >= threshold
@@ -58,9 +58,9 @@ def run_script(script_name, step_num, description):
     print_step(step_num, description)
 
     try:
-        # 스크립트 실행
+        # 스크립트 실행 (상주 워커가 실행 중이면 워커에서, 아니면 직접 실행)
         result = subprocess.run(
-            [sys.executable, script_name],
+            [sys.executable, 'pipeline_worker.py', 'run', script_name],
             capture_output=True,
             text=True,
             check=True
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Airtable Mirror Module
+Keeps a local SQLite copy of the Airtable table, refreshed incrementally
+"""
+
+import os
+import json
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+
+from airtable_sync import AirtableSync
+
+MIRROR_FILE = '../cache/airtable_mirror.db'
+
+# Records modified this long before the previous refresh are fetched again,
+# so clock differences between this machine and Airtable never drop an edit
+WATERMARK_OVERLAP = timedelta(minutes=5)
+
+# reconcile() refuses to delete more than this fraction of the mirrored records
+# unless forced, so an unexpectedly small id scan cannot wipe the mirror
+MAX_RECONCILE_FRACTION = 0.1
+
+
+class AirtableMirror:
+    """
+    Local mirror of an Airtable table (record id -> fields)
+    One mirror file can hold several tables; records and metadata are keyed by base/table
+    """
+
+    def __init__(self, sync: AirtableSync, path=MIRROR_FILE):
+        self.sync = sync
+        self.path = path
+        self.scope = (sync.config['base_id'], sync.config['table_name'])
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self._migrate()
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS records (
+                base_id TEXT NOT NULL,
+                table_name TEXT NOT NULL,
+                id TEXT NOT NULL,
+                uid TEXT,
+                fields TEXT NOT NULL,
+                created_time TEXT,
+                mirrored_at TEXT,
+                PRIMARY KEY (base_id, table_name, id)
+            );
+            CREATE INDEX IF NOT EXISTS idx_records_uid ON records(base_id, table_name, uid);
+            CREATE TABLE IF NOT EXISTS meta (
+                name TEXT PRIMARY KEY,
+                value TEXT
+            );
+        """)
+        self._write_lock = threading.Lock()
+
+    def _migrate(self):
+        """
+        Mirrors written before records were keyed by base/table cannot tell their
+        tables apart, so they are discarded and rebuilt on the next refresh
+        """
+        columns = [row[1] for row in self.conn.execute('PRAGMA table_info(records)')]
+        if columns and 'base_id' not in columns:
+            print("♻️  Rebuilding mirror created by an older version")
+            self.conn.executescript("""
+                DROP TABLE records;
+                DROP TABLE IF EXISTS meta;
+            """)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    # ------------------------------------------------------------------
+    # Metadata
+    # ------------------------------------------------------------------
+    def _meta_key(self, name):
+        """Metadata is kept per base/table so one mirror file can hold several tables"""
+        return f"{self.sync.config['base_id']}/{self.sync.config['table_name']}:{name}"
+
+    def get_meta(self, name):
+        row = self.conn.execute(
+            'SELECT value FROM meta WHERE name = ?', (self._meta_key(name),)
+        ).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, name, value):
+        self.conn.execute(
+            'INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)',
+            (self._meta_key(name), value)
+        )
+
+    # ------------------------------------------------------------------
+    # Refresh
+    # ------------------------------------------------------------------
+    def _store_records(self, records):
+        """Insert or replace a page of records"""
+        now = datetime.now().isoformat()
+        rows = [
+            (
+                *self.scope,
+                record['id'],
+                record.get('fields', {}).get(self.sync.merge_field),
+                json.dumps(record.get('fields', {}), ensure_ascii=False),
+                record.get('createdTime'),
+                now
+            )
+            for record in records
+        ]
+        with self._write_lock:
+            self.conn.executemany("""
+                INSERT OR REPLACE INTO records
+                    (base_id, table_name, id, uid, fields, created_time, mirrored_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+
+    def refresh(self, full=False):
+        """
+        Bring the mirror up to date
+        The first refresh (or full=True) reads the whole table using the partitioned reader;
+        later refreshes only request records modified after the stored watermark.
+        If any partition fails the refresh is rolled back and RequestException is raised,
+        so the watermark only advances past windows that were read completely
+        """
+        watermark = self.get_meta('watermark')
+        started = datetime.now(timezone.utc)
+
+        if full or not watermark:
+            print("📥 Mirroring full Airtable table...")
+            formulas = self.sync.partition_formulas()
+            if full:
+                with self._write_lock:
+                    self.conn.execute('DELETE FROM records WHERE base_id = ? AND table_name = ?',
+                                      self.scope)
+        else:
+            since = datetime.fromisoformat(watermark) - WATERMARK_OVERLAP
+            print(f"📥 Fetching records modified since {since.isoformat()}...")
+            formulas = [
+                f"IS_AFTER(LAST_MODIFIED_TIME(), DATETIME_PARSE('{since.strftime('%Y-%m-%dT%H:%M:%SZ')}'))"
+            ]
+
+        try:
+            with ThreadPoolExecutor(max_workers=len(formulas)) as executor:
+                futures = [executor.submit(self.sync._read_partition, formula, None, self._store_records)
+                           for formula in formulas]
+                fetched = sum(future.result() for future in futures)
+        except Exception:
+            self.conn.rollback()
+            print("❌ Mirror refresh incomplete; mirror and watermark left unchanged")
+            raise
+
+        self.set_meta('watermark', started.isoformat())
+        self.conn.commit()
+        print(f"   Mirrored {fetched} record(s), {self.count()} in mirror")
+        return fetched
+
+    def reconcile(self, force=False):
+        """
+        Remove mirrored records that were deleted in Airtable
+        Deletions are not visible to the modified-time query, so this reads
+        only the record ids (merge field) of the whole table.
+        Nothing is deleted if any partition fails, and more than
+        MAX_RECONCILE_FRACTION of the mirror is only deleted with force=True
+        """
+        live_ids = set()
+        id_lock = threading.Lock()
+
+        def add_ids(records):
+            with id_lock:
+                live_ids.update(record['id'] for record in records)
+
+        formulas = self.sync.partition_formulas()
+        with ThreadPoolExecutor(max_workers=len(formulas)) as executor:
+            futures = [executor.submit(self.sync._read_partition, formula,
+                                       [self.sync.merge_field], add_ids)
+                       for formula in formulas]
+            for future in futures:
+                future.result()
+
+        stale = [record_id for (record_id,) in self.conn.execute(
+                     'SELECT id FROM records WHERE base_id = ? AND table_name = ?', self.scope)
+                 if record_id not in live_ids]
+        total = self.count()
+        if not force and stale and len(stale) > total * MAX_RECONCILE_FRACTION:
+            print(f"⚠️  {len(stale)} of {total} mirrored record(s) are missing from Airtable; "
+                  f"not deleting more than {MAX_RECONCILE_FRACTION:.0%} without --full")
+            return 0
+
+        self.conn.executemany('DELETE FROM records WHERE base_id = ? AND table_name = ? AND id = ?',
+                              [(*self.scope, record_id) for record_id in stale])
+        self.conn.commit()
+        print(f"   Removed {len(stale)} deleted record(s) from mirror")
+        return len(stale)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def count(self):
+        return self.conn.execute(
+            'SELECT COUNT(*) FROM records WHERE base_id = ? AND table_name = ?', self.scope
+        ).fetchone()[0]
+
+    def uid_map(self):
+        """uid -> record id map built from the mirror (no API requests)"""
+        return {uid: record_id for record_id, uid in self.conn.execute("""
+            SELECT id, uid FROM records
+            WHERE base_id = ? AND table_name = ? AND uid IS NOT NULL AND uid != ''
+            ORDER BY created_time
+        """, self.scope)}
+
+    def fields_by_uid(self):
+        """uid -> mirrored fields, used to skip records that did not change"""
+        return {uid: json.loads(fields) for uid, fields in self.conn.execute("""
+            SELECT uid, fields FROM records
+            WHERE base_id = ? AND table_name = ? AND uid IS NOT NULL AND uid != ''
+            ORDER BY created_time
+        """, self.scope)}
+
+    def to_frame(self):
+        """All mirrored records as a DataFrame (for reporting scripts)"""
+        rows = []
+        for record_id, fields in self.conn.execute(
+                'SELECT id, fields FROM records WHERE base_id = ? AND table_name = ? ORDER BY created_time',
+                self.scope):
+            row = json.loads(fields)
+            row['airtable_id'] = record_id
+            rows.append(row)
+        return pd.DataFrame(rows)
+
+
+def main():
+    """Main execution function"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Airtable Mirror Tool')
+    parser.add_argument('--config', default='airtable_config.json',
+                        help='Airtable configuration file')
+    parser.add_argument('--mirror', default=MIRROR_FILE,
+                        help='Mirror database path')
+    parser.add_argument('--full', action='store_true',
+                        help='Re-read the whole table instead of only modified records '
+                             '(also lifts the reconcile deletion limit)')
+    parser.add_argument('--reconcile', action='store_true',
+                        help='Also remove records deleted in Airtable')
+    parser.add_argument('--export', help='Export mirrored records to this CSV file')
+    args = parser.parse_args()
+
+    sync = AirtableSync(args.config)
+    with AirtableMirror(sync, args.mirror) as mirror:
+        mirror.refresh(full=args.full)
+        if args.reconcile:
+            mirror.reconcile(force=args.full)
+        if args.export:
+            mirror.to_frame().to_csv(args.export, index=False, encoding='utf-8-sig')
+            print(f"📄 Exported {mirror.count()} records to {args.export}")
+
+
+if __name__ == "__main__":
+    main()
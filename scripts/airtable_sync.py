@@ -6,12 +6,21 @@ Uploads processed Google Sheets data to Airtable
 
 import os
 import json
+import hashlib
 import time
+import threading
 import requests
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, List, Optional
 
+from sync_journal import JOURNAL_FILE, PENDING, SyncJournal, batch_hash, file_digest
+from sync_ledger import LEDGER_FILE, SyncLedger
+
+# Characters that can follow the 'rec' prefix of an Airtable record id
+RECORD_ID_CHARS = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz'
+
 class AirtableSync:
     """Airtable synchronization manager"""
 
@@ -24,6 +33,26 @@ class AirtableSync:
             "Content-Type": "application/json"
         }
         self.batch_size = 10  # Airtable allows max 10 records per batch
+        # 'fetch': download all records first to build the uid -> record id map (default)
+        # 'upsert': merge on uid with performUpsert (no pre-fetch of the table)
+        # 'mirror': diff against the local mirror (airtable_mirror.py), send only changed rows
+        self.sync_mode = self.config.get('sync_mode', 'fetch')
+        self.merge_field = self.config.get('merge_field', 'uid')
+        # Number of disjoint partitions read concurrently when building the uid map
+        self.read_partitions = int(self.config.get('read_partitions', 4))
+        # Airtable allows 5 requests per second per base; shared across reader threads
+        self.request_interval = 0.2
+        self._request_lock = threading.Lock()
+        self._last_request = 0.0
+        # Failed write batches are retried with exponential backoff (retry_backoff * 2^n seconds)
+        self.max_retries = int(self.config.get('max_retries', 4))
+        self.retry_backoff = float(self.config.get('retry_backoff', 1.0))
+        # Batch journal used to resume interrupted syncs (see sync_journal.py)
+        self.use_journal = self.config.get('journal', True)
+        self.journal_file = self.config.get('journal_file', JOURNAL_FILE)
+        self.journal = None
+        # Append-only per-batch timing/status log (see sync_ledger.py)
+        self.ledger = SyncLedger(self.config.get('ledger_file', LEDGER_FILE))
 
     def load_config(self, config_file):
         """Load Airtable configuration"""
@@ -47,6 +76,12 @@ class AirtableSync:
                 "api_key": "YOUR_API_KEY_HERE",
                 "base_id": "YOUR_BASE_ID_HERE",
                 "table_name": "ManagementPanel",
+                "sync_mode": "fetch",
+                "merge_field": "uid",
+                "read_partitions": 4,
+                "max_retries": 4,
+                "retry_backoff": 1.0,
+                "journal": True,
                 "sync_fields": [
                     "uid", "name", "email", "phone", "gender",
                     "birth_date", "nationality", "residence_area",
@@ -96,6 +131,101 @@ class AirtableSync:
         print(f"   Retrieved {len(all_records)} existing records")
         return all_records
 
+    def _throttle(self):
+        """Wait so that requests from all threads stay within the rate limit"""
+        with self._request_lock:
+            wait = self._last_request + self.request_interval - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            self._last_request = time.monotonic()
+
+    def partition_formulas(self, count=None):
+        """
+        filterByFormula expressions that split the table into disjoint partitions
+        Record ids are random, so partitioning on the first character after 'rec'
+        gives evenly sized partitions that together cover every record.
+        read_partition_formulas in the config overrides this; those formulas must
+        also be disjoint and cover the whole table.
+        """
+        # Explicit partitions from config (e.g. one formula per data_source value)
+        if self.config.get('read_partition_formulas'):
+            return list(self.config['read_partition_formulas'])
+
+        count = count or self.read_partitions
+        if count <= 1:
+            return [None]
+
+        size = -(-len(RECORD_ID_CHARS) // count)
+        groups = [RECORD_ID_CHARS[i:i + size] for i in range(0, len(RECORD_ID_CHARS), size)]
+        return [f'FIND(MID(RECORD_ID(), 4, 1), "{chars}") > 0' for chars in groups]
+
+    def _read_partition(self, formula, fields, on_records):
+        """
+        Page through one partition, passing each page of records to on_records
+        Raises RequestException if a page cannot be read, so callers never
+        mistake a partially read partition for the whole table
+        """
+        offset = None
+        count = 0
+
+        while True:
+            params = {"pageSize": 100, "fields[]": fields}
+            if formula:
+                params["filterByFormula"] = formula
+            if offset:
+                params["offset"] = offset
+
+            try:
+                self._throttle()
+                response = requests.get(self.base_url, headers=self.headers, params=params)
+                response.raise_for_status()
+                data = response.json()
+
+                records = data.get('records', [])
+                on_records(records)
+                count += len(records)
+
+                offset = data.get('offset')
+                if not offset:
+                    break
+
+            except requests.exceptions.RequestException as e:
+                print(f"❌ Error fetching records ({formula or 'all records'}): {e}")
+                raise
+
+        return count
+
+    def fetch_uid_map(self, fields=None):
+        """
+        Build the uid -> record id map without downloading whole records
+        Only the merge field is requested, partitions are read concurrently,
+        and each page is folded into the map as soon as it arrives.
+        Raises RequestException if any partition fails (a partial map would
+        make existing records look new)
+        """
+        fields = fields or [self.merge_field]
+        formulas = self.partition_formulas()
+        uid_map = {}
+        map_lock = threading.Lock()
+
+        def add_records(records):
+            with map_lock:
+                for record in records:
+                    uid = record.get('fields', {}).get(self.merge_field)
+                    if uid:
+                        uid_map[uid] = record['id']
+
+        print(f"📥 Fetching '{self.merge_field}' of existing records "
+              f"({len(formulas)} partition(s))...")
+
+        with ThreadPoolExecutor(max_workers=len(formulas)) as executor:
+            futures = [executor.submit(self._read_partition, formula, fields, add_records)
+                       for formula in formulas]
+            total = sum(future.result() for future in futures)
+
+        print(f"   Retrieved {total} existing records ({len(uid_map)} with {self.merge_field})")
+        return uid_map
+
     def create_uid_map(self, records):
         """Create a mapping of UIDs to record IDs"""
         uid_map = {}
@@ -128,53 +258,306 @@ class AirtableSync:
 
         return {"fields": fields}
 
-    def batch_create_records(self, records):
-        """Create multiple records in batches"""
+    def _column_values(self, series):
+        """Convert one column to a list of JSON-ready Python values (one dtype conversion per column)"""
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return series.dt.strftime('%Y-%m-%d').tolist()
+        if series.dtype == object:
+            # Mixed columns may still hold numpy scalars or Timestamps
+            return [
+                value.strftime('%Y-%m-%d') if isinstance(value, pd.Timestamp)
+                else value.item() if hasattr(value, 'item') else value
+                for value in series.tolist()
+            ]
+        # numpy/pandas dtypes: tolist() already returns Python scalars
+        return series.tolist()
+
+    def prepare_records(self, df):
+        """
+        Convert a whole DataFrame to Airtable record payloads
+        Same output as prepare_record_for_airtable() per row, but NaN masking and
+        type conversion happen once per column and all records share one sync_date
+        """
+        fields = [field for field in self.config.get('sync_fields', []) if field in df.columns]
+        sync_date = datetime.now().isoformat()
+
+        columns = []
+        for field in fields:
+            series = df[field]
+            columns.append((field, self._column_values(series), series.notna().to_numpy()))
+
+        records = []
+        for i in range(len(df)):
+            record_fields = {field: values[i] for field, values, present in columns if present[i]}
+            record_fields['sync_date'] = sync_date
+            records.append({"fields": record_fields})
+        return records
+
+    def existing_mask(self, df, uid_map, field):
+        """Boolean array: True where the row's uid already exists in Airtable"""
+        if field not in df.columns:
+            return [False] * len(df)
+        return df[field].isin(uid_map.keys()).to_numpy()
+
+    def _send_batch(self, operation, batch):
+        """Send one write batch; returns (created, updated) or raises RequestException"""
+        if operation == 'create':
+            response = requests.post(self.base_url, headers=self.headers, json={"records": batch})
+            response.raise_for_status()
+            return len(batch), 0
+
+        payload = {"records": batch}
+        if operation == 'upsert':
+            payload["performUpsert"] = {"fieldsToMergeOn": [self.merge_field]}
+        response = requests.patch(self.base_url, headers=self.headers, json=payload)
+        response.raise_for_status()
+        if operation == 'upsert':
+            data = response.json()
+            return len(data.get('createdRecords', [])), len(data.get('updatedRecords', []))
+        return 0, len(batch)
+
+    def _is_retryable(self, error):
+        """Rate limits, server errors and connection problems are retried; other 4xx are not"""
+        response = getattr(error, 'response', None)
+        if response is None:
+            return True
+        return response.status_code == 429 or response.status_code >= 500
+
+    def _resend_operation(self, operation, batch):
+        """
+        Operation used to send a batch again after a send whose outcome is unknown
+        A create may already have been applied, so it is resent as performUpsert on
+        merge_field; that only works if every record has one, otherwise None
+        """
+        if operation != 'create':
+            return operation
+        if all(record.get('fields', {}).get(self.merge_field) for record in batch):
+            return 'upsert'
+        return None
+
+    def _send_with_retry(self, operation, batch):
+        """
+        Send a batch, retrying with exponential backoff
+        Retried creates are sent as upserts where possible (see _resend_operation)
+        Returns (created, updated, attempts); re-raises the last error when retries run out
+        """
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                send_as = operation
+                if attempt > 1:
+                    send_as = self._resend_operation(operation, batch) or operation
+                created, updated = self._send_batch(send_as, batch)
+                time.sleep(0.2)  # Rate limiting
+                return created, updated, attempt
+            except requests.exceptions.RequestException as e:
+                if attempt > self.max_retries or not self._is_retryable(e):
+                    e.attempts = attempt
+                    raise
+                delay = self.retry_backoff * (2 ** (attempt - 1))
+                print(f"   ⏳ Retrying in {delay:.1f}s (attempt {attempt}/{self.max_retries}): {e}")
+                time.sleep(delay)
+
+    def _run_batches(self, operation, records):
+        """
+        Send records in batches of batch_size
+        With a journal, batches acknowledged in an earlier run of the same job are skipped
+        and batches that exhaust their retries are kept in the dead-letter queue.
+        A create batch sent by an earlier run may already exist in Airtable, so it is
+        resent as an upsert on merge_field; an interrupted one without merge keys is dead-lettered
+        """
         created_count = 0
+        updated_count = 0
         failed_count = 0
+        skipped = 0
 
         for i in range(0, len(records), self.batch_size):
             batch = records[i:i + self.batch_size]
-
+            number = i // self.batch_size + 1
+            digest = None
+
+            send_as = operation
+
+            if self.journal is not None:
+                digest = batch_hash(operation, batch)
+                previous = self.journal.acked(digest)
+                if previous is not None:
+                    created_count += previous[0]
+                    updated_count += previous[1]
+                    skipped += 1
+                    continue
+                previous_state = self.journal.state(digest)
+                self.journal.mark_pending(digest, operation, number, batch)
+
+                if previous_state is not None and operation == 'create':
+                    send_as = self._resend_operation(operation, batch)
+                    if send_as is None and previous_state == PENDING:
+                        error = (f"interrupted create without {self.merge_field}; "
+                                 "check Airtable for these records before --retry-failed")
+                        failed_count += len(batch)
+                        self.journal.fail(digest, 0, error)
+                        print(f"   ❌ Batch {number}: {error}")
+                        continue
+                    if send_as is None:
+                        send_as = operation
+                    else:
+                        print(f"   ♻️  Batch {number} may already exist in Airtable; "
+                              f"resending as upsert on '{self.merge_field}'")
+
+            size_bytes = len(json.dumps({"records": batch}, ensure_ascii=False, default=str).encode('utf-8'))
+            started = time.perf_counter()
             try:
-                payload = {"records": batch}
-                response = requests.post(self.base_url, headers=self.headers, json=payload)
-                response.raise_for_status()
-
-                created_count += len(batch)
-                print(f"   ✅ Created batch {i//self.batch_size + 1}: {len(batch)} records")
-
-                time.sleep(0.2)  # Rate limiting
-
+                created, updated, attempts = self._send_with_retry(send_as, batch)
             except requests.exceptions.RequestException as e:
                 failed_count += len(batch)
-                print(f"   ❌ Failed batch {i//self.batch_size + 1}: {e}")
+                attempts = getattr(e, 'attempts', 1)
+                if digest is not None:
+                    self.journal.fail(digest, attempts, e)
+                self.ledger.batch(send_as, len(batch), size_bytes,
+                                  time.perf_counter() - started, attempts, 'failed', e)
+                print(f"   ❌ Failed batch {number}: {e}")
+                continue
+
+            self.ledger.batch(send_as, len(batch), size_bytes,
+                              time.perf_counter() - started, attempts, 'ok')
+
+            if digest is not None:
+                self.journal.ack(digest, attempts, created, updated)
+            created_count += created
+            updated_count += updated
+            if send_as == 'create':
+                print(f"   ✅ Created batch {number}: {len(batch)} records")
+            elif send_as == 'update':
+                print(f"   ✅ Updated batch {number}: {len(batch)} records")
+            else:
+                print(f"   ✅ Upserted batch {number}: {created} created, {updated} updated")
+
+        if skipped:
+            print(f"   ⏭️  Skipped {skipped} batch(es) already sent in a previous run")
 
+        return created_count, updated_count, failed_count
+
+    def batch_create_records(self, records):
+        """Create multiple records in batches"""
+        created_count, _, failed_count = self._run_batches('create', records)
         return created_count, failed_count
 
     def batch_update_records(self, records):
         """Update multiple records in batches"""
-        updated_count = 0
-        failed_count = 0
+        _, updated_count, failed_count = self._run_batches('update', records)
+        return updated_count, failed_count
 
-        for i in range(0, len(records), self.batch_size):
-            batch = records[i:i + self.batch_size]
+    def batch_upsert_records(self, records):
+        """
+        Create or update records in batches with performUpsert
+        Airtable matches each record on merge_field (uid), so no uid -> record id map is needed
+        """
+        return self._run_batches('upsert', records)
+
+    def retry_dead_letters(self):
+        """Resend batches that were moved to the dead-letter queue"""
+        with SyncJournal(self.journal_file) as journal:
+            letters = journal.dead_letters()
+            print(f"\n📮 Retrying {len(letters)} failed batch(es)...")
+            recovered = 0
+            for job_id, digest, operation, batch, _, _ in letters:
+                try:
+                    # A failed create may have reached Airtable before the error
+                    send_as = self._resend_operation(operation, batch) or operation
+                    created, updated, attempts = self._send_with_retry(send_as, batch)
+                except requests.exceptions.RequestException as e:
+                    journal.fail(digest, getattr(e, 'attempts', 1), e, job_id=job_id)
+                    print(f"   ❌ Still failing ({operation}, {len(batch)} records): {e}")
+                    continue
+                journal.ack(digest, attempts, created, updated, job_id=job_id)
+                recovered += 1
+                print(f"   ✅ Recovered {operation} batch: {len(batch)} records")
+            for job_id in {letter[0] for letter in letters}:
+                journal.finish(job_id)
+            print(f"   Summary: {recovered} recovered, {len(letters) - recovered} still failed")
+        return recovered
+
+    def sync_data_upsert(self, df):
+        """Sync DataFrame rows with performUpsert (skips reading the existing table)"""
+        records = self.prepare_records(df)
+
+        # Records without a uid cannot be merged on, so they are always created
+        if self.merge_field in df.columns and self.merge_field in self.config.get('sync_fields', []):
+            uids = df[self.merge_field]
+            mergeable = (uids.notna() & (uids.astype(str) != '')).to_numpy()
+        else:
+            mergeable = [False] * len(records)
 
-            try:
-                payload = {"records": batch}
-                response = requests.patch(self.base_url, headers=self.headers, json=payload)
-                response.raise_for_status()
+        records_to_upsert = [record for record, keep in zip(records, mergeable) if keep]
+        records_to_create = [record for record, keep in zip(records, mergeable) if not keep]
 
-                updated_count += len(batch)
-                print(f"   ✅ Updated batch {i//self.batch_size + 1}: {len(batch)} records")
+        print(f"\n📊 Sync Plan (upsert on '{self.merge_field}'):")
+        print(f"   • Records to upsert: {len(records_to_upsert)}")
+        print(f"   • Records without {self.merge_field} to create: {len(records_to_create)}")
 
-                time.sleep(0.2)  # Rate limiting
+        created = updated = 0
+        if records_to_upsert:
+            print(f"\n🔁 Upserting records...")
+            created, updated, failed = self.batch_upsert_records(records_to_upsert)
+            print(f"   Summary: {created} created, {updated} updated, {failed} failed")
 
-            except requests.exceptions.RequestException as e:
-                failed_count += len(batch)
-                print(f"   ❌ Failed batch {i//self.batch_size + 1}: {e}")
+        if records_to_create:
+            print(f"\n🆕 Creating records without {self.merge_field}...")
+            created_new, failed = self.batch_create_records(records_to_create)
+            created += created_new
+            print(f"   Summary: {created_new} created, {failed} failed")
+
+        return created, updated
+
+    def sync_data_mirror(self, df):
+        """
+        Sync DataFrame rows using the local mirror
+        The mirror is refreshed incrementally, then rows whose fields already match
+        the mirrored record are skipped instead of being sent again
+        """
+        from airtable_mirror import AirtableMirror
+
+        with AirtableMirror(self) as mirror:
+            mirror.refresh()
+            uid_map = mirror.uid_map()
+            mirrored_fields = mirror.fields_by_uid()
 
-        return updated_count, failed_count
+        records_to_create = []
+        records_to_update = []
+        unchanged = 0
+
+        uids = df[self.merge_field].tolist() if self.merge_field in df.columns else [None] * len(df)
+        existing = self.existing_mask(df, uid_map, self.merge_field)
+
+        for uid, record, exists in zip(uids, self.prepare_records(df), existing):
+            if exists:
+                current = mirrored_fields.get(uid, {})
+                if all(current.get(field) == value
+                       for field, value in record['fields'].items() if field != 'sync_date'):
+                    unchanged += 1
+                    continue
+                record['id'] = uid_map[uid]
+                records_to_update.append(record)
+            else:
+                records_to_create.append(record)
+
+        print(f"\n📊 Sync Plan (local mirror):")
+        print(f"   • Records to create: {len(records_to_create)}")
+        print(f"   • Records to update: {len(records_to_update)}")
+        print(f"   • Unchanged records skipped: {unchanged}")
+
+        if records_to_create:
+            print(f"\n🆕 Creating new records...")
+            created, failed = self.batch_create_records(records_to_create)
+            print(f"   Summary: {created} created, {failed} failed")
+
+        if records_to_update:
+            print(f"\n🔄 Updating existing records...")
+            updated, failed = self.batch_update_records(records_to_update)
+            print(f"   Summary: {updated} updated, {failed} failed")
+
+        return len(records_to_create), len(records_to_update)
 
     def sync_data(self, csv_file):
         """Sync CSV data to Airtable"""
@@ -190,25 +573,60 @@ class AirtableSync:
             print(f"❌ Error loading CSV: {e}")
             return
 
-        # Get existing records
-        existing_records = self.get_existing_records()
-        uid_map = self.create_uid_map(existing_records)
+        if self.use_journal:
+            # Same input file + same table + same mode = same job, so a re-run resumes it
+            job_id = hashlib.sha1('|'.join([
+                self.config['base_id'], self.config['table_name'], self.sync_mode,
+                self.merge_field, file_digest(csv_file)
+            ]).encode('utf-8')).hexdigest()
+            self.journal = SyncJournal(self.journal_file)
+            resumed = self.journal.begin(job_id, f"{self.sync_mode}:{os.path.abspath(csv_file)}")
+            if resumed:
+                print(f"♻️  Resuming previous sync: {resumed} batch(es) already acknowledged")
+
+        try:
+            if self.sync_mode == 'upsert':
+                created, updated = self.sync_data_upsert(df)
+            elif self.sync_mode == 'mirror':
+                created, updated = self.sync_data_mirror(df)
+            else:
+                created, updated = self.sync_data_fetch(df)
+        except requests.exceptions.RequestException as e:
+            print(f"\n❌ Could not read existing Airtable records, nothing was sent: {e}")
+            return
+        else:
+            if self.journal is not None and self.journal.finish() == 'failed':
+                print("\n⚠️  Some batches failed; re-run the same sync to resume, "
+                      "or use --retry-failed to resend them")
+        finally:
+            if self.journal is not None:
+                self.journal.close()
+                self.journal = None
+
+        print("\n✅ Sync completed!")
+
+        # Save sync log
+        self.save_sync_log(created, updated)
+
+    def sync_data_fetch(self, df):
+        """Sync DataFrame rows after downloading the uid -> record id map"""
+        # Get existing uid -> record id map (uid field only, partitions read in parallel)
+        uid_map = self.fetch_uid_map()
 
         # Separate records for create vs update
         records_to_create = []
         records_to_update = []
 
-        for _, row in df.iterrows():
-            uid = row.get('uid')
+        uids = df['uid'].tolist() if 'uid' in df.columns else [None] * len(df)
+        existing = self.existing_mask(df, uid_map, 'uid')
 
-            if uid and uid in uid_map:
+        for uid, record, exists in zip(uids, self.prepare_records(df), existing):
+            if exists:
                 # Update existing record
-                record = self.prepare_record_for_airtable(row)
                 record['id'] = uid_map[uid]
                 records_to_update.append(record)
             else:
                 # Create new record
-                record = self.prepare_record_for_airtable(row)
                 records_to_create.append(record)
 
         print(f"\n📊 Sync Plan:")
@@ -226,43 +644,18 @@ class AirtableSync:
             updated, failed = self.batch_update_records(records_to_update)
             print(f"   Summary: {updated} updated, {failed} failed")
 
-        print("\n✅ Sync completed!")
-
-        # Save sync log
-        self.save_sync_log(len(records_to_create), len(records_to_update))
+        return len(records_to_create), len(records_to_update)
 
     def save_sync_log(self, created, updated):
-        """Save sync operation log"""
-        log_file = '../logs/airtable_sync.json'
-        os.makedirs(os.path.dirname(log_file), exist_ok=True)
-
-        log_entry = {
-            "timestamp": datetime.now().isoformat(),
-            "records_created": created,
-            "records_updated": updated,
-            "base_id": self.config['base_id'],
-            "table_name": self.config['table_name']
-        }
-
-        # Load existing log
-        if os.path.exists(log_file):
-            with open(log_file, 'r') as f:
-                log_data = json.load(f)
-        else:
-            log_data = {"sync_history": []}
-
-        # Append new entry
-        log_data["sync_history"].append(log_entry)
-
-        # Keep only last 100 entries
-        log_data["sync_history"] = log_data["sync_history"][-100:]
-
-        # Save updated log
-        with open(log_file, 'w') as f:
-            json.dump(log_data, f, indent=2)
-
-        print(f"📝 Sync log saved to {log_file}")
-
+        """Append the run summary to the sync ledger"""
+        self.ledger.run(
+            records_created=created,
+            records_updated=updated,
+            sync_mode=self.sync_mode,
+            base_id=self.config['base_id'],
+            table_name=self.config['table_name']
+        )
+        print(f"📝 Sync log appended to {self.ledger.path}")
 
 def main():
     """Main execution function"""
@@ -273,16 +666,26 @@ def main():
                         help='Input CSV file path')
     parser.add_argument('--config', default='airtable_config.json',
                         help='Airtable configuration file')
+    parser.add_argument('--mode', choices=['upsert', 'mirror', 'fetch'],
+                        help='Sync mode (default: sync_mode in config, otherwise fetch)')
+    parser.add_argument('--no-journal', action='store_true',
+                        help='Do not record batches in the sync journal (no resume)')
+    parser.add_argument('--retry-failed', action='store_true',
+                        help='Resend batches from the dead-letter queue and exit')
     args = parser.parse_args()
 
     # Check if input file exists
-    if not os.path.exists(args.input):
+    if not args.retry_failed and not os.path.exists(args.input):
         print(f"❌ Input file not found: {args.input}")
         print("   Please run google_sheets_sync.py first to generate data")
         return
 
     # Initialize sync
     sync = AirtableSync(args.config)
+    if args.mode:
+        sync.sync_mode = args.mode
+    if args.no_journal:
+        sync.use_journal = False
 
     # Check configuration
     if not sync.config.get('api_key') or sync.config['api_key'] == 'YOUR_API_KEY_HERE':
@@ -297,6 +700,10 @@ def main():
         print("   • export AIRTABLE_TABLE_NAME=ManagementPanel")
         return
 
+    if args.retry_failed:
+        sync.retry_dead_letters()
+        return
+
     # Run sync
     sync.sync_data(args.input)
 
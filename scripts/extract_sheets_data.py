@@ -11,10 +11,31 @@ import os
 from datetime import datetime
 import re
 
+from transform_plan import TransformPlan, compile_plan
+
 # Configuration
 FIELD_MAPPING_FILE = 'field_mapping.json'
 OUTPUT_DIR = '../source'
 
+# Accepted date/time formats, in priority order (first match wins)
+DATE_FORMATS = [
+    '%Y-%m-%d',
+    '%Y/%m/%d',
+    '%d/%m/%Y',
+    '%d-%m-%Y',
+    '%Y.%m.%d',
+    '%d.%m.%Y'
+]
+TIME_FORMATS = [
+    '%H:%M:%S',
+    '%H:%M',
+    '%I:%M %p',
+    '%I:%M:%S %p'
+]
+
+# Distinct cells per column used to infer which formats are present
+FORMAT_SAMPLE_SIZE = 200
+
 def load_field_mapping():
     """Load field mapping configuration"""
     mapping_file = os.path.join(os.path.dirname(__file__), FIELD_MAPPING_FILE)
@@ -114,16 +135,7 @@ def normalize_date(date_str):
     date_str = str(date_str).strip()
 
     # Try different date formats
-    formats = [
-        '%Y-%m-%d',
-        '%Y/%m/%d',
-        '%d/%m/%Y',
-        '%d-%m-%Y',
-        '%Y.%m.%d',
-        '%d.%m.%Y'
-    ]
-
-    for fmt in formats:
+    for fmt in DATE_FORMATS:
         try:
             dt = datetime.strptime(date_str, fmt)
             return dt.strftime('%Y-%m-%d')
@@ -143,14 +155,7 @@ def normalize_time(time_str):
     time_str = time_str.replace('오전', 'AM').replace('오후', 'PM')
 
     # Try different time formats
-    formats = [
-        '%H:%M:%S',
-        '%H:%M',
-        '%I:%M %p',
-        '%I:%M:%S %p'
-    ]
-
-    for fmt in formats:
+    for fmt in TIME_FORMATS:
         try:
             dt = datetime.strptime(time_str, fmt)
             return dt.strftime('%H:%M:%S')
@@ -163,6 +168,76 @@ def normalize_time(time_str):
 
     return time_str
 
+def infer_formats(values, formats, sample_size=FORMAT_SAMPLE_SIZE):
+    """Formats (in priority order) that match at least one sampled cell of a column"""
+    found = set()
+    for value in values.drop_duplicates().head(sample_size):
+        for fmt in formats:
+            try:
+                datetime.strptime(value, fmt)
+            except ValueError:
+                continue
+            found.add(fmt)
+            break
+    return [fmt for fmt in formats if fmt in found]
+
+def normalize_datetime_column(series, formats, output_format, fallback, prepare=None):
+    """
+    Vectorized normalize_date / normalize_time for a whole column
+    The formats found in a sample are parsed with one pd.to_datetime(format=...) call
+    each, in priority order; cells none of them parse go through fallback per cell
+    """
+    result = np.full(len(series), np.nan, dtype=object)
+    present = series.notna().to_numpy()
+    values = series[present].astype(str).str.strip()
+    if prepare is not None:
+        values = prepare(values)
+    values = values.reset_index(drop=True)
+    positions = np.flatnonzero(present)
+
+    for fmt in infer_formats(values, formats):
+        if values.empty:
+            break
+        parsed = pd.to_datetime(values, format=fmt, errors='coerce')
+        ok = parsed.notna().to_numpy()
+        result[positions[ok]] = parsed[ok].dt.strftime(output_format).to_numpy()
+        values = values[~ok].reset_index(drop=True)
+        positions = positions[~ok]
+
+    # Residual cells (other formats, out-of-range years, free text)
+    result[positions] = [fallback(value) for value in values]
+    return pd.Series(result, index=series.index, dtype=object)
+
+def normalize_date_column(series):
+    """normalize_date applied to a whole column"""
+    return normalize_datetime_column(series, DATE_FORMATS, '%Y-%m-%d', normalize_date)
+
+def normalize_time_column(series):
+    """normalize_time applied to a whole column"""
+    return normalize_datetime_column(
+        series, TIME_FORMATS, '%H:%M:%S', normalize_time,
+        prepare=lambda values: values.str.replace('오전', 'AM').str.replace('오후', 'PM')
+    )
+
+# Fields whose value_mapping is applied
+VALUE_MAPPED_FIELDS = ['gender', 'participation_result', 'confirmation_status']
+
+# Column -> normalizer name
+COLUMN_NORMALIZERS = {
+    'phone': 'phone',
+    'birth_date': 'date',
+    'reservation_date': 'date',
+    'participation_date': 'date',
+    'actual_reservation_time': 'time',
+    'participation_time': 'time'
+}
+
+NORMALIZER_FUNCS = {
+    'phone': lambda series: series.apply(normalize_phone),
+    'date': normalize_date_column,
+    'time': normalize_time_column
+}
+
 def process_csv_data(file_path, location, mapping):
     """Process CSV file and apply field mapping"""
     try:
@@ -181,44 +256,10 @@ def process_csv_data(file_path, location, mapping):
         # Add data source
         df['데이터 소스'] = location
 
-        # Rename columns based on mapping
-        korean_to_english = mapping['korean_to_english']
-        df.rename(columns=korean_to_english, inplace=True)
-
-        # Apply value mappings
-        value_mapping = mapping['value_mapping']
-
-        # Map gender
-        if 'gender' in df.columns and 'gender' in value_mapping:
-            df['gender'] = df['gender'].map(value_mapping['gender']).fillna(df['gender'])
-
-        # Map participation result
-        if 'participation_result' in df.columns and 'participation_result' in value_mapping:
-            df['participation_result'] = df['participation_result'].map(
-                value_mapping['participation_result']
-            ).fillna(df['participation_result'])
-
-        # Map confirmation status
-        if 'confirmation_status' in df.columns and 'confirmation_status' in value_mapping:
-            df['confirmation_status'] = df['confirmation_status'].map(
-                value_mapping['confirmation_status']
-            ).fillna(df['confirmation_status'])
-
-        # Normalize phone numbers
-        if 'phone' in df.columns:
-            df['phone'] = df['phone'].apply(normalize_phone)
-
-        # Normalize dates
-        date_columns = ['birth_date', 'reservation_date', 'participation_date']
-        for col in date_columns:
-            if col in df.columns:
-                df[col] = df[col].apply(normalize_date)
-
-        # Normalize times
-        time_columns = ['actual_reservation_time', 'participation_time']
-        for col in time_columns:
-            if col in df.columns:
-                df[col] = df[col].apply(normalize_time)
+        # Rename columns, map values and normalize phone/date/time columns with the
+        # plan compiled for this file's header row
+        plan = TransformPlan(compile_plan(list(df.columns), mapping, VALUE_MAPPED_FIELDS, COLUMN_NORMALIZERS))
+        df = plan.apply(df, NORMALIZER_FUNCS)
 
         # Add system fields
         df['created_at'] = datetime.now().isoformat()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Google Session Module
+Shared OAuth credentials and one pooled AuthorizedSession used for every Sheets request
+(values.batchGet and CSV exports)
+"""
+
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import requests
+from google.auth.transport.requests import AuthorizedSession, Request
+from google.oauth2.credentials import Credentials
+
+from sheets_client import SheetsClient, get_client, pooled_adapter
+
+TOKEN_FILE = Path('token.json')
+SCOPES = ['https://www.googleapis.com/auth/spreadsheets.readonly']
+
+BATCH_GET_URL = 'https://sheets.googleapis.com/v4/spreadsheets/{spreadsheet_id}/values:batchGet'
+
+# Tokens are refreshed when they expire within this margin (not on every run)
+REFRESH_MARGIN = timedelta(minutes=5)
+
+# Per-process shared objects
+_credentials = None
+_session = None
+_sheets_client = None
+
+
+def _needs_refresh(creds):
+    """True if the access token is missing or expires within REFRESH_MARGIN"""
+    if not creds.token:
+        return True
+    if creds.expiry is None:
+        return False
+    # google-auth stores expiry as a naive UTC datetime
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    return creds.expiry - now <= REFRESH_MARGIN
+
+
+def _save_token(creds, token_file=TOKEN_FILE):
+    """Write token.json only when its contents actually changed"""
+    token_json = creds.to_json()
+    if token_file.exists() and token_file.read_text() == token_json:
+        return False
+    token_file.write_text(token_json)
+    return True
+
+
+def get_credentials(token_file=TOKEN_FILE):
+    """
+    Shared OAuth credentials loaded from token.json
+    Returns None if there is no usable token (interactive authorization is needed);
+    a token that cannot be refreshed is still used until it actually expires
+    """
+    global _credentials
+    if _credentials is None:
+        if not token_file.exists():
+            return None
+        _credentials = Credentials.from_authorized_user_file(str(token_file), SCOPES)
+
+    if _needs_refresh(_credentials):
+        if not _credentials.refresh_token:
+            return _credentials if _credentials.valid else None
+        _credentials.refresh(Request(session=_pooled_session(requests.Session())))
+        _save_token(_credentials, token_file)
+
+    return _credentials
+
+
+def _pooled_session(session):
+    """Mount the Sheets keep-alive connection pool (with retries) on a requests session"""
+    session.mount('https://', pooled_adapter())
+    return session
+
+
+def get_session():
+    """
+    Shared AuthorizedSession (pooled connections, token refreshed automatically)
+    Returns None if no credentials are available
+    """
+    global _session
+    if _session is None:
+        creds = get_credentials()
+        if creds is None:
+            return None
+        _session = _pooled_session(AuthorizedSession(creds))
+    return _session
+
+
+def get_sheets_client():
+    """
+    Shared SheetsClient whose exports go through the authorized session
+    (so private sheets can be exported too); the anonymous client without credentials
+    """
+    global _sheets_client
+    if _sheets_client is None:
+        session = get_session()
+        _sheets_client = SheetsClient(session=session) if session is not None else get_client()
+    return _sheets_client
+
+
+def batch_get_values(spreadsheet_id, ranges, **params):
+    """
+    values.batchGet over the shared authorized session
+    params are passed as query parameters (valueRenderOption, fields, ...).
+    Returns the decoded response; raises requests.RequestException on failure
+    """
+    session = get_session()
+    if session is None:
+        raise requests.RequestException("No Google credentials available")
+    response = session.get(BATCH_GET_URL.format(spreadsheet_id=spreadsheet_id),
+                           params={'ranges': list(ranges), **params}, timeout=30)
+    response.raise_for_status()
+    return response.json()
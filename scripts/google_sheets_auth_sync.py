@@ -13,12 +13,10 @@ import time
 from datetime import datetime
 from pathlib import Path
 import requests
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import Flow
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
 from dotenv import load_dotenv
+from google_session import batch_get_values, get_credentials, get_sheets_client
+from sheets_client import export_url
 import base64
 import hashlib
 
@@ -107,82 +105,59 @@ def create_oauth_flow():
     return flow
 
 def authenticate_oauth():
-    """Authenticate using OAuth2 with stored credentials"""
-    creds = None
-    token_file = Path('token.json')
-
-    # Load saved token
-    if token_file.exists():
-        creds = Credentials.from_authorized_user_file(str(token_file))
+    """Authenticate using OAuth2 with stored credentials (shared, refreshed only near expiry)"""
+    creds = get_credentials()
 
     # If no valid credentials, need to authenticate
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            creds.refresh(Request())
-        else:
-            print("\n⚠️ OAuth2 인증이 필요합니다.")
-            print("다음 단계를 따라주세요:")
-            print("1. Google Cloud Console에서 OAuth2 credentials 생성")
-            print("2. oauth_credentials.json 파일로 저장")
-            print("3. 스크립트 다시 실행")
-            return None
-
-    # Save credentials
-    if creds:
-        with open(token_file, 'w') as token:
-            token.write(creds.to_json())
+    if not creds:
+        print("\n⚠️ OAuth2 인증이 필요합니다.")
+        print("다음 단계를 따라주세요:")
+        print("1. Google Cloud Console에서 OAuth2 credentials 생성")
+        print("2. oauth_credentials.json 파일로 저장")
+        print("3. 스크립트 다시 실행")
+        return None
 
     return creds
 
-def fetch_with_export_url(spreadsheet_id, gid=None):
+def iter_export_batches(spreadsheet_id, gid=None, transform=None):
     """
-    Try to fetch Google Sheets data using export URL
+    Yield batches of sheet rows from the export URL as they are downloaded
     This works for publicly accessible sheets
+    transform (e.g. normalize_field_names) is applied to each batch, so callers can
+    fold batches into their output without holding the raw rows of the whole sheet.
+    Raises requests.RequestException (possibly after some batches were yielded)
     """
-    if gid:
-        url = f"https://docs.google.com/spreadsheets/d/{spreadsheet_id}/export?format=csv&gid={gid}"
-    else:
-        url = f"https://docs.google.com/spreadsheets/d/{spreadsheet_id}/export?format=csv"
-
-    print(f"Attempting to fetch from: {url}")
+    print(f"Attempting to fetch from: {export_url(spreadsheet_id, gid)}")
 
-    # Set up session with cookies (simulate logged-in state)
-    session = requests.Session()
+    # Sent through the shared authorized session when credentials are available
+    for batch in get_sheets_client().iter_records(spreadsheet_id, gid):
+        yield transform(batch) if transform else batch
 
-    # Add headers to appear more like a browser
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
-        'Accept': 'text/csv,application/csv,text/plain',
-        'Accept-Language': 'ko-KR,ko;q=0.9,en;q=0.8',
-        'Accept-Encoding': 'gzip, deflate, br',
-        'Connection': 'keep-alive'
-    }
-
-    try:
-        response = session.get(url, headers=headers, timeout=30)
-
-        if response.status_code == 200:
-            # Parse CSV
-            lines = response.text.splitlines()
-            reader = csv.DictReader(lines)
-            data = list(reader)
-            print(f"✅ Successfully fetched {len(data)} records")
-            return data
-        elif response.status_code == 401:
+def report_export_error(e):
+    """Print why an export URL download failed"""
+    if isinstance(e, requests.HTTPError):
+        if e.response is not None and e.response.status_code == 401:
             print("❌ Authentication required - Sheet is private")
-            return None
         else:
-            print(f"❌ Failed with status code: {response.status_code}")
-            return None
-
-    except requests.RequestException as e:
+            print(f"❌ Failed with status code: {e.response.status_code if e.response is not None else e}")
+    else:
         print(f"❌ Error fetching data: {e}")
-        return None
 
-def fetch_with_api(spreadsheet_id, range_name='Sheet1!A:Z'):
-    """Fetch data using Google Sheets API with authentication"""
+def add_unique_records(unique_data, records, sheet_name):
+    """Tag records with their sheet and keep the first record of each uid; returns the record count"""
+    for record in records:
+        # Add source info
+        record['data_source'] = sheet_name
+        uid = record.get('uid')
+        if uid and uid not in unique_data:
+            unique_data[uid] = record
+    return len(records)
+
+# Only the cell values are needed; range names / major dimension are dropped from the response
+BATCH_GET_FIELDS = 'valueRanges(values)'
 
-    # Try OAuth authentication
+def authenticate_api():
+    """OAuth credentials for the Sheets API, or None (with instructions) if not configured"""
     creds = authenticate_oauth()
 
     if not creds:
@@ -191,39 +166,62 @@ def fetch_with_api(spreadsheet_id, range_name='Sheet1!A:Z'):
         print(f"- Email: {GOOGLE_CREDENTIALS['email']}")
         print("- Password: [암호화 저장]")
         print("- Service: Google")
-        return None
-
-    try:
-        service = build('sheets', 'v4', credentials=creds)
 
-        # Call the Sheets API
-        sheet = service.spreadsheets()
-        result = sheet.values().get(
-            spreadsheetId=spreadsheet_id,
-            range=range_name
-        ).execute()
-
-        values = result.get('values', [])
+    return creds
 
-        if not values:
-            print('No data found in sheet.')
-            return []
+def values_to_records(values):
+    """Convert a values grid (header row first) to a list of dictionaries"""
+    if len(values) > 1:
+        headers = values[0]
+        data = []
+        for row in values[1:]:
+            padded_row = row + [''] * (len(headers) - len(row))
+            record = dict(zip(headers, padded_row))
+            data.append(record)
+        return data
 
-        print(f"✅ Fetched {len(values)} rows from Google Sheets API")
+    return []
 
-        # Convert to list of dictionaries
-        if len(values) > 1:
-            headers = values[0]
-            data = []
-            for row in values[1:]:
-                padded_row = row + [''] * (len(headers) - len(row))
-                record = dict(zip(headers, padded_row))
-                data.append(record)
-            return data
+def fetch_with_api(spreadsheet_id, range_name='Sheet1!A:Z'):
+    """Fetch data using Google Sheets API with authentication"""
+    results = fetch_all_with_api(spreadsheet_id, [range_name])
+    return results[0] if results is not None else None
 
-        return []
+def fetch_all_with_api(spreadsheet_id, ranges):
+    """
+    Fetch several ranges with a single values().batchGet request
+    Values are requested as formatted strings (same as the CSV export) and the
+    response is limited to the cell values with a fields mask.
+    Returns one record list per range (in order), or None on failure
+    """
+    creds = authenticate_api()
+    if not creds:
+        return None
 
-    except HttpError as err:
+    try:
+        # Call the Sheets API over the shared pooled, authorized session
+        result = batch_get_values(
+            spreadsheet_id,
+            ranges,
+            majorDimension='ROWS',
+            valueRenderOption='FORMATTED_VALUE',
+            dateTimeRenderOption='FORMATTED_STRING',
+            fields=BATCH_GET_FIELDS
+        )
+
+        value_ranges = result.get('valueRanges', [])
+        data = []
+        for i, range_name in enumerate(ranges):
+            values = value_ranges[i].get('values', []) if i < len(value_ranges) else []
+            if not values:
+                print(f'No data found in {range_name}.')
+            else:
+                print(f"✅ Fetched {len(values)} rows from {range_name}")
+            data.append(values_to_records(values))
+
+        return data
+
+    except requests.RequestException as err:
         print(f"❌ API Error: {err}")
         return None
 
@@ -405,11 +403,14 @@ def main():
     print(f"\n📊 Target Spreadsheet: {spreadsheet_id}")
     print(f"👤 Google Account: {GOOGLE_CREDENTIALS['email']}")
 
-    all_data = []
-
     # Try different methods
     print("\n🔄 Attempting to fetch data...")
 
+    # Unique records (uid -> record) of each sheet, merged in sheet order at the end;
+    # None marks a sheet that has not been read (yet)
+    fetched = {}
+    api_ranges = {}
+
     # Method 1: Try export URL first (simpler)
     for sheet_name, sheet_config in config.get('sheets', {}).items():
         print(f"\n📑 Processing sheet: {sheet_name}")
@@ -419,32 +420,42 @@ def main():
             print(f"⚠️ No GID for {sheet_name}, skipping...")
             continue
 
-        # Try export URL
-        raw_data = fetch_with_export_url(spreadsheet_id, gid)
-
-        # If failed, try API
-        if raw_data is None:
-            print("Trying Google Sheets API...")
-            range_name = f"{sheet_config.get('name', 'Sheet1')}!A:Z"
-            raw_data = fetch_with_api(spreadsheet_id, range_name)
-
-        if raw_data:
-            # Normalize the data
-            normalized = normalize_field_names(raw_data)
-
-            # Add source info
-            for record in normalized:
-                record['data_source'] = sheet_name
-
-            all_data.extend(normalized)
-            print(f"✅ Processed {len(normalized)} records from {sheet_name}")
+        # Rows are normalized and de-duplicated batch by batch while streaming;
+        # a failed download discards the sheet's partial rows
+        sheet_data = {}
+        count = 0
+        try:
+            for batch in iter_export_batches(spreadsheet_id, gid, transform=normalize_field_names):
+                count += add_unique_records(sheet_data, batch, sheet_name)
+            print(f"✅ Successfully fetched {count} records")
+            fetched[sheet_name] = sheet_data
+        except requests.RequestException as e:
+            report_export_error(e)
+            fetched[sheet_name] = None
+            api_ranges[sheet_name] = f"{sheet_config.get('name', 'Sheet1')}!A:Z"
+            continue
 
-    # Remove duplicates
+        if count:
+            print(f"✅ Processed {count} records from {sheet_name}")
+
+    # Method 2: sheets the export URL could not read, all in one API request
+    if api_ranges:
+        print(f"\nTrying Google Sheets API for {len(api_ranges)} sheet(s)...")
+        results = fetch_all_with_api(spreadsheet_id, list(api_ranges.values()))
+        if results is not None:
+            for sheet_name, raw_data in zip(api_ranges.keys(), results):
+                # Normalize the data
+                sheet_data = {}
+                count = add_unique_records(sheet_data, normalize_field_names(raw_data), sheet_name)
+                fetched[sheet_name] = sheet_data
+                if count:
+                    print(f"✅ Processed {count} records from {sheet_name}")
+
+    # Remove duplicates across sheets (first sheet wins)
     unique_data = {}
-    for record in all_data:
-        uid = record.get('uid')
-        if uid and uid not in unique_data:
-            unique_data[uid] = record
+    for sheet_data in fetched.values():
+        for uid, record in (sheet_data or {}).items():
+            unique_data.setdefault(uid, record)
 
     final_data = list(unique_data.values())
 
@@ -7,12 +7,14 @@ No authentication required for public sheets
 
 import os
 import json
-import csv
 import sys
 from datetime import datetime
 from pathlib import Path
 import requests
 from dotenv import load_dotenv
+from identity import IdentityMap
+from record_cache import RecordCacheWriter, cache_path, write_csv
+from sheets_client import export_url, get_client
 
 # Load environment variables
 load_dotenv()
@@ -21,32 +23,8 @@ load_dotenv()
 CACHE_DIR = Path('../cache')
 CACHE_DIR.mkdir(exist_ok=True)
 
-def fetch_google_sheets_csv(spreadsheet_id, gid=None):
-    """Fetch Google Sheets data as CSV using export URL"""
-
-    # Build export URL
-    if gid:
-        url = f"https://docs.google.com/spreadsheets/d/{spreadsheet_id}/export?format=csv&gid={gid}"
-    else:
-        url = f"https://docs.google.com/spreadsheets/d/{spreadsheet_id}/export?format=csv"
-
-    print(f"Fetching from: {url}")
-
-    try:
-        response = requests.get(url)
-        response.raise_for_status()
-
-        # Parse CSV
-        lines = response.text.splitlines()
-        reader = csv.DictReader(lines)
-        data = list(reader)
-
-        print(f"Successfully fetched {len(data)} records")
-        return data
-
-    except requests.RequestException as e:
-        print(f"Error fetching data: {e}")
-        return []
+# Cache compression: none, gzip or zstd (zstd needs the zstandard package)
+CACHE_COMPRESSION = os.getenv('SHEETS_CACHE_COMPRESSION', 'none')
 
 def normalize_field_names(data):
     """Normalize Korean field names to English"""
@@ -199,44 +177,48 @@ def normalize_value(field_name, value):
 
     return value
 
-def save_to_json(data, filename='sheets_data.json'):
-    """Save data to JSON file"""
-    cache_file = CACHE_DIR / filename
-
-    output = {
-        'timestamp': datetime.now().isoformat(),
-        'record_count': len(data),
-        'data': data
-    }
+def save_to_cache(records, name='sheets_data', compression=None):
+    """Stream records to the NDJSON cache (cache/sheets_data.ndjson[.gz|.zst]); returns (path, fields)"""
+    cache_file = cache_path(CACHE_DIR / name, compression or CACHE_COMPRESSION)
 
-    with open(cache_file, 'w', encoding='utf-8') as f:
-        json.dump(output, f, ensure_ascii=False, indent=2)
+    with RecordCacheWriter(cache_file) as writer:
+        writer.write_all(records)
 
-    print(f"Saved {len(data)} records to {cache_file}")
+    print(f"Saved {writer.count} records to {cache_file}")
+    return cache_file, writer.fieldnames
 
-def save_to_csv(data, filename='sheets_data.csv'):
-    """Save data to CSV file"""
-    if not data:
+def save_to_csv(cache_file, fieldnames, filename='sheets_data.csv'):
+    """Write the cached records to a CSV file without loading them all"""
+    if not fieldnames:
         print("No data to save")
         return
 
     csv_file = CACHE_DIR / filename
 
-    # Get all unique keys
-    all_keys = set()
-    for record in data:
-        all_keys.update(record.keys())
-
     # Sort keys for consistent output
-    fieldnames = sorted(list(all_keys))
-
-    with open(csv_file, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(data)
+    write_csv(cache_file, csv_file, sorted(fieldnames))
 
     print(f"Saved CSV to {csv_file}")
 
+def add_unique_records(unique_data, records, identities, source, first_row):
+    """
+    Add records to unique_data (uid -> record), keeping the first occurrence of each UID
+    Records without a UID get a stable one from the identity map (same row -> same UID every sync);
+    identical rows each get their own UID, so they are all kept
+    """
+    for row_number, record in enumerate(records, start=first_row):
+        uid = record.get('uid') or identities.assign(record, source, row_number)
+        if uid:
+            record['uid'] = uid
+            # Keep the first occurrence (or you could merge them)
+            if uid not in unique_data:
+                unique_data[uid] = record
+        else:
+            # Rows without name, phone or e-mail cannot be identified; keyed by sheet position
+            temp_uid = f"{source}_row_{row_number}"
+            record['uid'] = temp_uid
+            unique_data[temp_uid] = record
+
 def main():
     """Main function"""
 
@@ -254,53 +236,56 @@ def main():
         print("Error: spreadsheet_id not found in config")
         return []
 
-    all_data = []
-
-    # Fetch data from each sheet
-    for sheet_name, sheet_config in config.get('sheets', {}).items():
-        print(f"\nFetching {sheet_name} sheet...")
-
-        gid = sheet_config.get('gid')
-        if not gid:
-            print(f"Warning: No GID for {sheet_name}, skipping...")
-            continue
-
-        # Fetch data
-        raw_data = fetch_google_sheets_csv(spreadsheet_id, gid)
-
-        if raw_data:
-            # Normalize the data
-            normalized = normalize_field_names(raw_data)
-
-            # Add source info
-            for record in normalized:
-                record['data_source'] = sheet_name
-
-            all_data.extend(normalized)
-            print(f"Processed {len(normalized)} records from {sheet_name}")
-
-    # Remove duplicates based on UID
     unique_data = {}
-    for record in all_data:
-        uid = record.get('uid')
-        if uid:
-            # Keep the first occurrence (or you could merge them)
-            if uid not in unique_data:
-                unique_data[uid] = record
-        else:
-            # Records without UID are kept as-is
-            import uuid
-            temp_uid = str(uuid.uuid4())
-            record['uid'] = temp_uid
-            unique_data[temp_uid] = record
+    identities = IdentityMap()
+
+    try:
+        # Fetch data from each sheet
+        for sheet_name, sheet_config in config.get('sheets', {}).items():
+            print(f"\nFetching {sheet_name} sheet...")
+
+            gid = sheet_config.get('gid')
+            if not gid:
+                print(f"Warning: No GID for {sheet_name}, skipping...")
+                continue
+
+            # Normalize and de-duplicate each batch as it is downloaded
+            # (kept apart until the sheet is complete, so a failed download adds nothing)
+            print(f"Fetching from: {export_url(spreadsheet_id, gid)}")
+            sheet_data = {}
+            processed = 0
+            try:
+                for raw_batch in get_client().iter_records(spreadsheet_id, gid):
+                    normalized = normalize_field_names(raw_batch)
+
+                    # Add source info
+                    for record in normalized:
+                        record['data_source'] = sheet_name
+
+                    add_unique_records(sheet_data, normalized, identities, sheet_name, processed)
+                    processed += len(normalized)
+            except requests.RequestException as e:
+                print(f"Error fetching data: {e}")
+                if processed:
+                    print(f"Discarded {processed} partially fetched records from {sheet_name}")
+                continue
+
+            # Records already seen in an earlier sheet keep their first occurrence
+            for uid, record in sheet_data.items():
+                unique_data.setdefault(uid, record)
+
+            if processed:
+                print(f"Processed {processed} records from {sheet_name}")
+    finally:
+        identities.close()
 
     final_data = list(unique_data.values())
 
     print(f"\nTotal unique records: {len(final_data)}")
 
     # Save to files
-    save_to_json(final_data)
-    save_to_csv(final_data)
+    cache_file, fieldnames = save_to_cache(final_data)
+    save_to_csv(cache_file, fieldnames)
 
     # Print summary
     if final_data:
@@ -14,6 +14,9 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 import pickle
 
+from sheets_client import get_client
+from transform_plan import TransformPlan, compile_plan
+
 class GoogleSheetsSync:
     """Google Sheets synchronization with smart caching and rate limiting"""
 
@@ -162,22 +165,9 @@ class GoogleSheetsSync:
         spreadsheet_id = self.config['spreadsheet_id']
         gid = sheet_config.get('gid', '')
 
-        # Construct export URL
-        export_url = f"https://docs.google.com/spreadsheets/d/{spreadsheet_id}/export?format=csv"
-        if gid:
-            export_url += f"&gid={gid}"
-
         try:
-            # Make request
-            response = requests.get(export_url, timeout=30)
-            response.raise_for_status()
-
-            # Parse CSV
-            import io
-            csv_data = io.StringIO(response.text)
-            df = pd.read_csv(csv_data)
-
-            return df
+            # Stream the export straight into the CSV parser (pooled, retried connection)
+            return get_client().fetch_dataframe(spreadsheet_id, gid)
 
         except requests.exceptions.RequestException as e:
             print(f"❌ Failed to fetch sheet: {e}")
@@ -285,19 +275,9 @@ class DataProcessor:
         return df
 
     def apply_field_mapping(self, df):
-        """Apply field name and value mapping"""
-        # Rename columns
-        korean_to_english = self.field_mapping.get('korean_to_english', {})
-        df.rename(columns=korean_to_english, inplace=True)
-
-        # Apply value mappings
-        value_mapping = self.field_mapping.get('value_mapping', {})
-
-        for field, mappings in value_mapping.items():
-            if field in df.columns:
-                df[field] = df[field].map(mappings).fillna(df[field])
-
-        return df
+        """Apply field name and value mapping (plan compiled for the header row)"""
+        plan = TransformPlan(compile_plan(list(df.columns), self.field_mapping))
+        return plan.apply(df)
 
     def normalize_data(self, df):
         """Normalize data formats"""
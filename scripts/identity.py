@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Identity Module
+Stable, content-derived UIDs for sheet rows that have no UID of their own
+"""
+
+import os
+import re
+import hashlib
+import sqlite3
+from datetime import datetime
+
+IDENTITY_FILE = '../cache/identity_map.db'
+
+UID_PREFIX = 'row_'
+# Hex digits of the hash used in a UID; extended only if two different rows collide
+UID_HASH_LENGTH = 16
+
+
+def normalize_name(name):
+    """Lower-case name with whitespace collapsed"""
+    return re.sub(r'\s+', ' ', str(name or '')).strip().lower()
+
+
+def normalize_phone(phone):
+    """Digits of a phone number"""
+    return ''.join(filter(str.isdigit, str(phone or '')))
+
+
+def normalize_email(email):
+    """Lower-case e-mail address"""
+    return str(email or '').strip().lower()
+
+
+def identity_fields(record):
+    """(name, phone, email) of a record in normalized form"""
+    return (
+        normalize_name(record.get('name')),
+        normalize_phone(record.get('phone')),
+        normalize_email(record.get('email'))
+    )
+
+
+def identity_key(fields):
+    """Text the UID is derived from, or None if the row has no identifying fields"""
+    name, phone, email = fields
+    if not (name or phone or email):
+        return None
+    return '\x1f'.join(fields)
+
+
+class IdentityMap:
+    """
+    Persisted identity map (UID -> identifying fields and sheet position)
+
+    Rows are matched in this order:
+    1. same name + phone + email as a row seen before (any earlier version) -> its UID
+    2. same sheet row with its phone or e-mail unchanged -> its UID
+       (the row was edited, so it keeps its identity; a name alone is not enough)
+    3. otherwise a new UID derived from the identifying fields
+
+    A UID is given to at most one row per run (one IdentityMap instance). Exact
+    duplicate rows are told apart by their occurrence number, so each keeps its
+    own stable UID instead of being merged.
+    """
+
+    def __init__(self, path=IDENTITY_FILE):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS identities (
+                uid TEXT PRIMARY KEY,
+                identity_key TEXT NOT NULL,
+                name TEXT,
+                phone TEXT,
+                email TEXT,
+                source TEXT,
+                row_number INTEGER,
+                updated_at TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_identities_key ON identities(identity_key);
+            CREATE INDEX IF NOT EXISTS idx_identities_row ON identities(source, row_number);
+            CREATE TABLE IF NOT EXISTS identity_keys (
+                identity_key TEXT PRIMARY KEY,
+                uid TEXT NOT NULL,
+                first_seen TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_identity_keys_uid ON identity_keys(uid);
+            INSERT OR IGNORE INTO identity_keys (identity_key, uid, first_seen)
+                SELECT identity_key, uid, updated_at FROM identities;
+        """)
+        # UIDs handed out and identity keys seen during this run
+        self._assigned = set()
+        self._occurrences = {}
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _uid_taken(self, uid, key):
+        """True if uid was already given out in this run or belongs to other identity keys"""
+        if uid in self._assigned:
+            return True
+        keys = [row[0] for row in self.conn.execute(
+            'SELECT identity_key FROM identity_keys WHERE uid = ?', (uid,))]
+        return bool(keys) and key not in keys
+
+    def _derive_uid(self, key):
+        """Hash-based UID; the hash is lengthened until it does not belong to another row"""
+        digest = hashlib.sha256(key.encode('utf-8')).hexdigest()
+        length = UID_HASH_LENGTH
+        while True:
+            uid = UID_PREFIX + digest[:length]
+            if not self._uid_taken(uid, key) or length >= len(digest):
+                return uid
+            length += 4
+
+    def _save(self, uid, key, fields, source, row_number):
+        """Record the row's current fields and position; earlier identity keys stay mapped to the UID"""
+        now = datetime.now().isoformat()
+        self.conn.execute(
+            'INSERT OR IGNORE INTO identity_keys (identity_key, uid, first_seen) VALUES (?, ?, ?)',
+            (key, uid, now)
+        )
+        self.conn.execute("""
+            INSERT OR REPLACE INTO identities
+                (uid, identity_key, name, phone, email, source, row_number, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, (uid, key, *fields, source, row_number, now))
+        self._assigned.add(uid)
+        return uid
+
+    def assign(self, record, source=None, row_number=None):
+        """
+        Stable UID for a record, or None if it has no name, phone or e-mail
+        source / row_number (sheet name and data row) let edited rows keep their UID
+        """
+        fields = identity_fields(record)
+        key = identity_key(fields)
+        if key is None:
+            return None
+
+        # The 2nd, 3rd, ... identical row of a run gets its own key
+        occurrence = self._occurrences.get(key, 0) + 1
+        self._occurrences[key] = occurrence
+        if occurrence > 1:
+            key = f"{key}\x1f#{occurrence}"
+
+        row = self.conn.execute(
+            'SELECT uid FROM identity_keys WHERE identity_key = ?', (key,)
+        ).fetchone()
+        if row is not None and row[0] not in self._assigned:
+            return self._save(row[0], key, fields, source, row_number)
+
+        if source is not None and row_number is not None:
+            row = self.conn.execute("""
+                SELECT uid, phone, email FROM identities
+                WHERE source = ? AND row_number = ?
+                ORDER BY updated_at DESC LIMIT 1
+            """, (source, row_number)).fetchone()
+            if (row is not None and row[0] not in self._assigned
+                    and any(old and old == new for old, new in zip(row[1:], fields[1:]))):
+                return self._save(row[0], key, fields, source, row_number)
+
+        return self._save(self._derive_uid(key), key, fields, source, row_number)
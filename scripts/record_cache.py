@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Record Cache Module
+Streams records to newline-delimited JSON (optionally gzip/zstd compressed) and reads them back lazily
+"""
+
+import io
+import csv
+import gzip
+import json
+from datetime import datetime
+from pathlib import Path
+
+# File suffix per compression method
+COMPRESSION_SUFFIXES = {
+    'none': '',
+    'gzip': '.gz',
+    'zstd': '.zst'
+}
+
+
+def cache_path(base, compression='none'):
+    """NDJSON cache path for a base name (e.g. cache/sheets_data -> cache/sheets_data.ndjson.gz)"""
+    if compression not in COMPRESSION_SUFFIXES:
+        raise ValueError(f"Unknown compression: {compression}")
+    return Path(f"{base}.ndjson{COMPRESSION_SUFFIXES[compression]}")
+
+
+def meta_path(path):
+    """Sidecar metadata file of a cache (record count, fields, timestamp)"""
+    path = Path(path)
+    return path.with_name(path.name.split('.ndjson')[0] + '.meta.json')
+
+
+def open_text(path, mode):
+    """Open a cache file as text, choosing the compression from its suffix"""
+    path = Path(path)
+    if path.suffix == '.gz':
+        return gzip.open(path, mode + 't', encoding='utf-8', newline='')
+    if path.suffix == '.zst':
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError("zstd compression requires the 'zstandard' package (pip install zstandard)")
+        if mode == 'w':
+            stream = zstandard.ZstdCompressor().stream_writer(open(path, 'wb'), closefd=True)
+        else:
+            stream = zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+        return io.TextIOWrapper(stream, encoding='utf-8', newline='')
+    return open(path, mode, encoding='utf-8', newline='')
+
+
+class RecordCacheWriter:
+    """
+    Write records one at a time as NDJSON
+    Field names are collected while writing (first-seen order), so a CSV header
+    is known as soon as the last record has been written
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.fieldnames = []
+        self._seen = set()
+        self.count = 0
+        self._file = open_text(self.path, 'w')
+
+    def write(self, record):
+        for key in record:
+            if key not in self._seen:
+                self._seen.add(key)
+                self.fieldnames.append(key)
+        self._file.write(json.dumps(record, ensure_ascii=False, default=str))
+        self._file.write('\n')
+        self.count += 1
+
+    def write_all(self, records):
+        for record in records:
+            self.write(record)
+
+    def close(self):
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        with open(meta_path(self.path), 'w', encoding='utf-8') as f:
+            json.dump({
+                'timestamp': datetime.now().isoformat(),
+                'record_count': self.count,
+                'fields': self.fieldnames
+            }, f, ensure_ascii=False, indent=2)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def iter_records(path):
+    """Yield cached records one at a time"""
+    with open_text(path, 'r') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def read_meta(path):
+    """Metadata written alongside a cache, or None"""
+    meta_file = meta_path(path)
+    if not meta_file.exists():
+        return None
+    with open(meta_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def write_csv(cache_file, csv_file, fieldnames=None):
+    """Stream a cache into a CSV file (header from the cache metadata unless given)"""
+    if fieldnames is None:
+        fieldnames = read_meta(cache_file)['fields']
+    with open(csv_file, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(iter_records(cache_file))
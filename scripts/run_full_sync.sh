@@ -46,7 +46,7 @@ main() {
 
     cd "$SCRIPT_DIR"
 
-    if python3 google_sheets_sync.py --force 2>&1 | tee -a "$LOG_FILE"; then
+    if python3 ../pipeline_worker.py run google_sheets_sync.py --force 2>&1 | tee -a "$LOG_FILE"; then
         print_color "$GREEN" "✅ Google Sheets sync successful"
     else
         print_color "$RED" "❌ Google Sheets sync failed"
@@ -83,7 +83,7 @@ main() {
         fi
     fi
 
-    if python3 airtable_sync.py 2>&1 | tee -a "$LOG_FILE"; then
+    if python3 ../pipeline_worker.py run airtable_sync.py 2>&1 | tee -a "$LOG_FILE"; then
         print_color "$GREEN" "✅ Airtable sync successful"
     else
         print_color "$RED" "❌ Airtable sync failed"
@@ -101,15 +101,9 @@ main() {
     fi
 
     # Get Airtable sync log
-    AIRTABLE_LOG="$SCRIPT_DIR/../logs/airtable_sync.json"
+    AIRTABLE_LOG="$SCRIPT_DIR/../logs/airtable_sync_ledger.jsonl"
     if [ -f "$AIRTABLE_LOG" ]; then
-        LAST_ENTRY=$(python3 -c "
-import json
-log = json.load(open('$AIRTABLE_LOG'))
-if log['sync_history']:
-    last = log['sync_history'][-1]
-    print(f\"Records created: {last['records_created']}, updated: {last['records_updated']}\")
-")
+        LAST_ENTRY=$(cd "$SCRIPT_DIR" && python3 sync_ledger.py --ledger "$AIRTABLE_LOG" --last)
         print_color "$GREEN" "$LAST_ENTRY"
     fi
 
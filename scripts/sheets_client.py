@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Google Sheets Client Module
+Shared CSV export client: pooled keep-alive connections, gzip, retries and streaming parsing
+"""
+
+import io
+import csv
+from contextlib import contextmanager
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+EXPORT_URL = 'https://docs.google.com/spreadsheets/d/{spreadsheet_id}/export?format=csv'
+
+# Shared request policy for every Sheets caller
+TIMEOUT = 30
+RETRIES = 3
+RETRY_BACKOFF = 1.0
+RETRY_STATUS = (429, 500, 502, 503, 504)
+POOL_SIZE = 10
+
+# Rows per batch when a sheet is consumed incrementally
+BATCH_SIZE = 1000
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
+    'Accept': 'text/csv,application/csv,text/plain',
+    'Accept-Language': 'ko-KR,ko;q=0.9,en;q=0.8',
+    'Accept-Encoding': 'gzip, deflate',
+    'Connection': 'keep-alive'
+}
+
+
+class ResponseStream(io.RawIOBase):
+    """
+    Binary file object over a streamed response body
+    Reads go through response.iter_content, which decompresses the body and turns
+    mid-stream urllib3 errors (dropped connection, read timeout) into
+    requests.RequestException subclasses, unlike reading response.raw directly
+    """
+
+    def __init__(self, response, chunk_size=64 * 1024):
+        self._chunks = response.iter_content(chunk_size)
+        self._buffer = b''
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if not self._buffer:
+            self._buffer = next(self._chunks, b'')
+        size = min(len(buffer), len(self._buffer))
+        buffer[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+
+def pooled_adapter(retries=RETRIES):
+    """Keep-alive connection pool with the shared retry policy"""
+    retry = Retry(total=retries, backoff_factor=RETRY_BACKOFF,
+                  status_forcelist=RETRY_STATUS, allowed_methods=['GET'],
+                  raise_on_status=False)
+    return HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=retry)
+
+
+def export_url(spreadsheet_id, gid=None):
+    """CSV export URL of a spreadsheet (first sheet if no gid)"""
+    url = EXPORT_URL.format(spreadsheet_id=spreadsheet_id)
+    if gid:
+        url += f"&gid={gid}"
+    return url
+
+
+class SheetsClient:
+    """CSV export client shared by the Google Sheets fetch scripts"""
+
+    def __init__(self, timeout=TIMEOUT, retries=RETRIES, session=None):
+        """
+        session: existing session to send exports through (e.g. the authorized
+        session from google_session); by default a new pooled session is created
+        """
+        self.timeout = timeout
+        self._owns_session = session is None
+        if session is None:
+            session = requests.Session()
+            session.mount('https://', pooled_adapter(retries))
+        self.session = session
+
+    def close(self):
+        if self._owns_session:
+            self.session.close()
+
+    @contextmanager
+    def open_csv(self, spreadsheet_id, gid=None):
+        """
+        Open a sheet's CSV export as a text stream
+        The body is gunzipped and decoded while it is read, so the whole response
+        is never held in memory. Raises requests.RequestException on failure,
+        including failures while the body is being read.
+        """
+        response = self.session.get(export_url(spreadsheet_id, gid), headers=HEADERS,
+                                    stream=True, timeout=self.timeout)
+        try:
+            response.raise_for_status()
+            yield io.TextIOWrapper(io.BufferedReader(ResponseStream(response)),
+                                   encoding='utf-8-sig', newline='')
+        finally:
+            response.close()
+
+    def iter_records(self, spreadsheet_id, gid=None, batch_size=BATCH_SIZE):
+        """
+        Yield sheet rows in lists of up to batch_size dictionaries as they are downloaded
+        Only one batch is held at a time, so callers that process each batch and drop it
+        keep memory bounded by the batch size rather than the sheet size.
+        A RequestException can be raised after some batches were yielded; callers
+        should then discard what they received for this sheet
+        """
+        with self.open_csv(spreadsheet_id, gid) as stream:
+            batch = []
+            for row in csv.DictReader(stream):
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+
+    def fetch_records(self, spreadsheet_id, gid=None):
+        """Sheet rows as a list of dictionaries (header row as keys)"""
+        records = []
+        for batch in self.iter_records(spreadsheet_id, gid):
+            records.extend(batch)
+        return records
+
+    def fetch_dataframe(self, spreadsheet_id, gid=None):
+        """Sheet as a DataFrame"""
+        with self.open_csv(spreadsheet_id, gid) as stream:
+            return pd.read_csv(stream)
+
+
+# Per-process client, so every fetch reuses the same connections
+_client = None
+
+
+def get_client():
+    """Return the shared SheetsClient"""
+    global _client
+    if _client is None:
+        _client = SheetsClient()
+    return _client
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Sync Journal Module
+Durable record of every Airtable write batch so an interrupted sync can resume
+"""
+
+import os
+import json
+import hashlib
+import sqlite3
+from datetime import datetime
+
+JOURNAL_FILE = '../cache/airtable_sync_journal.db'
+
+# Batch states
+PENDING = 'pending'
+ACKED = 'acked'
+FAILED = 'failed'
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """SHA-1 of a file's contents (identifies the input of a sync job)"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def batch_hash(operation, batch):
+    """
+    Stable identity of a write batch
+    sync_date changes on every run, so it is left out; everything else that is sent
+    (record id, fields) is part of the hash
+    """
+    records = []
+    for record in batch:
+        fields = {k: v for k, v in record.get('fields', {}).items() if k != 'sync_date'}
+        records.append({'id': record.get('id'), 'fields': fields})
+    text = json.dumps([operation, records], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+class SyncJournal:
+    """
+    SQLite journal of sync jobs and their batches
+
+    A job is one sync of one input file into one table. Each batch is written as
+    pending before it is sent and acked once Airtable accepts it, so re-running the
+    same job skips batches that already went through. Batches that still fail after
+    all retries stay in the failed state (dead-letter queue) until retried.
+    """
+
+    def __init__(self, path=JOURNAL_FILE):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                description TEXT,
+                status TEXT NOT NULL,
+                started_at TEXT,
+                finished_at TEXT
+            );
+            CREATE TABLE IF NOT EXISTS batches (
+                job_id TEXT NOT NULL,
+                batch_hash TEXT NOT NULL,
+                operation TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                payload TEXT NOT NULL,
+                state TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                created INTEGER NOT NULL DEFAULT 0,
+                updated INTEGER NOT NULL DEFAULT 0,
+                updated_at TEXT,
+                PRIMARY KEY (job_id, batch_hash)
+            );
+            CREATE INDEX IF NOT EXISTS idx_batches_state ON batches(state);
+        """)
+        self.job_id = None
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    # ------------------------------------------------------------------
+    # Jobs
+    # ------------------------------------------------------------------
+    def begin(self, job_id, description=''):
+        """
+        Start or resume a job
+        A job that finished cleanly starts over; an interrupted or failed one resumes.
+        Returns the number of batches already acknowledged.
+        """
+        row = self.conn.execute('SELECT status FROM jobs WHERE job_id = ?', (job_id,)).fetchone()
+        now = datetime.now().isoformat()
+        if row is None or row[0] == 'completed':
+            self.conn.execute('DELETE FROM batches WHERE job_id = ?', (job_id,))
+            self.conn.execute("""
+                INSERT OR REPLACE INTO jobs (job_id, description, status, started_at, finished_at)
+                VALUES (?, ?, 'running', ?, NULL)
+            """, (job_id, description, now))
+        else:
+            self.conn.execute(
+                "UPDATE jobs SET status = 'running', finished_at = NULL WHERE job_id = ?", (job_id,)
+            )
+        self.conn.commit()
+        self.job_id = job_id
+        return self.conn.execute(
+            'SELECT COUNT(*) FROM batches WHERE job_id = ? AND state = ?', (job_id, ACKED)
+        ).fetchone()[0]
+
+    def finish(self, job_id=None):
+        """Close a job (default: the current one); it stays resumable while it has failed batches"""
+        job_id = job_id or self.job_id
+        failed = self.conn.execute(
+            'SELECT COUNT(*) FROM batches WHERE job_id = ? AND state != ?', (job_id, ACKED)
+        ).fetchone()[0]
+        status = 'failed' if failed else 'completed'
+        self.conn.execute(
+            'UPDATE jobs SET status = ?, finished_at = ? WHERE job_id = ?',
+            (status, datetime.now().isoformat(), job_id)
+        )
+        self.conn.commit()
+        return status
+
+    # ------------------------------------------------------------------
+    # Batches
+    # ------------------------------------------------------------------
+    def state(self, digest):
+        """State of a batch in the current job, or None if it was never sent"""
+        row = self.conn.execute(
+            'SELECT state FROM batches WHERE job_id = ? AND batch_hash = ?', (self.job_id, digest)
+        ).fetchone()
+        return row[0] if row else None
+
+    def acked(self, digest):
+        """Result (created, updated) of an acknowledged batch, or None"""
+        row = self.conn.execute(
+            'SELECT created, updated FROM batches WHERE job_id = ? AND batch_hash = ? AND state = ?',
+            (self.job_id, digest, ACKED)
+        ).fetchone()
+        return tuple(row) if row else None
+
+    def mark_pending(self, digest, operation, seq, payload):
+        """Record a batch before it is sent"""
+        self.conn.execute("""
+            INSERT INTO batches (job_id, batch_hash, operation, seq, payload, state, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(job_id, batch_hash) DO UPDATE SET state = excluded.state,
+                updated_at = excluded.updated_at
+        """, (self.job_id, digest, operation, seq,
+              json.dumps(payload, ensure_ascii=False, default=str), PENDING,
+              datetime.now().isoformat()))
+        self.conn.commit()
+
+    def ack(self, digest, attempts, created=0, updated=0, job_id=None):
+        """Mark a batch as accepted by Airtable"""
+        self.conn.execute("""
+            UPDATE batches SET state = ?, attempts = ?, created = ?, updated = ?,
+                last_error = NULL, updated_at = ?
+            WHERE job_id = ? AND batch_hash = ?
+        """, (ACKED, attempts, created, updated, datetime.now().isoformat(),
+              job_id or self.job_id, digest))
+        self.conn.commit()
+
+    def fail(self, digest, attempts, error, job_id=None):
+        """Move a batch to the dead-letter queue after its last retry"""
+        self.conn.execute("""
+            UPDATE batches SET state = ?, attempts = ?, last_error = ?, updated_at = ?
+            WHERE job_id = ? AND batch_hash = ?
+        """, (FAILED, attempts, str(error), datetime.now().isoformat(),
+              job_id or self.job_id, digest))
+        self.conn.commit()
+
+    def dead_letters(self):
+        """Failed batches of all jobs: [(job_id, batch_hash, operation, payload, attempts, last_error)]"""
+        return [
+            (job_id, digest, operation, json.loads(payload), attempts, last_error)
+            for job_id, digest, operation, payload, attempts, last_error in self.conn.execute("""
+                SELECT job_id, batch_hash, operation, payload, attempts, last_error
+                FROM batches WHERE state = ? ORDER BY job_id, seq
+            """, (FAILED,))
+        ]
+
+    def summary(self):
+        """Batch counts per job and state"""
+        return self.conn.execute("""
+            SELECT j.job_id, j.description, j.status, b.state, COUNT(b.batch_hash)
+            FROM jobs j LEFT JOIN batches b ON b.job_id = j.job_id
+            GROUP BY j.job_id, b.state ORDER BY j.started_at
+        """).fetchall()
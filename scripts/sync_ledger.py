@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Sync Ledger Module
+Append-only JSONL log of Airtable sync runs and per-batch timings, with a report command
+"""
+
+import os
+import json
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import numpy as np
+
+LEDGER_FILE = '../logs/airtable_sync_ledger.jsonl'
+
+
+class SyncLedger:
+    """
+    Append-only sync ledger
+    Every line is one JSON event: {"type": "batch", ...} for each write batch and
+    {"type": "run", ...} once per sync. Lines are only ever appended, so a sync
+    never rewrites earlier history and a crash loses at most the line being written.
+    """
+
+    def __init__(self, path=LEDGER_FILE, run_id=None):
+        self.path = path
+        self.run_id = run_id or datetime.now().strftime('%Y%m%dT%H%M%S%f')
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def append(self, event):
+        """Append one event line"""
+        event = {"timestamp": datetime.now().isoformat(), "run_id": self.run_id, **event}
+        line = json.dumps(event, ensure_ascii=False, default=str) + '\n'
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line)
+
+    def batch(self, operation, records, size_bytes, latency, attempts, status, error=None):
+        """Record one write batch (latency in seconds, including retries)"""
+        self.append({
+            "type": "batch",
+            "operation": operation,
+            "records": records,
+            "bytes": size_bytes,
+            "latency_ms": round(latency * 1000, 1),
+            "attempts": attempts,
+            "status": status,
+            "error": str(error) if error else None
+        })
+
+    def run(self, **summary):
+        """Record the summary of a whole sync"""
+        self.append({"type": "run", **summary})
+
+
+def read_events(path=LEDGER_FILE, since=None):
+    """Read ledger events (optionally only those at or after `since`), skipping damaged lines"""
+    events = []
+    if not os.path.exists(path):
+        return events
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                event = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if since and event.get('timestamp', '') < since.isoformat():
+                continue
+            events.append(event)
+    return events
+
+
+def last_run(path=LEDGER_FILE):
+    """Most recent run summary, or None"""
+    runs = [event for event in read_events(path) if event.get('type') == 'run']
+    return runs[-1] if runs else None
+
+
+def batch_report(events, period='day'):
+    """
+    Batch statistics grouped by period ('day' or 'hour')
+    Returns [{period, batches, records, p50_ms, p95_ms, records_per_s, error_rate, retries}]
+    """
+    width = 13 if period == 'hour' else 10
+    groups = defaultdict(list)
+    for event in events:
+        if event.get('type') == 'batch':
+            groups[event['timestamp'][:width]].append(event)
+
+    rows = []
+    for key in sorted(groups):
+        batches = groups[key]
+        latencies = np.array([b['latency_ms'] for b in batches], dtype=np.float64)
+        sent = sum(b['records'] for b in batches if b['status'] == 'ok')
+        failed = sum(1 for b in batches if b['status'] != 'ok')
+        total_seconds = latencies.sum() / 1000
+        rows.append({
+            "period": key,
+            "batches": len(batches),
+            "records": sent,
+            "p50_ms": float(np.percentile(latencies, 50)),
+            "p95_ms": float(np.percentile(latencies, 95)),
+            "records_per_s": sent / total_seconds if total_seconds else 0.0,
+            "error_rate": failed / len(batches),
+            "retries": sum(b['attempts'] - 1 for b in batches)
+        })
+    return rows
+
+
+def main():
+    """Print the sync ledger report"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Airtable Sync Ledger Report')
+    parser.add_argument('--ledger', default=LEDGER_FILE, help='Ledger file path')
+    parser.add_argument('--days', type=int, default=7, help='Only include the last N days')
+    parser.add_argument('--by', choices=['day', 'hour'], default='day', help='Grouping period')
+    parser.add_argument('--last', action='store_true', help='Show only the most recent run summary')
+    args = parser.parse_args()
+
+    if args.last:
+        run = last_run(args.ledger)
+        if run:
+            print(f"Records created: {run['records_created']}, updated: {run['records_updated']}")
+        return
+
+    events = read_events(args.ledger, since=datetime.now() - timedelta(days=args.days))
+    rows = batch_report(events, args.by)
+    if not rows:
+        print(f"📭 No batches recorded in {args.ledger} for the last {args.days} day(s)")
+        return
+
+    print(f"\n📈 Airtable sync batches (last {args.days} day(s), by {args.by})")
+    print(f"{'period':<14}{'batches':>8}{'records':>9}{'p50 ms':>9}{'p95 ms':>9}"
+          f"{'rec/s':>8}{'errors':>8}{'retries':>8}")
+    for row in rows:
+        print(f"{row['period']:<14}{row['batches']:>8}{row['records']:>9}"
+              f"{row['p50_ms']:>9.0f}{row['p95_ms']:>9.0f}{row['records_per_s']:>8.1f}"
+              f"{row['error_rate']:>8.1%}{row['retries']:>8}")
+
+    runs = [event for event in events if event.get('type') == 'run']
+    print(f"\n🔁 {len(runs)} sync run(s); "
+          f"{sum(r['records_created'] for r in runs)} created, "
+          f"{sum(r['records_updated'] for r in runs)} updated")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,8 @@
 
 SCRIPT_DIR="$( cd "$( dirname "${BASH_SOURCE[0]}" )" && pwd )"
 PYTHON_SCRIPT="$SCRIPT_DIR/google_sheets_sync.py"
+# 상주 워커가 실행 중이면 워커에서, 아니면 직접 실행 (python3 pipeline_worker.py serve)
+WORKER="$SCRIPT_DIR/../pipeline_worker.py"
 LOG_DIR="$SCRIPT_DIR/../logs"
 LOG_FILE="$LOG_DIR/sync_$(date +%Y%m%d).log"
 
@@ -20,7 +22,7 @@ log_message() {
 # Function to run sync
 run_sync() {
     log_message "Starting manual sync..."
-    python3 "$PYTHON_SCRIPT" --force 2>&1 | tee -a "$LOG_FILE"
+    python3 "$WORKER" run "$PYTHON_SCRIPT" --force 2>&1 | tee -a "$LOG_FILE"
     log_message "Manual sync completed"
 }
 
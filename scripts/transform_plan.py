@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Transform Plan Module
+Compiles field_mapping.json against a sheet's header row into a plan that
+renames, drops, value-maps and normalizes a DataFrame in one pass
+"""
+
+
+def compile_plan(columns, mapping, value_fields=None, normalizers=None, drop=()):
+    """
+    Resolve a mapping against the given columns
+    mapping: field_mapping.json contents (korean_to_english, value_mapping)
+    value_fields: fields whose value_mapping is applied (None = all)
+    normalizers: {field: normalizer name} applied after renaming
+    drop: columns removed after renaming
+    """
+    korean_to_english = mapping.get('korean_to_english', {})
+    value_mapping = mapping.get('value_mapping', {})
+
+    rename = {col: korean_to_english[col] for col in columns if col in korean_to_english}
+    renamed = [rename.get(col, col) for col in columns]
+    present = set(renamed) - set(drop)
+
+    return {
+        'rename': rename,
+        'drop': [col for col in drop if col in renamed],
+        'value_maps': {field: values for field, values in value_mapping.items()
+                       if field in present and (value_fields is None or field in value_fields)},
+        'normalizers': {field: name for field, name in (normalizers or {}).items() if field in present}
+    }
+
+
+class TransformPlan:
+    """Precompiled column renames, drops, value maps and normalizers for one header layout"""
+
+    def __init__(self, plan):
+        self.rename = plan['rename']
+        self.drop = plan['drop']
+        self.value_maps = plan['value_maps']
+        self.normalizers = plan['normalizers']
+
+    def apply(self, df, normalizer_funcs=None):
+        """
+        Apply the plan to a DataFrame
+        normalizer_funcs: {normalizer name: function(Series) -> Series}
+        """
+        df = df.rename(columns=self.rename)
+        if self.drop:
+            df = df.drop(columns=self.drop)
+
+        for field, values in self.value_maps.items():
+            df[field] = df[field].map(values).fillna(df[field])
+
+        for field, name in self.normalizers.items():
+            df[field] = normalizer_funcs[name](df[field])
+
+        return df
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+문자열 유사도 계산 (매칭 스크립트별로 backend 선택)
+
+- sequence: SequenceMatcher(None, a, b).ratio() + 상한값 가지치기 (기본값, 기존 점수와 동일)
+    · 길이 상한 (real_quick_ratio와 동일): 2 * min(len) / (len_a + len_b)
+    · 문자 빈도 상한 (quick_ratio와 동일): 2 * 공통 문자 수 / (len_a + len_b)
+    · 두 상한 중 하나라도 cutoff 미만이면 ratio()를 계산하지 않고 0.0 반환
+- levenshtein: 1 - 편집거리 / max(len) - Myers 비트 병렬 알고리즘
+    · 질의 하나를 후보 배열 전체와 NumPy uint64 비트 벡터로 한 번에 계산 (질의 64자 이하)
+- jaro_winkler: Jaro-Winkler 유사도 (짧은 이름/이메일의 앞부분 일치에 가중치)
+
+매칭 스크립트별 backend는 matching_config.json에서 지정합니다 (없으면 sequence).
+backend마다 점수 분포가 다르므로 sequence 외 backend를 쓸 때는 기준값을 함께 검토해야 합니다.
+"""
+
+import json
+import os
+from collections import Counter
+from difflib import SequenceMatcher
+from functools import lru_cache
+
+import numpy as np
+
+# 매칭 스크립트별 backend 설정 파일 (METRIX_MATCHING_CONFIG 로 경로 변경 가능)
+DEFAULT_MATCHING_CONFIG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'matching_config.json')
+
+DEFAULT_BACKEND = 'sequence'
+
+# Myers 비트 병렬 계산에 사용하는 비트 벡터 길이
+WORD_BITS = 64
+
+
+# ----------------------------------------------------------------------
+# sequence (SequenceMatcher 호환)
+# ----------------------------------------------------------------------
+@lru_cache(maxsize=65536)
+def _char_counts(text):
+    """문자 빈도 (같은 질의 문자열이 여러 후보와 비교되므로 캐시)"""
+    return Counter(text)
+
+
+def _common_chars(a, b):
+    """두 문자열의 공통 문자 수 (순서 무관, quick_ratio의 matches와 동일)"""
+    counts_a = _char_counts(a)
+    counts_b = _char_counts(b)
+    if len(counts_a) > len(counts_b):
+        counts_a, counts_b = counts_b, counts_a
+    return sum(min(count, counts_b[char]) for char, count in counts_a.items() if char in counts_b)
+
+
+def ratio(a, b, cutoff=0.0):
+    """
+    SequenceMatcher(None, a, b).ratio()
+
+    cutoff: 이 값 미만이 확실한 쌍은 전체 계산 없이 0.0 반환
+            (cutoff 이상이 될 수 있는 쌍은 원래 ratio 값을 그대로 반환)
+    """
+    total = len(a) + len(b)
+    if not total:
+        return 1.0
+
+    if cutoff > 0:
+        # 1단계: 길이 상한
+        if 2.0 * min(len(a), len(b)) / total < cutoff:
+            return 0.0
+        # 2단계: 문자 빈도 상한
+        if 2.0 * _common_chars(a, b) / total < cutoff:
+            return 0.0
+
+    return SequenceMatcher(None, a, b).ratio()
+
+
+# ----------------------------------------------------------------------
+# levenshtein (Myers 비트 병렬)
+# ----------------------------------------------------------------------
+def _myers_distance(a, b):
+    """Myers 비트 병렬 편집거리 (Python 정수 비트 벡터, 길이 제한 없음)"""
+    if not a:
+        return len(b)
+    if not b:
+        return len(a)
+
+    m = len(a)
+    mask = (1 << m) - 1
+    last = 1 << (m - 1)
+
+    peq = {}
+    for i, char in enumerate(a):
+        peq[char] = peq.get(char, 0) | (1 << i)
+
+    pv = mask
+    mv = 0
+    score = m
+    for char in b:
+        eq = peq.get(char, 0)
+        xv = eq | mv
+        xh = ((((eq & pv) + pv) & mask) ^ pv) | eq
+        ph = mv | (~(xh | pv) & mask)
+        mh = pv & xh
+        if ph & last:
+            score += 1
+        elif mh & last:
+            score -= 1
+        ph = ((ph << 1) | 1) & mask
+        mh = (mh << 1) & mask
+        pv = mh | (~(xv | ph) & mask)
+        mv = ph & xv
+    return score
+
+
+def levenshtein_similarity(a, b, cutoff=0.0):
+    """1 - 편집거리 / max(len) (cutoff 미만이 확실하면 0.0)"""
+    longest = max(len(a), len(b))
+    if not longest:
+        return 1.0
+    # 길이 차이만큼은 반드시 편집이 필요
+    if cutoff > 0 and 1.0 - abs(len(a) - len(b)) / longest < cutoff:
+        return 0.0
+    return 1.0 - _myers_distance(a, b) / longest
+
+
+def _myers_distance_many(query, codes, lengths):
+    """
+    질의 하나와 후보 배열 전체의 편집거리를 uint64 비트 벡터로 동시에 계산
+
+    codes: (후보 수, 최대 길이) 문자 코드 배열 (빈 칸은 0)
+    lengths: 후보별 길이
+    """
+    m = len(query)
+    n_candidates, max_len = codes.shape
+    if not m:
+        return lengths.astype(np.int64)
+
+    mask = np.uint64((1 << m) - 1)
+    last = np.uint64(1 << (m - 1))
+    one = np.uint64(1)
+    zero = np.uint64(0)
+
+    # 질의 문자별 비트 마스크 (정렬된 문자 코드 → searchsorted로 조회)
+    peq = {}
+    for i, char in enumerate(query):
+        peq[ord(char)] = peq.get(ord(char), 0) | (1 << i)
+    query_chars = np.array(sorted(peq), dtype=codes.dtype)
+    query_masks = np.array([peq[c] for c in sorted(peq)], dtype=np.uint64)
+
+    pv = np.full(n_candidates, mask, dtype=np.uint64)
+    mv = np.zeros(n_candidates, dtype=np.uint64)
+    score = np.full(n_candidates, m, dtype=np.int64)
+
+    for j in range(max_len):
+        active = lengths > j
+        column = codes[:, j]
+        pos = np.minimum(np.searchsorted(query_chars, column), len(query_chars) - 1)
+        eq = np.where(query_chars[pos] == column, query_masks[pos], zero)
+
+        xv = eq | mv
+        xh = ((((eq & pv) + pv) & mask) ^ pv) | eq
+        ph = mv | (~(xh | pv) & mask)
+        mh = pv & xh
+        score += np.where(active & ((ph & last) != 0), 1, 0)
+        score -= np.where(active & ((ph & last) == 0) & ((mh & last) != 0), 1, 0)
+        ph = ((ph << one) | one) & mask
+        mh = (mh << one) & mask
+        new_pv = mh | (~(xv | ph) & mask)
+        new_mv = ph & xv
+
+        pv = np.where(active, new_pv, pv)
+        mv = np.where(active, new_mv, mv)
+
+    return score
+
+
+# ----------------------------------------------------------------------
+# jaro_winkler
+# ----------------------------------------------------------------------
+def jaro_winkler_similarity(a, b, cutoff=0.0, prefix_weight=0.1):
+    """Jaro-Winkler 유사도 (cutoff는 다른 backend와 같은 호출 형태를 위해 받음)"""
+    if a == b:
+        return 1.0
+    len_a, len_b = len(a), len(b)
+    if not len_a or not len_b:
+        return 0.0
+
+    window = max(max(len_a, len_b) // 2 - 1, 0)
+    matched_a = [False] * len_a
+    matched_b = [False] * len_b
+
+    matches = 0
+    for i, char in enumerate(a):
+        start = max(0, i - window)
+        end = min(i + window + 1, len_b)
+        for j in range(start, end):
+            if not matched_b[j] and b[j] == char:
+                matched_a[i] = matched_b[j] = True
+                matches += 1
+                break
+    if not matches:
+        return 0.0
+
+    # 순서가 다른 일치 문자 (transposition)
+    transpositions = 0
+    j = 0
+    for i in range(len_a):
+        if matched_a[i]:
+            while not matched_b[j]:
+                j += 1
+            if a[i] != b[j]:
+                transpositions += 1
+            j += 1
+
+    jaro = (matches / len_a + matches / len_b + (matches - transpositions / 2) / matches) / 3
+
+    prefix = 0
+    for char_a, char_b in zip(a[:4], b[:4]):
+        if char_a != char_b:
+            break
+        prefix += 1
+
+    return jaro + prefix * prefix_weight * (1 - jaro)
+
+
+# ----------------------------------------------------------------------
+# backend 선택
+# ----------------------------------------------------------------------
+BACKENDS = {
+    'sequence': ratio,
+    'levenshtein': levenshtein_similarity,
+    'jaro_winkler': jaro_winkler_similarity,
+}
+
+
+def upper_bound(backend, common, len_a, len_b):
+    """
+    공통 문자 수(순서 무관)만으로 계산한 backend별 유사도 상한 (NumPy 배열 연산 가능)
+    실제 유사도는 항상 이 값 이하이므로 상한이 기준값 미만인 후보는 계산하지 않아도 결과가 같음
+    - sequence: 2 * 공통 문자 수 / (len_a + len_b) (quick_ratio)
+    - levenshtein: 공통 문자 수 / max(len) (일치하지 않는 위치는 모두 편집이 필요)
+    - jaro_winkler: 일치 문자 수 ≤ 공통 문자 수로 Jaro 상한을 구하고 접두어 가중치 최대값(4 × 0.1) 적용
+    """
+    common = np.asarray(common, dtype=np.float64)
+    len_a = np.asarray(len_a, dtype=np.float64)
+    len_b = np.asarray(len_b, dtype=np.float64)
+    if backend == 'sequence':
+        return 2.0 * common / np.maximum(len_a + len_b, 1)
+    if backend == 'levenshtein':
+        return common / np.maximum(np.maximum(len_a, len_b), 1)
+    if backend == 'jaro_winkler':
+        jaro = (common / np.maximum(len_a, 1) + common / np.maximum(len_b, 1) + 1) / 3
+        return np.where(common > 0, 0.6 * np.minimum(jaro, 1.0) + 0.4, 0.0)
+    raise ValueError(f"알 수 없는 유사도 backend: {backend}")
+
+
+def matching_config_file():
+    """설정 파일 경로 (호출 시점의 METRIX_MATCHING_CONFIG 기준)"""
+    return os.getenv('METRIX_MATCHING_CONFIG', DEFAULT_MATCHING_CONFIG_FILE)
+
+
+@lru_cache(maxsize=4)
+def _read_matching_config(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_matching_config():
+    """matching_config.json 읽기 (없으면 빈 설정)"""
+    return _read_matching_config(matching_config_file())
+
+
+def backend_for(matcher):
+    """매칭 스크립트(matcher)에 설정된 backend 이름"""
+    config = load_matching_config()
+    backend = config.get('matchers', {}).get(matcher, config.get('default_backend', DEFAULT_BACKEND))
+    if backend not in BACKENDS:
+        raise ValueError(f"알 수 없는 유사도 backend: {backend} (matcher: {matcher})")
+    return backend
+
+
+def get_scorer(matcher):
+    """매칭 스크립트에 설정된 유사도 함수 scorer(a, b, cutoff=0.0) 반환"""
+    return BACKENDS[backend_for(matcher)]
+
+
+class CandidateArray:
+    """
+    질의 하나를 후보 전체와 한 번에 비교하기 위한 후보 목록
+
+    후보 문자열은 생성 시 한 번만 문자 코드 배열로 변환합니다.
+    빈 값(None/'')인 후보의 점수는 항상 0입니다.
+    """
+
+    def __init__(self, candidates, backend=DEFAULT_BACKEND):
+        if backend not in BACKENDS:
+            raise ValueError(f"알 수 없는 유사도 backend: {backend}")
+        self.backend = backend
+        self.candidates = [candidate if candidate else '' for candidate in candidates]
+        self.valid = np.array([bool(candidate) for candidate in self.candidates], dtype=bool)
+        self.lengths = np.array([len(candidate) for candidate in self.candidates], dtype=np.int64)
+
+        self.codes = None
+        if backend == 'levenshtein':
+            max_len = int(self.lengths.max()) if len(self.candidates) else 0
+            self.codes = np.zeros((len(self.candidates), max_len), dtype=np.int32)
+            for row, candidate in enumerate(self.candidates):
+                if candidate:
+                    self.codes[row, :len(candidate)] = [ord(char) for char in candidate]
+
+    def __len__(self):
+        return len(self.candidates)
+
+    def scores(self, query, cutoff=0.0, positions=None):
+        """
+        질의와 후보들의 유사도 배열 (float64)
+        positions: 계산할 후보 위치 목록 (기본: 전체 후보, 이름 인덱스 조회 결과 등)
+        """
+        if positions is None:
+            positions = np.arange(len(self.candidates))
+        else:
+            positions = np.asarray(positions, dtype=np.int64)
+
+        if not query or not len(positions):
+            return np.zeros(len(positions), dtype=np.float64)
+
+        lengths = self.lengths[positions]
+        if self.backend == 'levenshtein' and len(query) <= WORD_BITS:
+            distances = _myers_distance_many(query, self.codes[positions], lengths)
+            longest = np.maximum(lengths, len(query))
+            result = 1.0 - distances / longest
+        else:
+            scorer = BACKENDS[self.backend]
+            result = np.fromiter(
+                (scorer(query, self.candidates[pos], cutoff) if self.candidates[pos] else 0.0
+                 for pos in positions),
+                dtype=np.float64,
+                count=len(positions)
+            )
+
+        return np.where(self.valid[positions], result, 0.0)
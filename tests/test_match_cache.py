@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+import random
+
+from match_cache import cached_match
+from similarity import ratio
+
+SYLLABLES = '김이박정은지하서연민수'
+
+
+def find_best(query, candidates, positions):
+    """update_participation과 같은 규칙 (완전 일치 1.0, 부분 일치 0.9, 같은 점수면 앞 위치 우선)"""
+    if positions is None:
+        positions = range(len(candidates))
+    best_pos, best_score = None, 0
+    for pos in positions:
+        key = candidates[pos]
+        if key == query:
+            score = 1.0
+        elif key in query or query in key:
+            score = 0.9
+        else:
+            score = ratio(query, key, cutoff=max(best_score, 0.8))
+        if score > best_score and score >= 0.8:
+            best_pos, best_score = pos, score
+    return best_pos, best_score
+
+
+def random_name(rng):
+    return ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+
+
+def test_cached_match_equals_full_recompute(tmp_path, monkeypatch):
+    monkeypatch.setenv('METRIX_MATCH_CACHE', '1')
+    monkeypatch.setenv('METRIX_MATCH_WORKERS', '1')
+    rng = random.Random(35)
+    path = str(tmp_path / 'match_cache.db')
+
+    candidates = [random_name(rng) for _ in range(300)]
+    queries = [random_name(rng) for _ in range(200)]
+
+    for run in range(8):
+        if run:
+            # 새 이름, 이미 있는 이름의 다른 행, 행 삭제를 임의 위치에 반영
+            for _ in range(rng.randint(5, 30)):
+                action = rng.random()
+                if action < 0.4:
+                    candidates.insert(rng.randrange(len(candidates) + 1), rng.choice(candidates))
+                elif action < 0.7:
+                    candidates.insert(rng.randrange(len(candidates) + 1), random_name(rng))
+                else:
+                    del candidates[rng.randrange(len(candidates))]
+            queries[rng.randrange(len(queries))] = random_name(rng)
+
+        cached = cached_match('test', '1', find_best, queries, queries, candidates, candidates,
+                              path=path)
+        expected = [find_best(query, candidates, None) for query in queries]
+        assert cached == expected, run
+
+
+def test_known_key_inserted_before_cached_best(tmp_path, monkeypatch):
+    monkeypatch.setenv('METRIX_MATCH_CACHE', '1')
+    monkeypatch.setenv('METRIX_MATCH_WORKERS', '1')
+    path = str(tmp_path / 'match_cache.db')
+
+    candidates = ['박민수', '정은지하', '정은']
+    assert cached_match('test', '1', find_best, ['정은지'], ['정은지'], candidates, candidates,
+                        path=path) == [(1, 0.9)]
+
+    # 이미 있는 키(정은)의 행이 캐시된 최고 매칭(정은지하) 앞에 추가됨
+    candidates.insert(0, '정은')
+    assert cached_match('test', '1', find_best, ['정은지'], ['정은지'], candidates, candidates,
+                        path=path) == [(0, 0.9)]
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+import random
+
+import pytest
+
+from name_index import NameIndex
+from similarity import BACKENDS
+
+THRESHOLD = 0.8
+
+SYLLABLES = '김이박최정강조윤장임한오서신권황안송하은연민지수현서준우예나영호'
+
+
+def containment_score(scorer):
+    """update_participation.calculate_name_similarity와 같은 점수 규칙"""
+    def score(a, b, cutoff=0.0):
+        if a == b:
+            return 1.0
+        if a in b or b in a:
+            return 0.9
+        return scorer(a, b, cutoff)
+    return score
+
+
+def best_match(query, names, positions, score):
+    best_pos, best_score = None, 0
+    for pos in positions:
+        if not names[pos]:
+            continue
+        value = score(query, names[pos], cutoff=max(best_score, THRESHOLD))
+        if value > best_score and value >= THRESHOLD:
+            best_pos, best_score = pos, value
+    return best_pos, best_score
+
+
+def random_names(rng, count):
+    return [''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))) for _ in range(count)]
+
+
+@pytest.mark.parametrize('backend', sorted(BACKENDS))
+@pytest.mark.parametrize('containment', [False, True])
+def test_indexed_matches_equal_brute_force(backend, containment):
+    rng = random.Random(33)
+    names = random_names(rng, 3000) + ['', None]
+    queries = random_names(rng, 250) + [rng.choice(names[:3000]) + rng.choice(SYLLABLES) for _ in range(250)]
+    score = containment_score(BACKENDS[backend]) if containment else BACKENDS[backend]
+    index = NameIndex(names, backend)
+
+    for query in queries:
+        assert best_match(query, names, index.candidates(query, THRESHOLD), score) == \
+            best_match(query, names, range(len(names)), score), query
+
+
+def test_containment_hit_is_candidate():
+    names = ['박민수', '김하', '이서연']
+    index = NameIndex(names)
+    assert 1 in index.candidates('김하은연', THRESHOLD)
+    assert best_match('김하은연', names, index.candidates('김하은연', THRESHOLD),
+                      containment_score(BACKENDS['sequence'])) == (1, 0.9)
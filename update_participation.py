@@ -1,37 +1,102 @@
 #!/usr/bin/env python3
 import pandas as pd
 import numpy as np
-from difflib import SequenceMatcher
 import warnings
 warnings.filterwarnings('ignore')
 
-def normalize_name(name):
-    """이름 정규화 - 공백, 대소문자 통일"""
-    if pd.isna(name):
-        return None
-    return str(name).strip().lower().replace('  ', ' ')
+from match_cache import cached_match
+from name_index import NameIndex, index_enabled
+from panel_keys import KEY_VERSION, ensure_keys, materialize_keys
+from panel_schema import add_categories, read_panel_csv
+from parallel_match import resolve_workers
+from similarity import CandidateArray, backend_for, get_scorer
 
-def calculate_name_similarity(name1, name2):
-    """두 이름의 유사도 계산"""
-    if pd.isna(name1) or pd.isna(name2):
-        return 0
+# 이름 유사도 backend (matching_config.json)
+NAME_BACKEND = backend_for('update_participation.name')
+name_similarity = get_scorer('update_participation.name')
+
+# 이름 인덱스로 유사도 기준값 이상이 될 수 있는 후보만 비교 (결과는 전체 비교와 동일)
+USE_NAME_INDEX = index_enabled('update_participation.name')
 
-    name1_norm = normalize_name(name1)
-    name2_norm = normalize_name(name2)
+# 매칭 규칙 버전 (점수 규칙이나 기준값을 바꾸면 올려서 매칭 캐시 무효화)
+MATCHER_VERSION = 2
 
-    if not name1_norm or not name2_norm:
+def calculate_name_similarity(key1, key2, cutoff=0.0):
+    """두 이름 키(panel_keys.name_key)의 유사도 계산 (cutoff 미만이 확실하면 0)"""
+    if not key1 or not key2:
         return 0
 
     # 완전 일치
-    if name1_norm == name2_norm:
+    if key1 == key2:
         return 1.0
 
     # 부분 일치 (한 이름이 다른 이름에 포함)
-    if name1_norm in name2_norm or name2_norm in name1_norm:
+    if key1 in key2 or key2 in key1:
         return 0.9
 
     # 유사도 계산
-    return SequenceMatcher(None, name1_norm, name2_norm).ratio()
+    return name_similarity(key1, key2, cutoff)
+
+def find_best_panel_match(kbeauty_key, panel, positions=None):
+    """
+    K-Beauty 이름 키 하나에 대해 가장 유사한 PANEL5 후보 찾기
+    panel: {'keys': 이름 키 목록,
+            'array': CandidateArray (sequence 외 backend) 또는 None,
+            'index': NameIndex (80% 이상이 될 수 있는 후보 생성) 또는 None}
+    positions: 비교할 후보 위치 (기본: 전체, 매칭 캐시에서 새 후보만 계산할 때 사용)
+    반환: (후보 위치, 유사도) - 80% 이상 유사한 후보가 없으면 (None, 0)
+    """
+    if not kbeauty_key:
+        return None, 0
+
+    panel_keys = panel['keys']
+    if panel['index'] is not None:
+        # 80% 이상이 될 수 있는 후보만 비교 (완전/부분 일치 후보 포함)
+        allowed = None if positions is None else set(positions)
+        positions = [
+            pos for pos in panel['index'].candidates(kbeauty_key, 0.8)
+            if allowed is None or pos in allowed
+        ]
+    elif positions is None:
+        positions = range(len(panel_keys))
+
+    if panel['array'] is not None:
+        return find_best_panel_match_array(kbeauty_key, panel['array'], list(positions))
+
+    best_pos = None
+    best_score = 0
+
+    for pos in positions:
+        # 현재 최고 점수와 80% 중 큰 값을 넘지 못하는 후보는 전체 계산 생략
+        similarity = calculate_name_similarity(kbeauty_key, panel_keys[pos], cutoff=max(best_score, 0.8))
+
+        if similarity > best_score and similarity >= 0.8:  # 80% 이상 유사도
+            best_score = similarity
+            best_pos = pos
+
+    return best_pos, best_score
+
+def find_best_panel_match_array(kbeauty_key, candidates, positions):
+    """후보 배열을 한 번에 계산하는 backend용 find_best_panel_match"""
+    if not positions:
+        return None, 0
+
+    scores = candidates.scores(kbeauty_key, positions=positions)
+    # 완전 일치 / 부분 일치 점수는 calculate_name_similarity와 동일하게 적용
+    for i, pos in enumerate(positions):
+        panel_key = candidates.candidates[pos]
+        if not panel_key:
+            continue
+        if panel_key == kbeauty_key:
+            scores[i] = 1.0
+        elif panel_key in kbeauty_key or kbeauty_key in panel_key:
+            scores[i] = 0.9
+
+    best = int(np.argmax(scores))
+    best_score = float(scores[best])
+    if best_score < 0.8:  # 80% 이상 유사도
+        return None, 0
+    return positions[best], best_score
 
 print("Participation Result 업데이트 시작...")
 
@@ -39,8 +104,9 @@ print("Participation Result 업데이트 시작...")
 print("\n1. 데이터 로드 중...")
 
 # K-Beauty 정규화 데이터
-kbeauty_df = pd.read_csv('/Users/owlers_dylan/Metrix/source/K-Beauty_Panel_Normalized.csv')
+kbeauty_df = read_panel_csv('/Users/owlers_dylan/Metrix/source/K-Beauty_Panel_Normalized.csv', parse_dates=True)
 print(f"   - K-Beauty 데이터: {len(kbeauty_df)} 행")
+kbeauty_df = ensure_keys(kbeauty_df, name_cols=['name'])
 
 # Metrix Seoul 데이터 로드
 metrix_raw = pd.read_csv('/Users/owlers_dylan/Metrix/source/Metrix_matching_seoul.csv')
@@ -101,33 +167,43 @@ else:
 valid_panel5 = panel5_df[panel5_df['매칭이름'].notna()].copy()
 print(f"   - 유효한 이름이 있는 PANEL5 레코드: {len(valid_panel5)} 건")
 
+# PANEL5 이름 키는 한 번만 계산 (프로세스 풀에서 읽기 전용으로 공유)
+valid_panel5 = materialize_keys(valid_panel5, name_cols=['매칭이름'])
+panel_keys = list(valid_panel5['key_name'])
+panel = {
+    'keys': panel_keys,
+    # 질의 하나를 후보 배열과 한 번에 비교 (sequence 외 backend)
+    'array': CandidateArray(panel_keys, NAME_BACKEND) if NAME_BACKEND != 'sequence' else None,
+    # 이름 문자 역색인 (후보 생성)
+    'index': NameIndex(panel_keys, NAME_BACKEND) if USE_NAME_INDEX else None
+}
+
 # 3. 이름 매칭 및 업데이트
 print("\n3. 이름 기준 매칭 시작...")
 
 updated_count = 0
 matched_details = []
 
-for idx, kbeauty_row in kbeauty_df.iterrows():
-    kbeauty_name = kbeauty_row['name']
-
-    if pd.isna(kbeauty_name):
-        continue
-
+# participation_result는 category 컬럼이므로 대입할 값을 미리 카테고리에 추가
+add_categories(kbeauty_df, 'participation_result', ['참여'])
+
+# 이름이 있는 K-Beauty 레코드만 매칭 (METRIX_MATCH_WORKERS > 1 이면 병렬)
+query_rows = kbeauty_df[kbeauty_df['name'].notna()]
+print(f"   - 매칭 프로세스 수: {resolve_workers()}, 유사도 backend: {NAME_BACKEND}")
+# 이전 실행 결과를 재사용하고 새로 추가/변경된 이름만 계산
+query_keys = list(query_rows['key_name'])
+match_results = cached_match(
+    'update_participation',
+    f"{MATCHER_VERSION}:{KEY_VERSION}:{NAME_BACKEND}",
+    find_best_panel_match, query_keys, query_keys, panel, panel_keys
+)
+
+for idx, kbeauty_name, (best_pos, best_score) in zip(query_rows.index, query_rows['name'], match_results):
     best_match = None
-    best_score = 0
     best_panel_row = None
-
-    # PANEL5 데이터와 이름 매칭
-    for _, panel_row in valid_panel5.iterrows():
-        panel_name = panel_row['매칭이름']
-
-        # 유사도 계산
-        similarity = calculate_name_similarity(kbeauty_name, panel_name)
-
-        if similarity > best_score and similarity >= 0.8:  # 80% 이상 유사도
-            best_score = similarity
-            best_match = panel_name
-            best_panel_row = panel_row
+    if best_pos is not None:
+        best_panel_row = valid_panel5.iloc[best_pos]
+        best_match = best_panel_row['매칭이름']
 
     # 매칭된 경우 participation_result 업데이트
     if best_match:
@@ -3,39 +3,70 @@
 
 import pandas as pd
 import numpy as np
-from difflib import SequenceMatcher
 
-def normalize_name(name):
-    """이름 정규화 - 공백 제거, 소문자 변환"""
-    if pd.isna(name):
-        return ""
-    return str(name).strip().lower().replace(" ", "")
+from match_cache import cached_match
+from panel_keys import KEY_DTYPES, KEY_VERSION, ensure_keys, materialize_keys
+from name_index import NameIndex, index_enabled
+from similarity import CandidateArray, backend_for, get_scorer
 
-def similarity(a, b):
-    """두 문자열의 유사도 계산"""
-    return SequenceMatcher(None, a, b).ratio()
+# 이름 유사도 backend (matching_config.json)
+NAME_BACKEND = backend_for('update_participation_from_metrix.name')
+name_similarity = get_scorer('update_participation_from_metrix.name')
 
-def find_best_match(name, name_list, threshold=0.8):
+# 이름 인덱스로 유사도 기준값 이상이 될 수 있는 후보만 비교 (결과는 전체 비교와 동일)
+USE_NAME_INDEX = index_enabled('update_participation_from_metrix.name')
+
+# 매칭 규칙 버전 (점수 규칙이나 기준값을 바꾸면 올려서 매칭 캐시 무효화)
+MATCHER_VERSION = 2
+
+def similarity(a, b, cutoff=0.0):
+    """두 문자열의 유사도 계산 (cutoff 미만이 확실하면 0)"""
+    return name_similarity(a, b, cutoff)
+
+def find_best_match(key, candidates, positions=None, threshold=0.8):
     """
-    이름 목록에서 가장 유사한 이름 찾기
+    이름 키 목록에서 가장 유사한 이름 찾기
+    candidates: {'keys': 이름 키 목록,
+                 'array': CandidateArray (sequence 외 backend) 또는 None,
+                 'index': NameIndex (주어지면 threshold 이상이 될 수 있는 후보만 비교) 또는 None}
+    positions: 비교할 후보 위치 (기본: 전체, 매칭 캐시에서 새 후보만 계산할 때 사용)
     threshold: 최소 유사도 (기본 80%)
+    반환: (후보 위치, 유사도) - 매칭 없으면 (None, 0)
     """
-    if not name:
-        return None
+    if not key:
+        return None, 0
+
+    candidate_keys = candidates['keys']
+    if candidates['index'] is not None:
+        allowed = None if positions is None else set(positions)
+        positions = [
+            pos for pos in candidates['index'].candidates(key, threshold)
+            if allowed is None or pos in allowed
+        ]
+    elif positions is None:
+        positions = list(range(len(candidate_keys)))
+
+    if candidates['array'] is not None:
+        # 후보 배열을 한 번에 계산하는 backend
+        if not positions:
+            return None, 0
+        scores = candidates['array'].scores(key, positions=positions)
+        best = int(np.argmax(scores))
+        if scores[best] < threshold:
+            return None, 0
+        return positions[best], float(scores[best])
 
-    normalized_name = normalize_name(name)
     best_match = None
     best_score = 0
 
-    for idx, candidate in enumerate(name_list):
-        normalized_candidate = normalize_name(candidate)
-        score = similarity(normalized_name, normalized_candidate)
+    for idx in positions:
+        score = similarity(key, candidate_keys[idx], cutoff=max(best_score, threshold))
 
         if score > best_score and score >= threshold:
             best_score = score
             best_match = idx
 
-    return best_match
+    return best_match, best_score
 
 def update_participation_from_metrix():
     """
@@ -52,7 +83,7 @@ def update_participation_from_metrix():
     print("데이터 파일 읽기...")
 
     # K-Beauty 패널 데이터 읽기
-    panel_df = pd.read_csv(panel_file, encoding='utf-8-sig')
+    panel_df = pd.read_csv(panel_file, encoding='utf-8-sig', dtype=KEY_DTYPES)
     initial_count = len(panel_df)
     print(f"K-Beauty 패널 데이터: {initial_count}개 레코드")
 
@@ -79,6 +110,7 @@ def update_participation_from_metrix():
 
     # 컬럼 이름 정리
     panel_df.columns = panel_df.columns.str.strip()
+    panel_df = ensure_keys(panel_df, name_cols=['이름'])
 
     # 컬럼 확인
     print(f"\nSeoul 컬럼: {list(seoul_df.columns[:10])}")
@@ -89,8 +121,9 @@ def update_participation_from_metrix():
     metrix_df = pd.concat([seoul_df, suwon_df], ignore_index=True)
 
     # 유효한 데이터만 필터링
-    metrix_df = metrix_df[metrix_df['이름'].notna()]
+    metrix_df = metrix_df[metrix_df['이름'].notna()].copy()
     print(f"통합된 Metrix 데이터: {len(metrix_df)}개 레코드")
+    metrix_df = materialize_keys(metrix_df, name_cols=['이름'])
 
     # 이름별 참여 여부 집계 (참여 우선)
     print("\n이름별 참여 여부 집계 중...")
@@ -101,7 +134,7 @@ def update_participation_from_metrix():
         participation = row['참여 여부 결과']
 
         if pd.notna(name) and pd.notna(participation):
-            normalized = normalize_name(name)
+            normalized = row['key_name'] or ''
 
             if normalized not in participation_dict:
                 participation_dict[normalized] = {
@@ -139,11 +172,32 @@ def update_participation_from_metrix():
     # 이전 값 저장
     panel_df['참여여부결과_이전'] = panel_df['참여여부결과']
 
+    # 유사도 매칭 후보 (이름 키 목록은 한 번만 생성)
+    candidate_keys = list(participation_dict.keys())
+    candidates = {
+        'keys': candidate_keys,
+        'array': CandidateArray(candidate_keys, NAME_BACKEND) if NAME_BACKEND != 'sequence' else None,
+        # Metrix 이름 키의 문자 역색인 (후보 생성)
+        'index': NameIndex(candidate_keys, NAME_BACKEND) if USE_NAME_INDEX else None
+    }
+
+    # 정확히 일치하지 않는 이름 키만 유사도 매칭 (이전 실행 결과 재사용, 새 이름만 계산)
+    fuzzy_keys = list(dict.fromkeys(
+        row['key_name'] for _, row in panel_df.iterrows()
+        if pd.notna(row['이름']) and row['key_name'] and row['key_name'] not in participation_dict
+    ))
+    fuzzy_results = cached_match(
+        'update_participation_from_metrix',
+        f"{MATCHER_VERSION}:{KEY_VERSION}:{NAME_BACKEND}",
+        find_best_match, fuzzy_keys, fuzzy_keys, candidates, candidate_keys
+    )
+    fuzzy_matches = {key: result[0] for key, result in zip(fuzzy_keys, fuzzy_results)}
+
     for idx, row in panel_df.iterrows():
         panel_name = row['이름']
 
         if pd.notna(panel_name):
-            normalized_panel = normalize_name(panel_name)
+            normalized_panel = row['key_name'] or ''
 
             # 정확한 매칭 먼저 시도
             if normalized_panel in participation_dict:
@@ -162,12 +216,11 @@ def update_participation_from_metrix():
                 })
             else:
                 # 유사도 매칭 시도 (80% 이상)
-                metrix_names = [participation_dict[k]['original_name'] for k in participation_dict.keys()]
-                best_match_idx = find_best_match(panel_name, metrix_names, threshold=0.8)
+                best_match_idx = fuzzy_matches.get(normalized_panel)
 
                 if best_match_idx is not None:
-                    matched_name = metrix_names[best_match_idx]
-                    normalized_matched = normalize_name(matched_name)
+                    normalized_matched = candidate_keys[best_match_idx]
+                    matched_name = participation_dict[normalized_matched]['original_name']
                     new_value = participation_dict[normalized_matched]['participation']
                     old_value = panel_df.at[idx, '참여여부결과']
 